@@ -10,12 +10,32 @@ setup(
     long_description="",
     packages=find_namespace_packages(),
     entry_points={
-        'console_scripts': 'wfapp=weatherapp.core.app:main'
+        'console_scripts': 'wfapp=weatherapp.core.app:main',
+        'weatherapp.providers': [
+            'accu=weatherapp.core.providers:AccuWeatherProvider',
+            'rp5=weatherapp.core.providers:Rp5WeatherProvider',
+            'sinoptik=weatherapp.core.providers:SinoptikWeatherProvider',
+        ],
+        'weatherapp.commands': [
+            'config=weatherapp.core.commands.config:Configure',
+            'providers=weatherapp.core.commands.providers:Providers',
+            'warm=weatherapp.core.commands.warm:Warm',
+            'queue=weatherapp.core.commands.workqueue:WorkQueue',
+            'freshness=weatherapp.core.commands.freshness:Freshness',
+            'watch=weatherapp.core.commands.watch:Watch',
+            'shell=weatherapp.core.commands.shell:Shell',
+            'forecast=weatherapp.core.commands.forecast:Forecast',
+            'locate=weatherapp.core.commands.locate:Locate',
+        ],
     },
     install_requires=[
         'bs4',
         'loguru',
         'prettytable',
         'requests'
-    ]
+    ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'numpy': ['numpy'],
+    }
 )
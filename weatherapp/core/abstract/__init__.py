@@ -2,3 +2,4 @@ from weatherapp.core.abstract.command import Command
 from weatherapp.core.abstract.manager import Manager
 from weatherapp.core.abstract.provider import WeatherProvider
 from weatherapp.core.abstract.formatter import Formatter
+from weatherapp.core.abstract.cache import CacheBackend, CacheEntry, CacheError
@@ -0,0 +1,69 @@
+"""Abstract cache backend class for the weather application."""
+
+import abc
+import time
+from collections import namedtuple
+
+
+class CacheError(Exception):
+    """Raised when cache backend is not available."""
+
+
+class CacheEntry(namedtuple('CacheEntry', 'value stored_at ttl')):
+    """Cached value with the time it was stored and its time to live.
+
+    Value is a bytes-like object (bytes or memoryview).
+    """
+
+    __slots__ = ()
+
+    @property
+    def expires_at(self) -> float:
+        """Time when the entry becomes invalid."""
+
+        return self.stored_at + self.ttl
+
+    def is_valid(self) -> bool:
+        """Check if the entry is not expired yet."""
+
+        return time.time() < self.expires_at
+
+
+class CacheBackend(abc.ABC):
+    """Base abstract class for cache backends.
+
+    Backends keep expired entries for a while (config.DAY_IN_SECONDS),
+    so they can be used as stale cache.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str):
+        """Return cache entry by key, None if there is no entry.
+
+        :param key: cache key
+        :type key: str
+        :rtype: `CacheEntry`
+        """
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, ttl: float = None,
+            stored_at: float = None):
+        """Save value to the cache.
+
+        :param key: cache key
+        :type key: str
+        :param value: data to save
+        :type value: bytes-like object
+        :param ttl: time to live (in seconds), config.CACHE_TIME by default
+        :type ttl: float
+        :param stored_at: time the value was received, now by default
+        :type stored_at: float
+        """
+
+    @abc.abstractmethod
+    def delete(self, key: str):
+        """Delete entry from the cache.
+
+        :param key: cache key
+        :type key: str
+        """
@@ -7,6 +7,16 @@ from typing import Union
 class Formatter(abc.ABC):
     """Base abstract class for formatters."""
 
+    # results of all providers are collected and formatted at once
+    # with emit_rows, otherwise every result is formatted with emit
+    batch = False
+
     @abc.abstractmethod
     def emit(self, column_names: list, data: Union[list, tuple]):
         """Format and print data from the iterable source."""
+
+    def emit_rows(self, results):
+        """Yield formatted output for (title, location, info) results."""
+
+        for title, location, info in results:
+            yield self.emit([title, location], info) + '\n'
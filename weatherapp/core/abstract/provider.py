@@ -1,18 +1,51 @@
 """Abstract provider class for the weather application."""
 
 import abc
+import codecs
 import configparser
 import hashlib
+import json
 import sys
 import time
 from collections import namedtuple
+from contextlib import nullcontext
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import requests
 from loguru import logger
 
-from weatherapp.core import config
+from weatherapp.core import config, profiling
 from weatherapp.core.abstract.command import Command
+from weatherapp.core.deadline import DeadlineExceeded
+from weatherapp.core.health import CircuitOpenError
+from weatherapp.core.hedging import CancellableAdapter, HedgeCancelled
+from weatherapp.core.streaming import MarkupWatcher
+from weatherapp.core.urls import canonical_url
+
+_configurations = {}  # configuration file path -> (mtime, parser)
+
+
+def read_configuration(path: Path) -> configparser.ConfigParser:
+    """Return parsed configuration file.
+
+    Parsed file is kept in memory and read again only when it changes,
+    so long running applications do not parse it for every provider.
+    """
+
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _configurations.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    _configurations[path] = (mtime, parser)
+    return parser
 
 
 class WeatherProvider(Command):
@@ -21,6 +54,19 @@ class WeatherProvider(Command):
     Defines behavior for all weather providers.
     """
 
+    # elements weather information is extracted from, used by --stream
+    # option to stop page download as soon as they all are read
+    streaming_targets = ()
+
+    page_encoding = 'utf-8'  # encoding of the provider pages
+    # get_weather_info accepts page as bytes-like object in page_encoding,
+    # otherwise page is decoded to the string before
+    raw_pages = False
+    # declarative extraction rules, see weatherapp.core.extraction
+    plan = None
+    # extraction rules of the forecast days, see ForecastPlan there
+    forecast_plan = None
+
     def __init__(self, app, stdout=None):
         super().__init__(app)
 
@@ -28,6 +74,8 @@ class WeatherProvider(Command):
         self.stdout = stdout or sys.stdout
         self.location = location
         self.url = url
+        self.stale_cache_used = False
+        self.page_fetched = False
 
     @abc.abstractmethod
     def get_default_location(self):
@@ -41,12 +89,11 @@ class WeatherProvider(Command):
     def configuration(self):
         """Performs provider configuration."""
 
-    @abc.abstractmethod
-    def get_weather_info(self, content: str):
+    def get_weather_info(self, content):
         """Collects weather information.
 
-        Gets weather information from source and produce it in
-        the following format.
+        Gets weather information from source with the provider extraction
+        plan and produce it in the following format.
 
         weather_info = {
             temp: ''  # temperature
@@ -56,6 +103,8 @@ class WeatherProvider(Command):
         }
         """
 
+        return self.plan.extract(content)
+
     def get_name(self):
         """Return provider name."""
         return self.name
@@ -101,7 +150,7 @@ class WeatherProvider(Command):
         parser = configparser.ConfigParser()
 
         try:
-            parser.read(self.get_configuration_file())
+            parser = read_configuration(self.get_configuration_file())
         except configparser.Error:
             msg = f'Bad configuration file.' \
                   f'Please change configuration for provider:' \
@@ -131,55 +180,345 @@ class WeatherProvider(Command):
         return Path.home() / config.CACHE_DIR
 
     @staticmethod
-    def cache_is_valid(path) -> bool:
-        """Check if current cache file is valid."""
+    def get_url_hash(url: str) -> str:
+        """Generates hash for canonical form of the given url.
 
-        return (time.time() - path.stat().st_mtime) < config.CACHE_TIME
+        Keys with prefix (e.g. result key) are hashed as is, their url
+        is made canonical by the method which builds the key.
+        """
 
-    @staticmethod
-    def get_url_hash(url: str) -> str:
-        """Generates hash for given url."""
+        return hashlib.md5(canonical_url(url).encode('utf-8')).hexdigest()
 
-        return hashlib.md5(url.encode('utf-8')).hexdigest()
+    def save_cache(self, url: str, page_source, ttl: float = None):
+        """Save page source data to the application cache.
 
-    def save_cache(self, url: str, page_source: str):
-        """Save page source data to file."""
+        :param ttl: cache time (in seconds), config.CACHE_TIME by default
+        :type ttl: float
+        """
 
-        url_hash = self.get_url_hash(url)
-        cache_dir = self.get_cache_directory()
-        if not cache_dir.exists():
-            cache_dir.mkdir(parents=True)
-        with (cache_dir / url_hash).open('wb') as cache_file:
-            cache_file.write(page_source)
+        self.app.cache.set(self.get_url_hash(url), page_source, ttl=ttl)
 
-    def get_cache(self, url: str) -> bytes:
-        """Return cache data if any exists."""
+    def get_legacy_links(self, page) -> list:
+        """Return (old url, url) pairs of the pages the location page links to.
+
+        Cache entries of these pages are moved from the keys made of the
+        old urls, which were joined differently before.
+        """
+
+        return []
+
+    def get_cache(self, url: str, stale: bool = False):
+        """Return cache data (bytes-like object) if any exists.
+
+        :param stale: return cache data even if it is not valid anymore
+        :type stale: bool
+        """
 
         cache = b''
-        url_hash = self.get_url_hash(url)
-        cache_dir = self.get_cache_directory()
-        if cache_dir.exists():
-            cache_path = cache_dir / url_hash
-            if cache_path.exists() and self.cache_is_valid(cache_path):
-                with cache_path.open('rb') as cache_file:
-                    cache = cache_file.read()
+        entry = self.app.cache.get(self.get_url_hash(url))
+        if entry and (stale or entry.is_valid()):
+            cache = entry.value
 
         return cache
 
-    def get_page_from_server(self, page_url: str, refresh: bool = False) -> str:
-        """Return information about the page in the string format."""
+    @staticmethod
+    def get_partial_key(url: str) -> str:
+        """Return cache key for the page which was downloaded partially."""
 
-        cache = self.get_cache(page_url)
-        if cache and not refresh:
-            page_source = cache
+        return f'partial:{canonical_url(url)}'
+
+    def get_cached_page(self, page_url: str, targets: list = None,
+                        stale: bool = False):
+        """Return cached page.
+
+        Partial page is returned when there is no full page in the cache
+        and required elements are given.
+        """
+
+        cache = self.get_cache(page_url, stale=stale)
+        if not cache and targets:
+            cache = self.get_cache(self.get_partial_key(page_url), stale=stale)
+        return cache
+
+    def get_stale_cache(self, page_url: str, error: Exception,
+                        targets: list = None):
+        """Return stale cache if there is any, otherwise raise error."""
+
+        stale_cache = self.get_cached_page(page_url, targets, stale=True)
+        if not stale_cache:
+            raise error
+
+        logger.warning(f'{error}, stale cache is used')
+        self.stale_cache_used = True
+        return stale_cache
+
+    def get_session(self, page_url: str, cancel=None):
+        """Return context manager of the session to send the request with.
+
+        Raced request gets its own session, its connections are shut
+        down as soon as the request is cancelled. Pages replayed from
+        the cassette are always read with the application session.
+        """
+
+        if cancel is None or type(self.app.session.get_adapter(page_url)) \
+                is not requests.adapters.HTTPAdapter:
+            return nullcontext(self.app.session)
+
+        session = requests.Session()
+        session.headers = self.app.session.headers
+        session.cookies = self.app.session.cookies
+        adapter = CancellableAdapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        cancel.add_callback(adapter.close)
+        return session
+
+    def download(self, page_url: str, timeout: float,
+                 targets: list = None, cancel=None) -> tuple:
+        """Download page content by chunks.
+
+        Download is interrupted as soon as the application deadline
+        is exceeded, the connection is closed in that case. When
+        required elements are given download is stopped as soon as they
+        all are read.
+
+        Chunks are collected into one buffer, so the page is not copied
+        once more after download.
+
+        :param cancel: event which stops the download, used by hedging
+        :type cancel: `weatherapp.core.hedging.CancelEvent`
+        :return: page source and flag which is set if page is partial
+        """
+
+        deadline = self.app.deadline
+        watcher = MarkupWatcher(targets) if targets else None
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with self.get_session(page_url, cancel) as session, \
+                session.get(page_url, headers=self.get_request_headers(),
+                            timeout=timeout, stream=True) as page:
+            if page.status_code >= 500:
+                page.raise_for_status()
+
+            page_source = bytearray()
+            for chunk in page.iter_content(config.CHUNK_SIZE):
+                if deadline:
+                    deadline.check('fetch')
+                if cancel is not None and cancel.is_set():
+                    raise HedgeCancelled(f'Request to {page_url} is cancelled')
+                page_source += chunk
+                if watcher:
+                    watcher.feed(decoder.decode(chunk))
+                    if watcher.complete:
+                        return page_source, True
+
+        return page_source, False
+
+    def request_page(self, page_url: str, timeout: float,
+                     targets: list = None) -> tuple:
+        """Download page, hedge the request when --hedge option is used.
+
+        :return: page source and flag which is set if page is partial
+        """
+
+        if self.app.hedging:
+            return self.app.hedging.run(
+                self.get_name(),
+                lambda cancel: self.download(page_url, timeout, targets, cancel))
+        return self.download(page_url, timeout, targets)
+
+    def fetch_page(self, page_url: str, targets: list = None):
+        """Download page from the server and save it to the cache.
+
+        Requests are skipped while provider circuit is open, stale cache
+        is returned instead if there is any. The same applies to pages
+        which can not be fetched in time when --stale option is used.
+        Slow requests are hedged when --hedge option is used, concurrent
+        requests of the same page are sent once.
+        Partial pages are cached separately from the full ones.
+        """
+
+        health = self.app.health
+        deadline = self.app.deadline
+        if not health.allow_request(self.get_name()):
+            return self.get_stale_cache(
+                page_url,
+                CircuitOpenError(f'Provider {self.get_name()} is unavailable'),
+                targets)
+
+        if self.app.rate_limiter:
+            self.app.rate_limiter.wait(urlsplit(page_url).hostname)
+
+        timeout = config.REQUEST_TIMEOUT
+        start_time = time.perf_counter()
+        try:
+            if deadline:
+                deadline.check('fetch')
+                timeout = min(timeout, deadline.remaining('fetch'))
+            with profiling.phase(self.title, 'fetch'):
+                page_source, partial = self.app.inflight.run(
+                    (canonical_url(page_url), bool(targets)),
+                    lambda: self.request_page(page_url, timeout, targets))
+        except DeadlineExceeded as error:
+            if self.app.options.stale:
+                return self.get_stale_cache(page_url, error, targets)
+            raise
+        except requests.RequestException:
+            health.record_failure(self.get_name(),
+                                  time.perf_counter() - start_time)
+            raise
+        health.record_success(self.get_name(), time.perf_counter() - start_time)
+        self.page_fetched = True
+
+        # all pages of the location are cached as long as its weather info
+        ttl = self.app.freshness.ttl(self.url)
+        if partial:
+            self.save_cache(self.get_partial_key(page_url), page_source, ttl)
         else:
-            page = requests.get(page_url, headers=self.get_request_headers())
-            page_source = page.content
-            self.save_cache(page_url, page_source)
+            self.save_cache(page_url, page_source, ttl)
+        return page_source
+
+    def get_page_source(self, page_url: str, refresh: bool = False,
+                        targets: list = None):
+        """Return page source as bytes-like object.
+
+        Cached pages are returned as memoryview of the cache file, so
+        the page is not copied until consumer needs the text.
+
+        :param targets: required elements of the page, when given page
+            download is stopped as soon as they all are read
+        :type targets: list
+        """
+
+        cache = self.get_cached_page(page_url, targets)
+        if cache and not refresh:
+            return cache
+        return self.fetch_page(page_url, targets)
+
+    def get_page_from_server(self, page_url: str, refresh: bool = False,
+                             targets: list = None) -> str:
+        """Return information about the page in the string format."""
+
+        page_source = self.get_page_source(page_url, refresh, targets)
+        return str(page_source, self.page_encoding)
+
+    @staticmethod
+    def get_result_key(url: str) -> str:
+        """Return cache key for weather info collected from the page."""
+
+        return f'result:{canonical_url(url)}'
+
+    def get_result_cache(self, url: str) -> dict:
+        """Return cached weather info if any exists."""
 
-        return page_source.decode('utf-8')
+        cache = self.get_cache(self.get_result_key(url))
+        if cache:
+            return json.loads(str(cache, 'utf-8'))
+        return None
+
+    def save_result_cache(self, url: str, weather_info: dict,
+                          ttl: float = None):
+        """Save weather info collected from the page to the cache."""
+
+        self.save_cache(self.get_result_key(url),
+                        json.dumps(weather_info).encode('utf-8'), ttl)
+
+    def get_data_page(self, content, refresh: bool = False):
+        """Return the page weather info is read from.
+
+        It is the location page itself, unless provider reads weather
+        info from another page the location page links to.
+        """
+
+        return content
+
+    def parse_weather_info(self, content, refresh: bool = False) -> dict:
+        """Collects weather information from the page content.
+
+        Providers which need additional pages use refresh flag for them.
+        """
+
+        with profiling.phase(self.title, 'parse'):
+            if not self.raw_pages:
+                content = str(content, self.page_encoding)
+            return self.get_weather_info(content)
+
+    def get_forecast_url(self) -> str:
+        """Return url of the page with the forecast for the next days.
+
+        Forecast is on the location page by default.
+        """
+
+        return self.url
+
+    @staticmethod
+    def get_forecast_key(url: str) -> str:
+        """Return cache key for the forecast of the location."""
+
+        return f'forecast:{canonical_url(url)}'
+
+    def run_forecast(self, days: int, refresh: bool = False) -> list:
+        """Return weather info for the number of days, today goes first.
+
+        Forecast page is the same cached page current weather is read
+        from, unless provider keeps forecast on another page. In the
+        former case the page is parsed once for both of them, and
+        current weather info is cached too if it has expired.
+        """
+
+        key = self.get_forecast_key(self.url)
+        if not refresh:
+            cache = self.get_cache(key)
+            if cache:
+                return json.loads(str(cache, 'utf-8'))[:days]
+
+        # bs4 is imported with the first provider which parses pages
+        from weatherapp.core.extraction import make_soup
+
+        url = self.get_forecast_url()
+        content = self.get_page_source(url, refresh=refresh)
+        weather_info = None
+        with profiling.phase(self.title, 'parse'):
+            if not self.raw_pages:
+                content = str(content, self.page_encoding)
+            soup = make_soup(content, self.page_encoding)
+            forecast = self.forecast_plan.extract(content, soup=soup)
+            if url == self.url and self.plan is not None and (
+                    self.page_fetched or self.get_result_cache(self.url) is None):
+                weather_info = self.plan.extract(content, soup=soup)
+
+        if not self.stale_cache_used:
+            if weather_info is not None and self.page_fetched:
+                ttl = self.app.freshness.observe(self.url, weather_info,
+                                                 self.get_name(), self.location)
+            else:
+                ttl = self.app.freshness.ttl(self.url)
+            if weather_info is not None:
+                self.save_result_cache(self.url, weather_info, ttl)
+            self.save_cache(key, json.dumps(forecast).encode('utf-8'), ttl)
+        return forecast[:days]
 
     def run(self, refresh=False):
-        """Main run for provider."""
-        content = self.get_page_from_server(self.url, refresh=refresh)
-        return self.get_weather_info(content)
+        """Main run for provider.
+
+        Weather info is cached on top of page cache, so the page is not
+        parsed again until cache is expired. Cache time of the location
+        adapts to how often its weather info changes.
+        """
+
+        if not refresh:
+            weather_info = self.get_result_cache(self.url)
+            if weather_info is not None:
+                return weather_info
+
+        targets = self.streaming_targets if self.app.options.stream else None
+        content = self.get_page_source(self.url, refresh=refresh,
+                                       targets=targets)
+        weather_info = self.parse_weather_info(content, refresh=refresh)
+        if not self.stale_cache_used:
+            if self.page_fetched:
+                ttl = self.app.freshness.observe(self.url, weather_info,
+                                                 self.get_name(), self.location)
+            else:
+                ttl = self.app.freshness.ttl(self.url)
+            self.save_result_cache(self.url, weather_info, ttl)
+        return weather_info
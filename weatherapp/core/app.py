@@ -1,20 +1,33 @@
 """Main module of the application."""
 
 import csv
-import os
+import hashlib
 import sys
 import shutil
-import time
 from argparse import ArgumentParser
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from collections import namedtuple
+from contextlib import nullcontext
 from pathlib import Path
 
+import requests
 from loguru import logger
 
-from weatherapp.core.formatters import TableFormatter
+from weatherapp.core.abstract import CacheError
+from weatherapp.core.caches import (DiskCache, RedisCache, TieredCache,
+                                    read_legacy_entry)
+from weatherapp.core.cassette import stop_cassette, use_cassette
+from weatherapp.core.cachesweeper import CacheSweeper
+from weatherapp.core.deadline import Deadline
+from weatherapp.core.formatters import GridFormatter, TableFormatter
+from weatherapp.core.freshness import FreshnessTracker
+from weatherapp.core.health import HealthTracker
+from weatherapp.core.hedging import Hedging
 from weatherapp.core.providermanager import ProviderManager
+from weatherapp.core.quorum import find_quorum, quorum_type
 from weatherapp.core.commandmanager import CommandManager
-from weatherapp.core import config
+from weatherapp.core.urls import SingleFlight
+from weatherapp.core import config, logs, profiling
 
 
 class App:
@@ -24,14 +37,29 @@ class App:
         self.stdin = stdin or sys.stdin
         self.stdout = stdout or sys.stdout
         self.stderr = stderr or sys.stderr
-        self.arg_parser = self._arg_parse()
         self.providermanager = ProviderManager()
+        self.arg_parser = self._arg_parse(self.providermanager)
         self.commandmanager = CommandManager()
         self.formatters = self._load_formatters()
+        self.health = HealthTracker(self.get_cache_directory() / config.HEALTH_FILE)
+        self.freshness = FreshnessTracker(self.get_cache_directory()
+                                          / config.FRESHNESS_FILE)
+        self.deadline = None
+        self.rate_limiter = None
+        self.hedging = None
+        self.session = requests.Session()  # keeps connections to the sites
+        self.inflight = SingleFlight()  # page requests which are running now
+        self.pending_output = []  # results collected for the batch formatter
+        self.sweeper = CacheSweeper(self.get_cache_directory())
+        self.cache = self._load_cache()
 
     @staticmethod
-    def _arg_parse():
-        """Initialize argument parser."""
+    def _arg_parse(providermanager=None):
+        """Initialize argument parser.
+
+        :param providermanager: providers --quorum is checked against
+        :type providermanager: `weatherapp.core.providermanager.ProviderManager`
+        """
         arg_parser = ArgumentParser(description='Application information',
                                     add_help=False)
         arg_parser.add_argument('command', help='Command', nargs='?')
@@ -46,14 +74,66 @@ class App:
                                 help='Output format, defaults to table',
                                 action='store',
                                 default='table')
+        arg_parser.add_argument('--deadline',
+                                help='Time budget for all providers (in seconds)',
+                                type=float,
+                                default=None)
+        arg_parser.add_argument('--stale',
+                                help='Use stale cache for late providers',
+                                action='store_true')
+        arg_parser.add_argument('--stream',
+                                help='Stop page download once weather info is read',
+                                action='store_true')
+        arg_parser.add_argument('--quorum',
+                                help='Start all providers at once and stop '
+                                     'when that many of them answer',
+                                type=quorum_type(providermanager),
+                                default=None)
+        arg_parser.add_argument('--tolerance',
+                                help='Maximum temperature difference of the '
+                                     'quorum answers',
+                                type=float,
+                                default=None)
+        arg_parser.add_argument('--hedge',
+                                help='Send second request when server is slow',
+                                action='store_true')
+        arg_parser.add_argument('--profile-cpu',
+                                help='Profile the run and write profile files '
+                                     'with the path prefix',
+                                metavar='PREFIX')
+        arg_parser.add_argument('--profile-memory',
+                                help='Record memory allocations while profiling',
+                                action='store_true')
+        arg_parser.add_argument('--record',
+                                help='Record responses to the cassette file',
+                                metavar='CASSETTE',
+                                default=config.RECORD_FILE)
+        arg_parser.add_argument('--replay',
+                                help='Replay responses from the cassette file',
+                                metavar='CASSETTE',
+                                default=config.REPLAY_FILE)
+        arg_parser.add_argument('--replay-latency',
+                                help='Delay of replayed responses (in seconds), '
+                                     'recorded response time by default',
+                                type=float,
+                                default=config.REPLAY_LATENCY)
+        arg_parser.add_argument('--replay-jitter',
+                                help='Maximum random delay added to replayed '
+                                     'responses (in seconds)',
+                                type=float,
+                                default=config.REPLAY_JITTER)
 
         return arg_parser
 
     @staticmethod
     def configure_logging(fname='weatheapp'):
-        """Set up logging for any log output."""
+        """Set up logging for any log output.
+
+        Log files are separate for debug, info and error records, sinks
+        are added only once, so the method may be called on every run.
+        """
 
-        logger.add(f'{fname}_{{time:MM:DD}}.log', retention='5 days')
+        logs.configure(fname)
 
     @staticmethod
     def get_cache_directory():
@@ -65,6 +145,7 @@ class App:
         """Delete directory with cache."""
 
         cache_dir = self.get_cache_directory()
+        self.sweeper.flush()
 
         try:
             shutil.rmtree(cache_dir)
@@ -76,29 +157,73 @@ class App:
                 logger.error(msg)
 
     def delete_invalid_cache(self):
-        """Delete all invalid (old) cache.
+        """Delete invalid (old) cache and keep cache size under the limit.
 
-        The time during which the cache is valid
+        Cache is swept incrementally in the background thread, every run
+        checks a bounded number of cache files. The time during which
+        the cache is not removed, cache size limit and eviction policy
         can be changed in config.py
         """
 
+        self.sweeper.start()
+
+    def migrate_cache_keys(self):
+        """Move pages cached by earlier versions to the current cache files.
+
+        Pages were cached as files without the header under keys made of
+        urls as is, now keys are made of canonical urls. Pages of
+        configured locations and the pages they link to are moved, the
+        rest of old files are swept as usual. Migration is done once,
+        the marker file is written only when all pages are moved.
+        """
+
         cache_dir = self.get_cache_directory()
-        if cache_dir.exists():
-            path = Path(cache_dir)
-            dirs = os.listdir(path)
-            for file in dirs:
-                life_time = time.time() - (path / file).stat().st_mtime
-                if life_time > config.DAY_IN_SECONDS:
-                    os.remove(path / file)
+        marker = cache_dir / config.CACHE_KEYS_FILE
+        if not cache_dir.exists() or marker.exists():
+            return
+
+        try:
+            for name, provider in self.providermanager:
+                provider = provider(self)
+                self._move_legacy_page(name, provider, provider.url, provider.url)
+                page = provider.get_cache(provider.url, stale=True)
+                if page:
+                    for old_url, url in provider.get_legacy_links(page):
+                        self._move_legacy_page(name, provider, old_url, url)
+        except (OSError, CacheError):
+            msg = 'Error while migrating the cache, it is retried next run'
+            if self.options.debug:
+                logger.exception(msg)
+            else:
+                logger.error(msg)
+            return
+        marker.touch()
+
+    def _move_legacy_page(self, name: str, provider, old_url: str, url: str):
+        old_hash = hashlib.md5(old_url.encode('utf-8')).hexdigest()
+        entry = read_legacy_entry(self.get_cache_directory() / old_hash)
+        if entry is None:
+            return
+
+        new_hash = provider.get_url_hash(url)
+        if new_hash == old_hash or self.cache.get(new_hash) is None:
+            self.cache.set(new_hash, entry.value, ttl=entry.ttl,
+                           stored_at=entry.stored_at)
+        if new_hash != old_hash:
+            self.cache.delete(old_hash)
+        logger.debug(f'Cached page {old_url} of {name} is migrated')
 
     def get_weather_info_to_save(self, weather_site: str) -> dict:
-        """Return information from weather site to save."""
+        """Return information from weather site to save.
+
+        Cached weather info is used, so the page is not fetched and
+        parsed again.
+        """
 
         if weather_site in self.providermanager:
             provider = self.providermanager[weather_site]
             provider_obj = provider(self)
-            _, content = self.get_city_name_page_content(weather_site)
-            weather_info = provider_obj.get_weather_info(content)
+            weather_info = provider_obj.run(refresh=self.options.refresh)
 
         return weather_info
 
@@ -128,25 +253,61 @@ class App:
 
         return place_info
 
+    def _load_cache(self):
+        """Create cache backend.
+
+        Local disk cache is used, shared cache server is placed behind it
+        when config.CACHE_URL (WEATHERAPP_CACHE_URL variable) is set.
+        """
+
+        cache = DiskCache(self.get_cache_directory(), sweeper=self.sweeper)
+        if config.CACHE_URL:
+            cache = TieredCache(cache, RedisCache.from_url(config.CACHE_URL))
+        return cache
+
     @staticmethod
     def _load_formatters():
-        return {'table': TableFormatter}
+        return {'table': TableFormatter, 'grid': GridFormatter}
+
+    def get_formatter(self):
+        """Return formatter chosen by --formatter option."""
+
+        return self.formatters.get(self.options.formatter, TableFormatter)()
 
     def program_output(self, title: str, city: str, info: dict):
-        """Print the application output in readable form."""
+        """Print the application output in readable form.
+
+        Batch formatters get results of all providers at once, so the
+        result is only collected, see flush_output.
+        """
 
-        formatter = self.formatters.get(self.options.formatter, 'table')()
-        columns = [title, city]
+        with profiling.phase(title, 'format'):
+            formatter = self.get_formatter()
+            if formatter.batch:
+                self.pending_output.append((title, city, info))
+                return
+            columns = [title, city]
 
-        self.stdout.write(formatter.emit(columns, info))
-        self.stdout.write('\n')
+            self.stdout.write(formatter.emit(columns, info))
+            self.stdout.write('\n')
+
+    def flush_output(self):
+        """Print results collected for the batch formatter."""
+
+        if not self.pending_output:
+            return
+
+        results, self.pending_output = self.pending_output, []
+        with profiling.phase(None, 'format'):
+            for line in self.get_formatter().emit_rows(results):
+                self.stdout.write(line)
 
     def run_command(self, name, argv):
         """Run command"""
 
         command = self.commandmanager.get(name)
         try:
-            command(self).run(argv)
+            command(self, stdout=self.stdout).run(argv)
         except Exception:
             msg = f'Error during command: {name} run'
             if self.options.debug:
@@ -159,19 +320,155 @@ class App:
 
         provider = self.providermanager.get(name)
         if provider:
+            try:
+                provider = provider(self)
+                self.program_output(provider.title,
+                                    provider.location,
+                                    provider.run(refresh=self.options.refresh))
+            except Exception:
+                msg = f'Error during provider: {name} run'
+                if self.options.debug:
+                    logger.exception(msg)
+                else:
+                    logger.error(msg)
+
+    def get_locations(self, names: list = None) -> list:
+        """Return configured locations of the providers.
+
+        :param names: provider names, all providers by default
+        :type names: list
+        :return: list of (provider name, location name, location url)
+        """
+
+        locations = []
+        for name, provider in self.providermanager:
+            if names and name not in names:
+                continue
             provider = provider(self)
-            self.program_output(provider.title,
-                                provider.location,
-                                provider.run(argv))
+            locations.append((name, provider.location, provider.url))
+        return locations
 
-    def run_providers(self, argv):
-        """Execute all available providers."""
+    def get_provider_result(self, name: str) -> tuple:
+        """Run provider and return its title, location and weather info."""
 
-        for _, provider in self.providermanager:
-            provider = provider(self)
-            self.program_output(provider.title,
-                                provider.location,
-                                provider.run(argv))
+        provider = self.providermanager[name](self)
+        return (provider.title,
+                provider.location,
+                provider.run(refresh=self.options.refresh))
+
+    def run_providers(self, argv, deadline: float = None):
+        """Execute all available providers.
+
+        :param deadline: time budget for all providers (in seconds),
+            providers which did not finish in time are marked as missing
+        :type deadline: float
+        """
+
+        if self.options.quorum:
+            return self.run_quorum(self.options.quorum, self.options.tolerance)
+
+        deadline = deadline or self.options.deadline
+        if not deadline:
+            for name, _ in self.providermanager:
+                self.run_provider(name, argv)
+            return
+
+        self.deadline = Deadline(deadline)
+        names = [name for name, _ in self.providermanager]
+        executor = ThreadPoolExecutor(max_workers=len(names))
+        futures = {name: executor.submit(self.get_provider_result, name)
+                   for name in names}
+        wait(futures.values(), timeout=self.deadline.remaining('parse'))
+
+        # late downloads are interrupted by the cancelled deadline
+        self.deadline.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for name, future in futures.items():
+            if future.done() and not future.cancelled() and not future.exception():
+                self.program_output(*future.result())
+            else:
+                self.missing_provider_output(name, future)
+
+    def run_quorum(self, quorum: int, tolerance: float = None):
+        """Start all providers at once and stop when quorum of them answer.
+
+        Requests of the rest of providers are interrupted by the
+        cancelled deadline. If quorum is not reached in time (with
+        --deadline option) or at all, all answers are printed.
+
+        :param quorum: number of providers required
+        :type quorum: int
+        :param tolerance: maximum difference of temperatures the quorum
+            agrees on, any answers are accepted if None
+        :type tolerance: float
+        """
+
+        self.deadline = Deadline(self.options.deadline)
+        names = [name for name, _ in self.providermanager]
+        executor = ThreadPoolExecutor(max_workers=len(names))
+        futures = {executor.submit(self.get_provider_result, name): name
+                   for name in names}
+
+        results = {}  # provider name -> (title, location, weather info)
+        agreed = None
+        pending = set(futures)
+        while pending and agreed is None:
+            timeout = None
+            if self.deadline.seconds is not None:
+                timeout = self.deadline.remaining('parse')
+            done, pending = wait(pending, timeout=timeout,
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                name = futures[future]
+                if future.exception() is None:
+                    results[name] = future.result()
+                    continue
+                msg = f'Error during provider: {name} run'
+                if self.options.debug:
+                    logger.opt(exception=future.exception()).error(msg)
+                else:
+                    logger.error(msg)
+            infos = {name: result[2] for name, result in results.items()}
+            agreed = find_quorum(infos, quorum, tolerance)
+
+        self.deadline.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        if agreed is None:
+            logger.warning(f'Quorum of {quorum} providers is not reached')
+            agreed = list(results)
+        for name in names:
+            if name in agreed:
+                self.program_output(*results[name])
+
+    def missing_provider_output(self, name: str, future):
+        """Print output for the provider which did not finish in time.
+
+        Provider info is filled from stale cache if --stale option is used.
+        """
+
+        if future.done() and not future.cancelled():
+            msg = f'Error during provider: {name} run'
+            if self.options.debug:
+                logger.opt(exception=future.exception()).error(msg)
+            else:
+                logger.error(msg)
+        else:
+            logger.warning(f'Provider {name} did not finish in time')
+
+        provider = self.providermanager[name](self)
+        info = {'Status': 'No data'}
+        if self.options.stale:
+            try:
+                info = provider.run()
+                info['Status'] = 'Stale'
+            except Exception:
+                logger.error(f'No stale cache for provider: {name}')
+
+        self.program_output(provider.title, provider.location, info)
 
     def run(self, argv):
         """Run application.
@@ -180,11 +477,60 @@ class App:
         """
 
         self.delete_invalid_cache()
-
-        self.options, remaining_args = self.arg_parser.parse_known_args(argv)
         self.configure_logging()
+        # providers report configuration errors according to the options
+        self.options, _ = self.arg_parser.parse_known_args(argv)
+        self.migrate_cache_keys()
+
+        try:
+            return self.execute(argv, self.options)
+        finally:
+            self.sweeper.flush()
+
+    def execute(self, argv, options=None):
+        """Parse options and run command or provider.
+
+        Unlike run, cache is not swept and cache keys are not migrated,
+        so the method is used to run commands one after another in the
+        same application.
+
+        :param argv: list of passed arguments
+        :param options: namespace with default values of the options
+        :type options: `argparse.Namespace`
+        """
+
+        self.options, remaining_args = self.arg_parser.parse_known_args(argv,
+                                                                        options)
         logger.debug(f'Got the following args: {argv}')
-        command_name = self.options.command
+        # state of the previous run, e.g. the cancelled deadline of --quorum
+        self.deadline = None
+        self.rate_limiter = None
+        self.hedging = Hedging(self.health) if self.options.hedge else None
+        if self.options.record or self.options.replay:
+            use_cassette(self.session, self.options.record or self.options.replay,
+                         record=bool(self.options.record),
+                         latency=self.options.replay_latency,
+                         jitter=self.options.replay_jitter)
+        else:
+            stop_cassette(self.session)
+
+        profiler = nullcontext()
+        if self.options.profile_cpu:
+            profiler = profiling.Profiler(self.options.profile_cpu,
+                                          self.options.profile_memory)
+        with profiler:
+            try:
+                return self.dispatch(self.options.command, remaining_args)
+            finally:
+                self.flush_output()
+                self.freshness.save()
+
+    def dispatch(self, command_name, remaining_args):
+        """Run command or provider by name.
+
+        :param command_name: command or provider name
+        :param remaining_args: arguments for the command
+        """
 
         if not command_name:
             # run all providers
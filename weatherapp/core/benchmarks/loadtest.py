@@ -0,0 +1,259 @@
+"""Load test of the provider stack with synthetic locations.
+
+Synthetic pages with the markup built-in providers expect are served by
+the local HTTP stub with configurable latency and error rate. Requests
+to the provider sites are redirected to the stub, and the providers are
+run for increasing numbers of locations. For every scale the report
+shows throughput, latency percentiles, errors, peak RSS and the number
+of open file descriptors, so the numbers can be plotted as scaling
+curves (see --csv option).
+
+Usage:
+    python -m weatherapp.core.benchmarks.loadtest --scales 10 1000 10000
+"""
+
+import argparse
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from weatherapp.core.app import App
+from weatherapp.core.health import percentile
+
+PROVIDER_URLS = {
+    'accu': 'https://www.accuweather.com/en/ua/location-{index}/{index}/weather-forecast/{index}',
+    'rp5': 'https://rp5.ua/Weather_in_location_{index}',
+    'sinoptik': 'https://ua.sinoptik.ua/погода-location-{index}',
+}
+PAGE_FILLER = '<p class="text">Weather forecast for the location.</p>\n' * 200
+
+
+def make_page(path: str) -> str:
+    """Return synthetic page for the provider page path."""
+
+    index = int(''.join(char for char in path.rsplit('/', 1)[-1]
+                        if char.isdigit()) or 0)
+    temp = index % 30 - 10
+    if '/current-weather/' in path:
+        body = (f'<div class="card-content"><div class="display-temp">{temp}°'
+                f'<span class="after-temp">C</span></div>'
+                f'<div class="current-weather-extra">RealFeel® {temp - 2}°</div>'
+                f'</div><div class="phrase">Cloudy</div>')
+    elif path.startswith('/en/ua/location-'):
+        body = (f'<a class="cur-con-weather-card card-module" '
+                f'href="/en/ua/location-{index}/current-weather/{index}">'
+                f'<div>{temp}°</div></a>')
+    elif path.startswith('/Weather_in_location_'):
+        body = (f'<div class="ArchiveTemp"><span class="t_0">{temp:+d} °C</span>'
+                f'</div><div id="forecastShort-content"><b>Cloudy, '
+                f'{temp:+d}..{temp + 4:+d} °C, no precipitation, wind south, '
+                f'5 m/s. Tomorrow: {temp + 1:+d} °C</b>'
+                f'<span class="t_0">{temp + 4:+d} °C</span></div>')
+    else:
+        body = (f'<div class="imgBlock"><p class="today-temp">{temp:+d}°C</p>'
+                f'<img src="c.gif" alt="Cloudy"></div><div class="main loaded">'
+                f'<div class="min">min. {temp:+d}°</div>'
+                f'<div class="max">max. {temp + 4:+d}°</div></div>')
+    return f'<html><body>{body}{PAGE_FILLER}</body></html>'
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """Serves synthetic pages with injected latency and errors."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        if random.random() < server.error_rate:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = make_page(unquote(self.path).replace('//', '/')).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class OriginAdapter(HTTPAdapter):
+    """Sends requests to any site to the local stub origin."""
+
+    def __init__(self, origin: str, pool_size: int):
+        super().__init__(pool_connections=1, pool_maxsize=pool_size)
+        self.origin = urlsplit(origin)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        request.url = urlunsplit((self.origin.scheme, self.origin.netloc,
+                                  url.path, url.query, ''))
+        return super().send(request, **kwargs)
+
+
+class ResourceSampler:
+    """Samples resident memory and open file descriptors of the process."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_fds = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        """Update peak values with the current ones (Linux only)."""
+
+        try:
+            with open('/proc/self/statm') as statm:
+                rss = int(statm.read().split()[1]) * resource.getpagesize()
+            fds = len(os.listdir('/proc/self/fd'))
+        except OSError:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            fds = 0
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_fds = max(self.peak_fds, fds)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def make_locations(count: int) -> list:
+    """Return synthetic locations spread evenly between the providers."""
+
+    names = sorted(PROVIDER_URLS)
+    locations = []
+    for index in range(count):
+        name = names[index % len(names)]
+        locations.append((name, f'Location {index}',
+                          PROVIDER_URLS[name].format(index=index)))
+    return locations
+
+
+def run_location(app, name: str, location: str, url: str) -> float:
+    """Run provider for the location, return time spent (in seconds)."""
+
+    start_time = time.perf_counter()
+    provider = app.providermanager[name](app)
+    provider.location, provider.url = location, url
+    provider.run(refresh=True)
+    return time.perf_counter() - start_time
+
+
+def run_scale(origin: str, count: int, workers: int) -> dict:
+    """Run providers for the number of locations and return the metrics."""
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = home
+        app = App()
+        app.options = app.arg_parser.parse_args([])
+        adapter = OriginAdapter(origin, workers)
+        app.session.mount('http://', adapter)
+        app.session.mount('https://', adapter)
+
+        latencies, errors = [], 0
+        with ResourceSampler() as sampler:
+            start_time = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_location, app, *location)
+                           for location in make_locations(count)]
+                for future in futures:
+                    try:
+                        latencies.append(future.result())
+                    except Exception:
+                        errors += 1
+            elapsed = time.perf_counter() - start_time
+
+    return {
+        'locations': count,
+        'workers': workers,
+        'throughput': count / elapsed,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'errors': errors,
+        'peak_rss_mib': sampler.peak_rss / 1024 / 1024,
+        'peak_fds': sampler.peak_fds,
+    }
+
+
+def main(argv=sys.argv[1:]):
+    """Run load test for every scale and print the report."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', help='Numbers of locations',
+                        type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--workers', help='Number of parallel provider runs',
+                        type=int, default=32)
+    parser.add_argument('--latency', help='Stub response latency (in seconds)',
+                        type=float, default=0.02)
+    parser.add_argument('--jitter', help='Maximum random latency added '
+                                         '(in seconds)',
+                        type=float, default=0.01)
+    parser.add_argument('--error-rate', help='Part of failed stub responses',
+                        type=float, default=0.0)
+    parser.add_argument('--csv', help='Write the report to the CSV file too')
+    args = parser.parse_args(argv)
+
+    logger.disable('weatherapp')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    server.latency, server.jitter = args.latency, args.jitter
+    server.error_rate = args.error_rate
+    threading.Thread(target=server.serve_forever, args=(0.05,),
+                     daemon=True).start()
+    origin = f'http://127.0.0.1:{server.server_address[1]}'
+
+    home = os.environ.get('HOME')
+    rows = []
+    sys.stdout.write(f'{"locations":>10}{"loc/s":>10}{"p50, s":>9}{"p90, s":>9}'
+                     f'{"p99, s":>9}{"errors":>8}{"RSS, MiB":>10}{"fds":>6}\n')
+    try:
+        for count in args.scales:
+            row = run_scale(origin, count, args.workers)
+            rows.append(row)
+            sys.stdout.write(f'{row["locations"]:>10}{row["throughput"]:>10.1f}'
+                             f'{row["p50"]:>9.3f}{row["p90"]:>9.3f}'
+                             f'{row["p99"]:>9.3f}{row["errors"]:>8}'
+                             f'{row["peak_rss_mib"]:>10.1f}{row["peak_fds"]:>6}\n')
+    finally:
+        if home is not None:
+            os.environ['HOME'] = home
+        server.shutdown()
+        server.server_close()
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
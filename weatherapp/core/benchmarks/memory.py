@@ -0,0 +1,112 @@
+"""Memory benchmark for reading and parsing of cached pages.
+
+Compares peak Python allocations (measured with tracemalloc) of the
+legacy page path, where the cache file is read to bytes and decoded to
+a string before parsing, with the memory mapped path used by DiskCache,
+where memoryview of the mapped file is decoded once by the parser.
+Legacy path reads files of the legacy format, the page without header.
+
+Usage:
+    python -m weatherapp.core.benchmarks.memory --pages 50 --size 300
+"""
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from weatherapp.core.caches import DiskCache
+from weatherapp.core.providers import SinoptikWeatherProvider
+
+PAGE_HEAD = ('<html><body><div class="imgBlock">'
+             '<p class="today-temp">+5°C</p><img alt="Хмарно" src="c.gif">'
+             '</div><div class="main loaded"><div class="min">мін. +1°</div>'
+             '<div class="max">макс. +7°</div></div>')
+PAGE_FILLER = '<p class="text">Прогноз погоди у Києві на тиждень.</p>\n'
+
+
+def make_page(size_kb: int) -> bytes:
+    """Return synthetic Sinoptik page of the given size (in KiB)."""
+
+    filler = PAGE_FILLER.encode('utf-8')
+    count = size_kb * 1024 // len(filler) + 1
+    return PAGE_HEAD.encode('utf-8') + filler * count + b'</body></html>'
+
+
+def measure(func, *args) -> int:
+    """Return peak memory allocated by the function call (in bytes)."""
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def legacy_load(path: Path) -> str:
+    """Read and decode the page the way it was done before mmap cache.
+
+    :param path: legacy cache file, which holds the page only
+    """
+
+    with path.open('rb') as cache_file:
+        return cache_file.read().decode('utf-8')
+
+
+def mmap_load(cache: DiskCache, key: str) -> str:
+    """Decode the page from memory mapped cache file."""
+
+    return str(cache.get(key).value, 'utf-8')
+
+
+def legacy_parse(path: Path) -> dict:
+    """Read, decode and parse the page the legacy way."""
+
+    return SinoptikWeatherProvider.plan.extract(legacy_load(path))
+
+
+def mmap_parse(cache: DiskCache, key: str) -> dict:
+    """Parse the page right from the memory mapped cache file."""
+
+    return SinoptikWeatherProvider.plan.extract(cache.get(key).value)
+
+
+def main(argv=sys.argv[1:]):
+    """Run benchmark and print average peak allocations per page."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', help='Number of cached pages',
+                        type=int, default=20)
+    parser.add_argument('--size', help='Page size (in KiB)',
+                        type=int, default=300)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCache(Path(cache_dir) / 'mmap')
+        legacy_dir = Path(cache_dir) / 'legacy'
+        legacy_dir.mkdir()
+        keys = [f'{index:032x}' for index in range(args.pages)]
+        for key in keys:
+            page = make_page(args.size)
+            cache.set(key, page)
+            (legacy_dir / key).write_bytes(page)
+
+        stages = (
+            ('load', legacy_load, mmap_load),
+            ('load + parse', legacy_parse, mmap_parse),
+        )
+        sys.stdout.write(f'{"stage":<14}{"legacy KiB":>12}{"mmap KiB":>12}\n')
+        for stage, legacy, mapped in stages:
+            legacy_peak = sum(measure(legacy, legacy_dir / key)
+                              for key in keys) / len(keys)
+            mmap_peak = sum(measure(mapped, cache, key)
+                            for key in keys) / len(keys)
+            sys.stdout.write(f'{stage:<14}{legacy_peak / 1024:>12.1f}'
+                             f'{mmap_peak / 1024:>12.1f}\n')
+
+
+if __name__ == '__main__':
+    main()
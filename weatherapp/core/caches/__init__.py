@@ -0,0 +1,3 @@
+from weatherapp.core.caches.disk import DiskCache, read_legacy_entry
+from weatherapp.core.caches.redis import RedisCache
+from weatherapp.core.caches.tiered import TieredCache
@@ -0,0 +1,134 @@
+"""Local disk cache backend for the weather application."""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from weatherapp.core import config
+from weatherapp.core.abstract import CacheBackend, CacheEntry
+
+# magic, value checksum (CRC-32), value length, stored_at, ttl
+HEADER = struct.Struct('<4sIQdd')
+MAGIC = b'WAC1'
+FSYNC_NONE = 'none'  # rename only, survives crash of the process
+FSYNC_FILE = 'file'  # sync file data before rename, survives power loss
+FSYNC_DIR = 'dir'  # sync cache directory after rename too
+
+
+def read_legacy_entry(path: Path):
+    """Return entry of the cache file written before files got the header.
+
+    Such file holds the page only, the page was stored when the file was
+    modified. Returns None if there is no file or it has the header.
+    """
+
+    try:
+        with path.open('rb') as cache_file:
+            value = cache_file.read()
+            stored_at = os.fstat(cache_file.fileno()).st_mtime
+    except FileNotFoundError:
+        return None
+    if value.startswith(MAGIC):
+        return None
+    return CacheEntry(value, stored_at, config.CACHE_TIME)
+
+
+class DiskCache(CacheBackend):
+    """Keeps cache entries as files in the cache directory.
+
+    Every file starts with a header which holds the value length and
+    checksum, the time the value was stored and its ttl. Files are
+    written to a temporary file, synced according to config.CACHE_FSYNC
+    and then renamed, so readers in any process see either the old or
+    the new complete file and need no locks. Files which are truncated,
+    have wrong length or checksum (with config.CACHE_VERIFY_CHECKSUM)
+    or have no header at all are treated as missing.
+
+    Files are read through memory map, entry value is a memoryview of
+    the mapped file, so the page is not copied on read, and the mapped
+    file is never truncated by the writer.
+
+    :param cache_dir: path to the cache directory
+    :type cache_dir: `pathlib.Path`
+    :param sweeper: sweeper which is notified about cache hits, written
+        and deleted files
+    :type sweeper: `weatherapp.core.cachesweeper.CacheSweeper`
+    """
+
+    def __init__(self, cache_dir: Path, sweeper=None):
+        self.cache_dir = cache_dir
+        self.sweeper = sweeper
+
+    def get(self, key: str):
+        """Return cache entry by key, None if there is no valid entry."""
+
+        cache_path = self.cache_dir / key
+        try:
+            with cache_path.open('rb') as cache_file:
+                size = os.fstat(cache_file.fileno()).st_size
+                if size < HEADER.size:
+                    return None
+                mapped = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        magic, checksum, length, stored_at, ttl = HEADER.unpack_from(mapped)
+        value = memoryview(mapped)[HEADER.size:]
+        if magic != MAGIC or length != len(value):
+            return None
+        if config.CACHE_VERIFY_CHECKSUM and zlib.crc32(value) != checksum:
+            return None
+
+        if self.sweeper:
+            self.sweeper.record_hit(key)
+        return CacheEntry(value, stored_at, ttl)
+
+    def set(self, key: str, value: bytes, ttl: float = None,
+            stored_at: float = None):
+        """Save value to the cache file."""
+
+        if not self.cache_dir.exists():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        header = HEADER.pack(MAGIC, zlib.crc32(value), len(value),
+                             time.time() if stored_at is None else stored_at,
+                             config.CACHE_TIME if ttl is None else ttl)
+        tmp_path = self.cache_dir / f'.{key}.{os.getpid()}.{threading.get_ident()}'
+        try:
+            with tmp_path.open('wb') as cache_file:
+                cache_file.write(header)
+                cache_file.write(value)
+                if config.CACHE_FSYNC != FSYNC_NONE:
+                    cache_file.flush()
+                    os.fsync(cache_file.fileno())
+            os.replace(tmp_path, self.cache_dir / key)
+        except BaseException:
+            # partly written file is not left in the cache directory
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if self.sweeper:
+            self.sweeper.record_set(key)
+
+        if config.CACHE_FSYNC == FSYNC_DIR:
+            directory = os.open(self.cache_dir, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    def delete(self, key: str):
+        """Delete cache file."""
+
+        try:
+            os.remove(self.cache_dir / key)
+        except FileNotFoundError:
+            pass
+        if self.sweeper:
+            self.sweeper.record_delete(key)
@@ -0,0 +1,137 @@
+"""Shared cache backend which uses Redis protocol.
+
+Any server which speaks Redis protocol (RESP) and supports GET, SET with
+EX option and DEL commands can be used.
+"""
+
+import socket
+import struct
+import threading
+import time
+from urllib.parse import urlsplit
+
+from weatherapp.core import config
+from weatherapp.core.abstract import CacheBackend, CacheEntry, CacheError
+
+HEADER = struct.Struct('!dd')  # stored_at, ttl
+
+
+class RedisCache(CacheBackend):
+    """Keeps cache entries on the key-value server.
+
+    Every value is stored with a header which contains the time it was
+    stored and its ttl, so the ttl is propagated to other tiers. Entries
+    are kept on the server for config.DAY_IN_SECONDS to serve as stale
+    cache.
+
+    :param host: server host
+    :type host: str
+    :param port: server port
+    :type port: int
+    :param db: database number
+    :type db: int
+    :param prefix: prefix for all keys
+    :type prefix: str
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 prefix: str = 'weatherapp:'):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.prefix = prefix
+        self._local = threading.local()  # connection per thread
+
+    @classmethod
+    def from_url(cls, url: str):
+        """Create backend from url in redis://host:port/db format."""
+
+        parts = urlsplit(url)
+        return cls(host=parts.hostname or 'localhost',
+                   port=parts.port or 6379,
+                   db=int(parts.path.strip('/') or 0))
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port),
+                                        timeout=config.CACHE_SERVER_TIMEOUT)
+        self._local.sock = sock
+        self._local.reader = sock.makefile('rb')
+        if self.db:
+            self.execute('SELECT', str(self.db))
+
+    def close(self):
+        """Close connection of the current thread."""
+
+        sock = getattr(self._local, 'sock', None)
+        if sock:
+            self._local.reader.close()
+            sock.close()
+            self._local.sock = None
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        reader = self._local.reader
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by cache server')
+
+        kind, data = line[:1], line[1:-2]
+        if kind == b'+':
+            return data.decode('utf-8')
+        if kind == b'-':
+            raise CacheError(data.decode('utf-8'))
+        if kind == b':':
+            return int(data)
+        if kind == b'$':
+            length = int(data)
+            if length < 0:
+                return None
+            return reader.read(length + 2)[:-2]
+        if kind == b'*':
+            return [self._read_reply() for _ in range(int(data))]
+        raise CacheError(f'Unknown reply from cache server: {line!r}')
+
+    def execute(self, *args):
+        """Send command to the server and return its reply."""
+
+        try:
+            if getattr(self._local, 'sock', None) is None:
+                self._connect()
+            self._local.sock.sendall(self._encode(*args))
+            return self._read_reply()
+        except OSError as error:
+            self.close()
+            raise CacheError(f'Cache server {self.host}:{self.port} '
+                             f'is not available') from error
+
+    def get(self, key: str):
+        """Return cache entry by key, None if there is no entry."""
+
+        data = self.execute('GET', self.prefix + key)
+        if not data or len(data) < HEADER.size:
+            return None
+
+        stored_at, ttl = HEADER.unpack_from(data)
+        return CacheEntry(memoryview(data)[HEADER.size:], stored_at, ttl)
+
+    def set(self, key: str, value: bytes, ttl: float = None,
+            stored_at: float = None):
+        """Save value on the server."""
+
+        ttl = config.CACHE_TIME if ttl is None else ttl
+        header = HEADER.pack(stored_at or time.time(), ttl)
+        self.execute('SET', self.prefix + key, header + value,
+                     'EX', str(config.DAY_IN_SECONDS))
+
+    def delete(self, key: str):
+        """Delete entry from the server."""
+
+        self.execute('DEL', self.prefix + key)
@@ -0,0 +1,67 @@
+"""Two-tier cache backend for the weather application."""
+
+import time
+
+from loguru import logger
+
+from weatherapp.core import config
+from weatherapp.core.abstract import CacheBackend, CacheError
+
+
+class TieredCache(CacheBackend):
+    """Near (local) cache tier in front of the shared far tier.
+
+    Entries are looked up in the near tier first, the far tier is used
+    when near entry is missing or expired. Entries found in the far tier
+    are copied to the near tier with the same stored time and ttl.
+    When the far tier is not available only the near tier is used until
+    config.CACHE_SERVER_RETRY seconds pass.
+
+    :param near: local cache backend
+    :type near: `weatherapp.core.abstract.CacheBackend`
+    :param far: shared cache backend
+    :type far: `weatherapp.core.abstract.CacheBackend`
+    """
+
+    def __init__(self, near: CacheBackend, far: CacheBackend):
+        self.near = near
+        self.far = far
+        self._far_retry_at = 0.0
+
+    def _call_far(self, method: str, *args, **kwargs):
+        if time.monotonic() < self._far_retry_at:
+            return None
+        try:
+            return getattr(self.far, method)(*args, **kwargs)
+        except CacheError as error:
+            logger.warning(f'{error}, local cache is used')
+            self._far_retry_at = time.monotonic() + config.CACHE_SERVER_RETRY
+            return None
+
+    def get(self, key: str):
+        """Return cache entry from the near or the far tier."""
+
+        entry = self.near.get(key)
+        if entry and entry.is_valid():
+            return entry
+
+        far_entry = self._call_far('get', key)
+        if far_entry and (entry is None or far_entry.stored_at > entry.stored_at):
+            self.near.set(key, far_entry.value, ttl=far_entry.ttl,
+                          stored_at=far_entry.stored_at)
+            return far_entry
+        return entry
+
+    def set(self, key: str, value: bytes, ttl: float = None,
+            stored_at: float = None):
+        """Save value to both tiers."""
+
+        stored_at = stored_at or time.time()
+        self.near.set(key, value, ttl=ttl, stored_at=stored_at)
+        self._call_far('set', key, value, ttl=ttl, stored_at=stored_at)
+
+    def delete(self, key: str):
+        """Delete entry from both tiers."""
+
+        self.near.delete(key)
+        self._call_far('delete', key)
@@ -0,0 +1,311 @@
+"""Incremental sweeping of the cache directory.
+
+Cache file names are md5 hashes, so the files are spread evenly between
+256 buckets by the first two hex digits of the name. Every sweep step
+checks a bounded number of files, bucket by bucket, starting where the
+previous step stopped. Expired files are deleted and, while the total
+cache size is above the limit, the least valuable files are evicted
+according to the eviction policy:
+
+    lru - least recently used files are evicted first
+    lfu - least frequently used files are evicted first
+
+A step sees only some of the buckets, so files are compared with the
+eviction threshold of the whole cache: the value of the files which had
+to be evicted to keep the cache under the limit on the previous pass
+over the buckets. Only files of lower value are evicted. While the pass
+goes on, the least valuable files seen are collected, and the threshold
+is updated from them once the pass is over.
+
+Sizes of the buckets, names of the files in every bucket and usage
+counters are kept in the sweep state file in the cache directory. Names
+are added and removed as the cache sets and deletes files, so a step
+does not list the directory. The directory is listed only when the
+cursor starts a new pass over the buckets, which picks up files the
+state of another process did not keep.
+
+Sweep runs in the background daemon thread, the application does not
+wait for it on exit: an interrupted step is simply repeated next time.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from weatherapp.core import config
+
+BUCKETS = 256
+LRU = 'lru'
+LFU = 'lfu'
+
+
+def get_bucket(name: str) -> int:
+    """Return bucket number of the cache file, None for other files."""
+
+    try:
+        return int(name[:2], 16) if len(name) >= 32 else None
+    except ValueError:
+        return None
+
+
+def discard_name(names: dict, name: str):
+    """Remove the file name from names by bucket, drop empty buckets."""
+
+    bucket = str(get_bucket(name))
+    if name in names.get(bucket, ()):
+        names[bucket].remove(name)
+        if not names[bucket]:
+            del names[bucket]
+
+
+class CacheSweeper:
+    """Deletes expired cache files and keeps cache size under the limit.
+
+    :param cache_dir: path to the cache directory
+    :type cache_dir: `pathlib.Path`
+    :param max_size: maximum cache size (in bytes)
+    :type max_size: int
+    :param batch_size: maximum number of files checked by one step
+    :type batch_size: int
+    :param policy: eviction policy, 'lru' or 'lfu'
+    :type policy: str
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = None,
+                 batch_size: int = None, policy: str = None):
+        self.cache_dir = cache_dir
+        self.max_size = max_size or config.CACHE_MAX_SIZE
+        self.batch_size = batch_size or config.CACHE_SWEEP_BATCH
+        self.policy = policy or config.CACHE_EVICTION_POLICY
+        self._hits = {}
+        self._added = set()  # names of files set since the state was saved
+        self._deleted = set()  # names of files deleted since then
+        self._lock = threading.Lock()  # guards pending changes above
+        self._state_lock = threading.Lock()  # guards state file updates
+        self._thread = None
+
+    @property
+    def state_path(self) -> Path:
+        """Return path to the sweep state file."""
+
+        return self.cache_dir / config.CACHE_SWEEP_FILE
+
+    def load_state(self) -> dict:
+        """Load sweep state from the file."""
+
+        try:
+            with open(self.state_path) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('cursor', 0)
+        state.setdefault('sizes', {})
+        state.setdefault('hits', {})
+        if state.get('policy') != self.policy:
+            # values of the other policy can not be compared
+            state['policy'] = self.policy
+            state['threshold'] = None
+            state['pass_keys'] = []
+        return state
+
+    def save_state(self, state: dict):
+        """Save sweep state to the file."""
+
+        tmp_path = self.cache_dir / f'{config.CACHE_SWEEP_FILE}.{os.getpid()}'
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.state_path)
+
+    def list_names(self) -> dict:
+        """Return names of the cache files by bucket, listing the directory."""
+
+        names = {}
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                bucket = get_bucket(entry.name)
+                if bucket is not None:
+                    names.setdefault(str(bucket), []).append(entry.name)
+        return names
+
+    def record_hit(self, name: str):
+        """Register usage of the cache file."""
+
+        if self.policy == LFU:
+            with self._lock:
+                self._hits[name] = self._hits.get(name, 0) + 1
+        else:
+            # access time is updated explicitly, mtime is kept for validity
+            path = self.cache_dir / name
+            try:
+                os.utime(path, (time.time(), path.stat().st_mtime))
+            except OSError:
+                pass
+
+    def record_set(self, name: str):
+        """Register the cache file which was written."""
+
+        if get_bucket(name) is not None:
+            with self._lock:
+                self._added.add(name)
+                self._deleted.discard(name)
+
+    def record_delete(self, name: str):
+        """Register the cache file which was deleted."""
+
+        if get_bucket(name) is not None:
+            with self._lock:
+                self._deleted.add(name)
+                self._added.discard(name)
+
+    def update_state(self, update=None):
+        """Apply pending changes and the update function to the state file.
+
+        :param update: function which changes the loaded state in place
+        :type update: callable
+        """
+
+        with self._state_lock:
+            with self._lock:
+                hits, self._hits = self._hits, {}
+                added, self._added = self._added, set()
+                deleted, self._deleted = self._deleted, set()
+            if not (hits or added or deleted or update):
+                return
+
+            state = self.load_state()
+            if update is not None:
+                update(state)
+            for name, count in hits.items():
+                state['hits'][name] = state['hits'].get(name, 0) + count
+            if 'names' in state:
+                names = state['names']
+                for name in added:
+                    bucket = names.setdefault(str(get_bucket(name)), [])
+                    if name not in bucket:
+                        bucket.append(name)
+                for name in deleted:
+                    discard_name(names, name)
+                    state['hits'].pop(name, None)
+            self.save_state(state)
+
+    def start(self):
+        """Run sweep step in the background thread, unless one is running."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.step, daemon=True)
+        self._thread.start()
+
+    def flush(self):
+        """Save usage counters and file names, the sweep is not waited for."""
+
+        if self.cache_dir.exists():
+            try:
+                self.update_state()
+            except OSError:
+                pass  # cache directory was removed meanwhile
+
+    def _eviction_key(self, hits: dict, name: str, stat: os.stat_result):
+        # lists, not tuples, so keys compare the same after the state is saved
+        if self.policy == LFU:
+            return [hits.get(name, 0), stat.st_atime]
+        return stat.st_atime
+
+    def _collect_keys(self, pass_keys: list, excess: int) -> list:
+        """Return the least valuable files which are enough to evict the excess."""
+
+        collected = []
+        for key, size in sorted(pass_keys, key=lambda item: item[0]):
+            if excess <= 0:
+                break
+            collected.append([key, size])
+            excess -= size
+        return collected
+
+    def step(self):
+        """Check next batch of cache files.
+
+        Files are checked without holding the state, the results are
+        applied to the state file at the end of the step.
+        """
+
+        if not self.cache_dir.exists():
+            return
+
+        with self._state_lock:
+            state = self.load_state()
+        cursor, sizes, hits = state['cursor'], dict(state['sizes']), state['hits']
+        threshold, pass_keys = state['threshold'], state['pass_keys']
+        names = state.get('names')
+        listed = names is None or cursor == 0
+        if listed:
+            names = self.list_names()
+
+        now = time.time()
+        checked = 0
+        removed = []
+        for _ in range(BUCKETS):
+            if checked >= self.batch_size:
+                break
+            bucket = str(cursor)
+            cursor = (cursor + 1) % BUCKETS
+
+            bucket_size = 0
+            candidates = []
+            for name in names.get(bucket, []):
+                checked += 1
+                path = self.cache_dir / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    removed.append(name)
+                    continue
+                if now - stat.st_mtime > config.DAY_IN_SECONDS:
+                    self._remove(path)
+                    removed.append(name)
+                    continue
+                bucket_size += stat.st_size
+                candidates.append((self._eviction_key(hits, name, stat),
+                                   stat.st_size, path))
+
+            sizes[bucket] = bucket_size
+            total_size = sum(sizes.values())
+            candidates.sort(key=lambda item: item[0])
+            while (candidates and total_size > self.max_size
+                   and threshold is not None and candidates[0][0] <= threshold):
+                _, size, path = candidates.pop(0)
+                self._remove(path)
+                removed.append(path.name)
+                total_size -= size
+                sizes[bucket] -= size
+
+            pass_keys = self._collect_keys(
+                pass_keys + [[key, size] for key, size, _ in candidates],
+                total_size - self.max_size)
+            if cursor == 0:
+                # pass is over, files up to the last collected one are evicted
+                threshold = pass_keys[-1][0] if pass_keys else None
+                pass_keys = []
+
+        def update(state: dict):
+            state['cursor'] = cursor
+            state['threshold'], state['pass_keys'] = threshold, pass_keys
+            state['sizes'].update(sizes)
+            if listed:
+                state['names'] = names
+            for name in removed:
+                discard_name(state.get('names', {}), name)
+                state['hits'].pop(name, None)
+
+        try:
+            self.update_state(update)
+        except OSError:
+            pass  # cache directory was removed during the step
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
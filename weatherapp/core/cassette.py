@@ -0,0 +1,175 @@
+"""HTTP record and replay for offline runs of the weather application.
+
+In record mode responses of the sites (status, headers, body and the
+time the response took) are saved to the cassette file. In replay mode
+requests are served from the cassette without network, optionally with
+injected latency and jitter, so the whole application run can be
+benchmarked end to end and reproduced on machines without network.
+
+Both modes are implemented as transport adapters of the application
+requests session.
+"""
+
+import base64
+import io
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# headers which describe the encoded body, cassette keeps decoded one
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+class Cassette:
+    """Recorded responses stored in the JSON file.
+
+    :param path: path to the cassette file
+    :type path: `pathlib.Path`
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as cassette_file:
+                self.interactions = json.load(cassette_file)
+        except FileNotFoundError:
+            self.interactions = {}
+
+    @staticmethod
+    def get_key(method: str, url: str) -> str:
+        """Return key of the interaction."""
+
+        return f'{method} {url}'
+
+    def get(self, method: str, url: str) -> dict:
+        """Return recorded interaction, None if there is no such one."""
+
+        return self.interactions.get(self.get_key(method, url))
+
+    def record(self, method: str, url: str, status: int, reason: str,
+               headers: dict, body: bytes, elapsed: float):
+        """Save response to the cassette file."""
+
+        interaction = {
+            'status': status,
+            'reason': reason,
+            'headers': {name: value for name, value in headers.items()
+                        if name.lower() not in SKIPPED_HEADERS},
+            'body': base64.b64encode(body).decode('ascii'),
+            'elapsed': elapsed,
+        }
+        with self._lock:
+            self.interactions[self.get_key(method, url)] = interaction
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}')
+            tmp_path.write_text(json.dumps(self.interactions, indent=1))
+            os.replace(tmp_path, self.path)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests to the network and records responses.
+
+    :param cassette: cassette responses are recorded to
+    :type cassette: `Cassette`
+    """
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start_time = time.perf_counter()
+        response = super().send(request, **kwargs)
+        body = response.content  # read the whole body to record it
+        self.cassette.record(request.method, request.url, response.status_code,
+                             response.reason, response.headers, body,
+                             time.perf_counter() - start_time)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves recorded responses instead of sending requests.
+
+    :param cassette: cassette with recorded responses
+    :type cassette: `Cassette`
+    :param latency: delay of every response (in seconds), recorded
+                    response time is used by default
+    :type latency: float
+    :param jitter: maximum random delay added to the latency (in seconds)
+    :type jitter: float
+    """
+
+    def __init__(self, cassette: Cassette, latency: float = None,
+                 jitter: float = 0):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        interaction = self.cassette.get(request.method, request.url)
+        if interaction is None:
+            raise requests.ConnectionError(
+                f'No recorded response for {request.url}', request=request)
+
+        delay = interaction['elapsed'] if self.latency is None else self.latency
+        delay += random.uniform(0, self.jitter)
+        if isinstance(timeout, tuple):
+            timeout = timeout[-1]
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise requests.Timeout(f'Replayed response for {request.url} '
+                                   f'is late', request=request)
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(base64.b64decode(interaction['body']))
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def use_cassette(session: requests.Session, path: Path, record: bool = False,
+                 latency: float = None, jitter: float = 0):
+    """Record responses of the session to the cassette or replay them.
+
+    :param record: record responses, otherwise replay them
+    :type record: bool
+    """
+
+    cassette = Cassette(path)
+    if record:
+        adapter = RecordingAdapter(cassette)
+    else:
+        adapter = ReplayAdapter(cassette, latency, jitter)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def stop_cassette(session: requests.Session):
+    """Send requests of the session to the network again.
+
+    Default adapters are mounted only instead of the cassette ones, so
+    connections of the session are kept otherwise.
+    """
+
+    for prefix in ('http://', 'https://'):
+        if isinstance(session.adapters.get(prefix), (RecordingAdapter, ReplayAdapter)):
+            session.mount(prefix, HTTPAdapter())
@@ -0,0 +1,67 @@
+"""Change detection for repeatedly collected weather information.
+
+The last reading is kept for every watched location together with the
+hash of the page it was collected from. Pages with the same hash are
+not parsed again, and only new, changed and removed readings are
+reported, so unchanged locations cost the same on every cycle.
+"""
+
+import hashlib
+from collections import namedtuple
+
+from weatherapp.core.freshness import info_hash
+
+NEW = 'new'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+Reading = namedtuple('Reading', 'page_hash info_hash info')
+
+
+def page_hash(page) -> str:
+    """Return hash of the page given as a string or bytes-like object."""
+
+    if isinstance(page, str):
+        page = page.encode('utf-8')
+    return hashlib.blake2b(page, digest_size=16).hexdigest()
+
+
+class ChangeDetector:
+    """Keeps the last reading per location and detects changes."""
+
+    def __init__(self):
+        self.readings = {}  # location key -> Reading
+
+    def __contains__(self, key):
+        return key in self.readings
+
+    def get(self, key) -> Reading:
+        """Return the last reading of the location, None if there is none."""
+
+        return self.readings.get(key)
+
+    def page_changed(self, key, digest: str) -> bool:
+        """Check if the page differs from the one of the last reading."""
+
+        reading = self.readings.get(key)
+        return reading is None or reading.page_hash != digest
+
+    def update(self, key, digest: str, info: dict) -> str:
+        """Register new reading, return kind of the change or None."""
+
+        reading = self.readings.get(key)
+        digest_info = info_hash(info)
+        self.readings[key] = Reading(digest, digest_info, info)
+        if reading is None:
+            return NEW
+        if reading.info_hash != digest_info:
+            return CHANGED
+        return None
+
+    def remove_missing(self, keys) -> list:
+        """Forget locations which are not watched anymore, return their keys."""
+
+        removed = [key for key in self.readings if key not in keys]
+        for key in removed:
+            del self.readings[key]
+        return removed
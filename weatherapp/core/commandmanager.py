@@ -1,7 +1,19 @@
 """Manager for the weather application commands."""
 
-from weatherapp.core.commands import Configure, Providers
 from weatherapp.core.abstract import Manager
+from weatherapp.core.plugins import LazyEntry, COMMANDS_GROUP, iter_entry_points
+
+BUILTIN_COMMANDS = (
+    ('config', 'weatherapp.core.commands.config:Configure'),
+    ('providers', 'weatherapp.core.commands.providers:Providers'),
+    ('warm', 'weatherapp.core.commands.warm:Warm'),
+    ('queue', 'weatherapp.core.commands.workqueue:WorkQueue'),
+    ('freshness', 'weatherapp.core.commands.freshness:Freshness'),
+    ('watch', 'weatherapp.core.commands.watch:Watch'),
+    ('shell', 'weatherapp.core.commands.shell:Shell'),
+    ('forecast', 'weatherapp.core.commands.forecast:Forecast'),
+    ('locate', 'weatherapp.core.commands.locate:Locate'),
+)
 
 
 class CommandManager(Manager):
@@ -22,10 +34,19 @@ class CommandManager(Manager):
         self._commands[name] = command
 
     def _load_commands(self):
-        """Load all external (from an entry points) commands."""
+        """Load built-in and external (from an entry points) commands.
+
+        Command modules are imported only when command is used.
+        """
+
+        for name, target in BUILTIN_COMMANDS:
+            self.add(name, LazyEntry(name, target))
 
-        for command in [Configure, Providers]:
-            self.add(command.name, command)
+        for name, target in iter_entry_points(COMMANDS_GROUP):
+            registered = self._commands.get(name)
+            if isinstance(registered, LazyEntry) and registered.target == target:
+                continue
+            self.add(name, LazyEntry(name, target))
 
     def get(self, name):
         """Gets command from command registry.
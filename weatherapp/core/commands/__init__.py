@@ -1,2 +0,0 @@
-from weatherapp.core.commands.config import Configure
-from weatherapp.core.commands.providers import Providers
@@ -0,0 +1,55 @@
+"""Forecast command class for the weather application."""
+
+from loguru import logger
+
+from weatherapp.core import config
+from weatherapp.core.abstract.command import Command
+
+
+class Forecast(Command):
+    """Shows weather for today and the next days.
+
+    Forecast is read from the same cached page as current weather,
+    AccuWeather needs one more page with the daily forecast.
+    """
+
+    name = 'forecast'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('providers', help='Provider names, all by default',
+                            nargs='*')
+        parser.add_argument('--days', help='Number of days, today included',
+                            type=int, default=config.FORECAST_DAYS)
+        return parser
+
+    def run(self, argv):
+        """Run command."""
+
+        parsed_args = self.get_argument_parser().parse_args(argv)
+        for name, provider in self.app.providermanager:
+            if parsed_args.providers and name not in parsed_args.providers:
+                continue
+            if provider.forecast_plan is None:
+                logger.warning(f'Provider {name} has no forecast')
+                continue
+
+            try:
+                provider = provider(self.app)
+                forecast = provider.run_forecast(parsed_args.days,
+                                                 refresh=self.app.options.refresh)
+            except Exception:
+                msg = f'Error during forecast: {name}'
+                if self.app.options.debug:
+                    logger.exception(msg)
+                else:
+                    logger.error(msg)
+                continue
+
+            for number, day in enumerate(forecast, 1):
+                self.app.program_output(
+                    provider.title,
+                    f'{provider.location}, {day.get("Day", f"day {number}")}',
+                    day)
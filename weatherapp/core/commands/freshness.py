@@ -0,0 +1,28 @@
+"""Cache time statistics command class for the weather application."""
+
+from weatherapp.core.abstract.command import Command
+
+
+class Freshness(Command):
+    """Prints adaptive cache time and change statistics for locations."""
+
+    name = 'freshness'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('providers', help='Provider names, all by default',
+                            nargs='*')
+        return parser
+
+    def run(self, argv):
+        """Prints cache time statistics for every observed location."""
+
+        parsed_args = self.get_argument_parser().parse_args(argv)
+        for url, record in self.app.freshness:
+            if parsed_args.providers and record['provider'] not in parsed_args.providers:
+                continue
+            summary = self.app.freshness.summary(url)
+            self.stdout.write(f'{record["provider"]} {record["location"]}: '
+                              f'{summary}\n')
@@ -0,0 +1,88 @@
+"""Locate command class for the weather application."""
+
+import csv
+from pathlib import Path
+
+from weatherapp.core import config
+from weatherapp.core.abstract.command import Command
+from weatherapp.core.geoindex import GeoIndex, read_places
+
+
+class Locate(Command):
+    """Finds the nearest provider locations for the coordinates.
+
+    Index is built once from CSV file with provider, name, url, latitude,
+    longitude rows, and then read from the disk:
+
+        wfapp locate --build places.csv
+        wfapp locate 50.45 30.52
+        wfapp locate --points points.csv
+    """
+
+    name = 'locate'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('lat', help='Latitude (in degrees)', type=float,
+                            nargs='?')
+        parser.add_argument('lon', help='Longitude (in degrees)', type=float,
+                            nargs='?')
+        parser.add_argument('--providers', help='Provider names, all by default',
+                            nargs='+')
+        parser.add_argument('--build',
+                            help='Build index from CSV file with provider, '
+                                 'name, url, latitude, longitude rows')
+        parser.add_argument('--points',
+                            help='CSV file with latitude, longitude rows, '
+                                 'prints CSV rows with the nearest locations')
+        parser.add_argument('--save', help='Configure providers to the nearest '
+                                           'locations',
+                            action='store_true')
+        parser.add_argument('--index', help='Index file path',
+                            default=str(Path.home() / config.LOCATION_INDEX_FILE))
+        return parser
+
+    def get_providers(self, parsed_args, index: GeoIndex) -> list:
+        """Return names of the providers to look for."""
+
+        return [name for name in index.trees
+                if not parsed_args.providers or name in parsed_args.providers]
+
+    def run(self, argv):
+        """Run command."""
+
+        parser = self.get_argument_parser()
+        parsed_args = parser.parse_args(argv)
+        if parsed_args.build:
+            index = GeoIndex.build(read_places(parsed_args.build))
+            index.save(parsed_args.index)
+            self.stdout.write(f'Indexed {len(index)} locations\n')
+            return
+
+        index = GeoIndex.load(parsed_args.index)
+        providers = self.get_providers(parsed_args, index)
+        if parsed_args.points:
+            writer = csv.writer(self.stdout)
+            with open(parsed_args.points, newline='') as points_file:
+                for row in csv.reader(points_file):
+                    if len(row) < 2 or row[0].startswith('#'):
+                        continue
+                    lat, lon = float(row[0]), float(row[1])
+                    for name in providers:
+                        for place in index.nearest(lat, lon, provider=name):
+                            writer.writerow([lat, lon, *place[:3],
+                                             f'{place.distance:.1f}'])
+            return
+
+        if parsed_args.lat is None or parsed_args.lon is None:
+            parser.error('latitude and longitude are required')
+        for name in providers:
+            for place in index.nearest(parsed_args.lat, parsed_args.lon,
+                                       provider=name):
+                self.stdout.write(f'{name} {place.name}: {place.url} '
+                                  f'({place.distance:.1f} km)\n')
+                if parsed_args.save and name in self.app.providermanager:
+                    self.app.providermanager[name](self.app).save_configuration(
+                        place.name, place.url)
@@ -4,11 +4,12 @@ from weatherapp.core.abstract.command import Command
 
 
 class Providers(Command):
-    """Prints all available providers."""
+    """Prints all available providers and their health state."""
 
     name = 'providers'
 
     def run(self, argv):
-        """Prints provider name and id."""
-        for provider in self.app.providermanager._providers.values():
-            self.stdout.write(f'{provider.title} ({provider.name})\n')
+        """Prints provider name, id and health state."""
+        for name, provider in self.app.providermanager:
+            health = self.app.health.summary(name)
+            self.stdout.write(f'{provider.title} ({provider.name}): {health}\n')
@@ -0,0 +1,105 @@
+"""Interactive shell command class for the weather application."""
+
+import cmd
+import copy
+import shlex
+
+from loguru import logger
+
+from weatherapp.core.abstract.command import Command
+
+APP_COMMANDS = ('clear-cache', 'save-to-csv')
+
+
+class AppShell(cmd.Cmd):
+    """Runs application commands and providers typed by the user.
+
+    :param app: application which runs the commands
+    :type app: `weatherapp.core.app.App`
+    :param options: options the shell was started with, used as defaults
+    :type options: `argparse.Namespace`
+    """
+
+    intro = 'Weather application shell. Type help or ? to list commands.\n'
+    prompt = 'wfapp> '
+
+    def __init__(self, app, options, stdin=None, stdout=None):
+        super().__init__(stdin=stdin, stdout=stdout)
+        self.use_rawinput = stdin is None
+        self.app = app
+        self.options = options
+
+    def get_names(self) -> list:
+        """Return names of providers, commands and shell commands."""
+
+        names = [name for name, _ in self.app.providermanager]
+        names += [name for name, _ in self.app.commandmanager if name != 'shell']
+        names += list(APP_COMMANDS)
+        return names + ['help', 'exit']
+
+    def completenames(self, text, *ignored):
+        return [name for name in self.get_names() if name.startswith(text)]
+
+    def completedefault(self, text, line, begidx, endidx):
+        return [name for name, _ in self.app.providermanager
+                if name.startswith(text)]
+
+    def do_help(self, arg):
+        """List providers and commands, or show help for the shell command."""
+
+        if arg:
+            return super().do_help(arg)
+        self.stdout.write(' '.join(self.get_names()) + '\n')
+
+    def emptyline(self):
+        """Do nothing, instead of repeating the last command."""
+
+    def default(self, line):
+        """Run application with arguments from the line."""
+
+        try:
+            argv = shlex.split(line)
+        except ValueError as error:
+            self.stdout.write(f'{error}\n')
+            return
+
+        if argv and argv[0] == 'shell':
+            self.stdout.write('Shell is already running\n')
+            return
+
+        try:
+            self.app.execute(argv, copy.copy(self.options))
+        except SystemExit:
+            pass  # wrong arguments, the error is already printed
+        except Exception:
+            msg = f'Error during shell command: {line}'
+            if self.app.options.debug:
+                logger.exception(msg)
+            else:
+                logger.error(msg)
+
+    def do_exit(self, arg):
+        """Exit the shell."""
+        return True
+
+    do_EOF = do_exit
+
+
+class Shell(Command):
+    """Interactive shell which keeps the application loaded.
+
+    Providers, commands, configuration, caches and connections to the
+    sites are reused by every command typed in the shell.
+    """
+
+    name = 'shell'
+
+    def run(self, argv):
+        """Run command."""
+
+        self.get_argument_parser().parse_args(argv)
+        stdin = None if self.app.stdin.isatty() else self.app.stdin
+        shell = AppShell(self.app, copy.copy(self.app.options),
+                         stdin=stdin, stdout=self.stdout)
+        shell.cmdloop()
+        self.stdout.write('\n')
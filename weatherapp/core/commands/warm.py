@@ -0,0 +1,83 @@
+"""Cache warming command class for the weather application."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from loguru import logger
+
+from weatherapp.core import config
+from weatherapp.core.abstract.command import Command
+from weatherapp.core.export import open_exporter
+from weatherapp.core.ratelimit import RateLimiter
+
+
+class Warm(Command):
+    """Refreshes cached pages and results for configured locations."""
+
+    name = 'warm'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('providers', help='Provider names, all by default',
+                            nargs='*')
+        parser.add_argument('--workers', help='Number of parallel downloads',
+                            type=int, default=config.WARM_WORKERS)
+        parser.add_argument('--rate', help='Requests per second to one host',
+                            type=float, default=config.WARM_RATE_LIMIT)
+        parser.add_argument('--export',
+                            help='Write weather info to the columnar file '
+                                 '(.parquet, .arrow or .npz)')
+        return parser
+
+    def warm_location(self, name: str, location: str, url: str) -> tuple:
+        """Refresh cache for the location.
+
+        :return: time spent (in seconds) and weather info
+        """
+
+        start_time = time.perf_counter()
+        provider = self.app.providermanager[name](self.app)
+        provider.location, provider.url = location, url
+        weather_info = provider.run(refresh=True)
+        return time.perf_counter() - start_time, weather_info
+
+    def run(self, argv):
+        """Run command."""
+
+        parsed_args = self.get_argument_parser().parse_args(argv)
+        self.app.rate_limiter = RateLimiter(parsed_args.rate)
+        locations = self.app.get_locations(parsed_args.providers)
+
+        # rows are exported as results arrive, by groups of rows
+        exporter = (open_exporter(parsed_args.export) if parsed_args.export
+                    else nullcontext())
+        start_time = time.perf_counter()
+        with exporter, \
+                ThreadPoolExecutor(max_workers=parsed_args.workers) as executor:
+            futures = [executor.submit(self.warm_location, *location)
+                       for location in locations]
+
+            failed = 0
+            for (name, location, _), future in zip(locations, futures):
+                try:
+                    elapsed, weather_info = future.result()
+                except Exception:
+                    failed += 1
+                    msg = f'Error during cache warming: {name} {location}'
+                    if self.app.options.debug:
+                        logger.exception(msg)
+                    else:
+                        logger.error(msg)
+                    self.stdout.write(f'{name} {location}: failed\n')
+                    continue
+
+                self.stdout.write(f'{name} {location}: {elapsed:.2f}s\n')
+                if parsed_args.export:
+                    exporter.add(name, location, weather_info)
+
+        self.stdout.write(f'Warmed {len(locations) - failed} of '
+                          f'{len(locations)} locations in '
+                          f'{time.perf_counter() - start_time:.2f}s\n')
@@ -0,0 +1,139 @@
+"""Watch command class for the weather application."""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from weatherapp.core import config
+from weatherapp.core.abstract.command import Command
+from weatherapp.core.changes import REMOVED, ChangeDetector, page_hash
+from weatherapp.core.workqueue import read_locations
+
+
+class Watch(Command):
+    """Polls locations and prints changed weather info as JSON lines.
+
+    Every line is an object with event ('new', 'changed' or 'removed'),
+    provider, location and info (except for removed locations) keys.
+    """
+
+    name = 'watch'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('providers', help='Provider names, all by default',
+                            nargs='*')
+        parser.add_argument('--locations',
+                            help='CSV file with provider, location, url rows, '
+                                 'read again on every cycle')
+        parser.add_argument('--interval', help='Time between cycles (in seconds)',
+                            type=float, default=config.WATCH_INTERVAL)
+        parser.add_argument('--workers', help='Number of parallel downloads',
+                            type=int, default=config.WATCH_WORKERS)
+        parser.add_argument('--cycles', help='Number of cycles, 0 to run until '
+                                             'interrupted',
+                            type=int, default=0)
+        return parser
+
+    def get_locations(self, parsed_args) -> list:
+        """Return watched locations as (provider name, location, url)."""
+
+        if parsed_args.locations:
+            return [location for location in read_locations(parsed_args.locations)
+                    if not parsed_args.providers
+                    or location[0] in parsed_args.providers]
+        return self.app.get_locations(parsed_args.providers)
+
+    def check_location(self, detector: ChangeDetector, key: tuple) -> str:
+        """Collect weather info for the location if its page has changed.
+
+        The page weather info is read from is hashed (for AccuWeather it
+        is the current day page, not the location page), pages are not
+        hashed while they are served from the cache, and not parsed
+        while their hash stays the same.
+
+        :return: kind of the change, None if the location is unchanged
+        """
+
+        name, location, url = key
+        provider = self.app.providermanager[name](self.app)
+        provider.location, provider.url = location, url
+        targets = provider.streaming_targets if self.app.options.stream else None
+        page = provider.get_page_source(url, targets=targets)
+        data_page = provider.get_data_page(page)
+        if not provider.page_fetched and key in detector:
+            return None
+
+        digest = page_hash(page if data_page is None else data_page)
+        if not detector.page_changed(key, digest):
+            return None
+
+        info = provider.parse_weather_info(page)
+        if not provider.stale_cache_used:
+            ttl = self.app.freshness.observe(url, info, name, location)
+            provider.save_result_cache(url, info, ttl)
+        return detector.update(key, digest, info)
+
+    def emit(self, event: str, key: tuple, info: dict = None):
+        """Print one change as JSON line."""
+
+        name, location, _ = key
+        change = {'event': event, 'provider': name, 'location': location}
+        if info is not None:
+            change['info'] = info
+        self.stdout.write(json.dumps(change, ensure_ascii=False) + '\n')
+
+    def run_cycle(self, detector: ChangeDetector, locations: list,
+                  executor: ThreadPoolExecutor):
+        """Check all locations once and print the changes."""
+
+        keys = [tuple(location) for location in locations]
+        futures = [executor.submit(self.check_location, detector, key)
+                   for key in keys]
+
+        for key, future in zip(keys, futures):
+            try:
+                event = future.result()
+            except Exception:
+                msg = f'Error during watching: {key[0]} {key[1]}'
+                if self.app.options.debug:
+                    logger.exception(msg)
+                else:
+                    logger.error(msg)
+                continue
+            if event:
+                self.emit(event, key, detector.get(key).info)
+
+        for key in detector.remove_missing(set(keys)):
+            self.emit(REMOVED, key)
+        self.stdout.flush()
+        self.app.freshness.save()
+
+    def run(self, argv):
+        """Run command."""
+
+        parsed_args = self.get_argument_parser().parse_args(argv)
+        detector = ChangeDetector()
+
+        cycle = 0
+        with ThreadPoolExecutor(max_workers=parsed_args.workers) as executor:
+            try:
+                while True:
+                    start_time = time.monotonic()
+                    self.run_cycle(detector, self.get_locations(parsed_args),
+                                   executor)
+                    cycle += 1
+                    if parsed_args.cycles and cycle >= parsed_args.cycles:
+                        break
+
+                    # keep cache under the limit while watching
+                    self.app.sweeper.flush()
+                    self.app.sweeper.start()
+                    time.sleep(max(0.0, parsed_args.interval
+                                   - (time.monotonic() - start_time)))
+            except KeyboardInterrupt:
+                pass
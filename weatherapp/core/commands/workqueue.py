@@ -0,0 +1,82 @@
+"""Distributed work queue command class for the weather application."""
+
+from contextlib import nullcontext
+
+from weatherapp.core import config
+from weatherapp.core.abstract.command import Command
+from weatherapp.core.export import open_exporter
+from weatherapp.core.workqueue import (Coordinator, Worker, parse_address,
+                                       read_locations)
+
+
+class WorkQueue(Command):
+    """Runs providers for many locations on a pool of worker nodes.
+
+    Coordinator mode serves the jobs, worker mode processes them:
+
+        wfapp queue coordinator --bind 0.0.0.0:50000 --locations FILE
+        wfapp queue worker --connect coordinator-host:50000
+    """
+
+    name = 'queue'
+
+    def get_argument_parser(self):
+        """Initialize argument parser for command."""
+
+        parser = super().get_argument_parser()
+        parser.add_argument('mode', help='Run mode',
+                            choices=['coordinator', 'worker'])
+        parser.add_argument('--bind', help='Coordinator host:port',
+                            default=f'127.0.0.1:{config.QUEUE_PORT}')
+        parser.add_argument('--connect', help='Coordinator host:port to connect',
+                            default=f'127.0.0.1:{config.QUEUE_PORT}')
+        parser.add_argument('--locations',
+                            help='CSV file with provider, location, url rows, '
+                                 'configured locations by default')
+        parser.add_argument('--workers', help='Number of local workers',
+                            type=int, default=0)
+        parser.add_argument('--timeout', help='Job timeout (in seconds)',
+                            type=float, default=config.QUEUE_JOB_TIMEOUT)
+        parser.add_argument('--attempts', help='Maximum attempts for every job',
+                            type=int, default=config.QUEUE_MAX_ATTEMPTS)
+        parser.add_argument('--export',
+                            help='Write weather info to the columnar file '
+                                 '(.parquet, .arrow or .npz)')
+        return parser
+
+    def run(self, argv):
+        """Run command."""
+
+        parsed_args = self.get_argument_parser().parse_args(argv)
+        if parsed_args.mode == 'worker':
+            return Worker(parse_address(parsed_args.connect), app=self.app).run()
+
+        if parsed_args.locations:
+            locations = read_locations(parsed_args.locations)
+        else:
+            locations = self.app.get_locations()
+
+        coordinator = Coordinator(parse_address(parsed_args.bind),
+                                  job_timeout=parsed_args.timeout,
+                                  max_attempts=parsed_args.attempts)
+
+        # rows are exported as results arrive, by groups of rows
+        exporter = (open_exporter(parsed_args.export) if parsed_args.export
+                    else nullcontext())
+        on_result = None
+        if parsed_args.export:
+            def on_result(job, info, collected_at):
+                exporter.add(job.provider, job.location, info,
+                             timestamp=collected_at)
+
+        with exporter:
+            coordinator.start_local_workers(parsed_args.workers)
+            try:
+                results = coordinator.run(locations, on_result=on_result)
+            finally:
+                coordinator.stop_local_workers()
+
+        for (name, location, _), info in zip(locations, results):
+            self.app.program_output(self.app.providermanager[name].title,
+                                    location,
+                                    info if info is not None else {'Status': 'No data'})
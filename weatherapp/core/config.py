@@ -1,10 +1,13 @@
 """Constants for the weather application project."""
 
+import os
+
 FAKE_MOZILLA_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_13_6)'
 
 # AccuWeather provider related configuration
 ACCU_PROVIDER_NAME = 'accu'  # provider id
 ACCU_PROVIDER_TITLE = 'AccuWeather'  # provider title
+ACCU_SITE = 'https://www.accuweather.com/'  # base of the location links
 DEFAULT_URL_ACCU = 'https://www.accuweather.com/en/ua/kyiv/324505/weather-forecast/324505'
 
 # RP5 provider related configuration
@@ -23,8 +26,86 @@ BROWSE_LOCATIONS = {'accu': 'https://www.accuweather.com/en/browse-locations',
                     'sinoptik': 'https://ua.sinoptik.ua//погода-європа'}
 
 CONFIG_FILE = 'weatherapp.ini'  # configuration file name
+LOCATION_INDEX_FILE = 'weatherapp.geoindex'  # location index file name, kept in home directory
 
 # Cache settings
 CACHE_DIR = '.weatherappcache'  # cache directory name
 CACHE_TIME = 900  # how long cache files are valid (in seconds)
 DAY_IN_SECONDS = 86400  # time during which the cache is not removed
+CACHE_MAX_SIZE = 100 * 1024 * 1024  # maximum cache size (in bytes)
+CACHE_EVICTION_POLICY = 'lru'  # 'lru' - least recently, 'lfu' - least frequently used
+CACHE_SWEEP_BATCH = 200  # maximum number of cache files checked per run
+CACHE_SWEEP_FILE = '.sweep.json'  # sweep state file name, kept in cache directory
+CACHE_KEYS_FILE = '.keys'  # marker of migrated cache keys, kept in cache directory
+CACHE_FSYNC = 'file'  # 'none' - rename only, 'file' - sync file before rename, 'dir' - sync directory too
+CACHE_VERIFY_CHECKSUM = True  # check value checksum on every cache read
+
+# Adaptive cache time settings, cache time follows weather info changes
+CACHE_TIME_MIN = 300  # minimum cache time (in seconds)
+CACHE_TIME_MAX = 3600  # maximum cache time (in seconds)
+CACHE_TIME_GROWTH = 1.5  # cache time multiplier when weather info is unchanged
+FRESHNESS_FILE = 'freshness.json'  # observations file name, kept in cache directory
+FRESHNESS_WINDOW = 10  # number of latest changes used to estimate cache time
+
+# Shared cache server, e.g. redis://localhost:6379/0 (empty to disable)
+CACHE_URL = os.environ.get('WEATHERAPP_CACHE_URL', '')
+CACHE_SERVER_TIMEOUT = 1  # how long to wait for the cache server (in seconds)
+CACHE_SERVER_RETRY = 60  # time before retrying unavailable cache server (in seconds)
+
+# Cache warming settings
+WARM_WORKERS = 8  # number of parallel downloads
+WARM_RATE_LIMIT = 2  # maximum number of requests per second to one host
+
+# Columnar export settings
+EXPORT_BATCH = 10000  # number of rows written at once (row group size)
+
+# Watch mode settings
+WATCH_INTERVAL = 60  # time between polling cycles (in seconds)
+WATCH_WORKERS = 8  # number of parallel downloads
+
+# Forecast settings
+FORECAST_DAYS = 3  # number of days shown by default, today included
+
+# Distributed work queue settings
+QUEUE_PORT = 50000  # coordinator port
+QUEUE_AUTHKEY = os.environ.get('WEATHERAPP_QUEUE_KEY', 'weatherapp').encode()
+QUEUE_JOB_TIMEOUT = 60  # time for worker to finish the job (in seconds)
+QUEUE_MAX_ATTEMPTS = 3  # maximum number of attempts for every job
+QUEUE_POLL = 0.1  # queue polling interval (in seconds)
+
+# Network settings
+REQUEST_TIMEOUT = 10  # how long to wait for the server response (in seconds)
+CHUNK_SIZE = 64 * 1024  # size of the page chunk read at once (in bytes)
+
+# HTTP record and replay settings (--record and --replay options)
+RECORD_FILE = os.environ.get('WEATHERAPP_RECORD', '')  # cassette to record responses to
+REPLAY_FILE = os.environ.get('WEATHERAPP_REPLAY', '')  # cassette to replay responses from
+REPLAY_LATENCY = None  # delay of replayed responses (in seconds), None for recorded time
+REPLAY_JITTER = 0  # maximum random delay added to replayed responses (in seconds)
+
+# Hedged requests settings (--hedge option)
+HEDGE_PERCENTILE = 90  # provider latency percentile after which request is hedged
+HEDGE_MIN_SAMPLES = 10  # number of observed requests needed to hedge
+HEDGE_BUDGET = 0.1  # maximum part of extra (hedged) requests
+
+# Quorum mode settings
+QUORUM_FIELD = 'Temperature'  # field compared by --tolerance
+
+# Parts of the --deadline time budget for every run phase
+DEADLINE_SHARES = {'fetch': 0.7, 'parse': 0.2, 'format': 0.1}
+
+# Profiling settings (--profile-cpu option)
+PROFILE_SAMPLE_INTERVAL = 0.005  # time between call stack samples (in seconds)
+PROFILE_MEMORY_TOP = 30  # number of top memory allocations written
+
+# Logging settings
+LOG_ROUTES = (('DEBUG', 'debug'), ('INFO', 'info'), ('ERROR', 'error'))  # lowest level, file suffix
+LOG_RETENTION = '5 days'  # how long log files are kept
+LOG_ENQUEUE = True  # write log records in the background thread
+LOG_DEBUG_SAMPLE = 10  # write every N-th debug record of the same line (1 for all)
+
+# Provider health settings
+HEALTH_FILE = 'health.json'  # health state file name, kept in cache directory
+HEALTH_WINDOW = 50  # number of latest requests used for health statistics
+CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failures which open the circuit
+CIRCUIT_RESET_TIMEOUT = 300  # time before the probe request (in seconds)
@@ -0,0 +1,76 @@
+"""Time budget for the weather application run.
+
+The budget is split between run phases (fetch, parse and format)
+according to config.DEADLINE_SHARES. Each phase ends at its own point
+of time, so slow downloads can not consume the time reserved for
+parsing and output of the results which are already available.
+"""
+
+import threading
+import time
+
+from weatherapp.core import config
+
+PHASES = ('fetch', 'parse', 'format')
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the run phase did not fit into its time budget."""
+
+
+class Deadline:
+    """Time budget of the application run.
+
+    Deadline can also be cancelled before the budget is over, after that
+    all phases are considered expired.
+
+    :param seconds: total time budget, None means no time limit
+    :type seconds: float
+    :param shares: parts of the budget for every run phase
+    :type shares: dict
+    """
+
+    def __init__(self, seconds: float = None, shares: dict = None):
+        self.seconds = seconds
+        self.start_time = time.monotonic()
+        self._cancelled = threading.Event()
+
+        shares = shares or config.DEADLINE_SHARES
+        self._phase_ends = {}
+        phase_end = 0.0
+        for phase in PHASES:
+            phase_end += shares[phase]
+            self._phase_ends[phase] = phase_end
+
+    def remaining(self, phase: str = 'format') -> float:
+        """Return time left till the end of the phase (in seconds)."""
+
+        if self._cancelled.is_set():
+            return 0.0
+        if self.seconds is None:
+            return float('inf')
+
+        phase_end = self.start_time + self._phase_ends[phase] * self.seconds
+        return max(0.0, phase_end - time.monotonic())
+
+    def expired(self, phase: str = 'format') -> bool:
+        """Check if the phase is over."""
+
+        return self.remaining(phase) <= 0
+
+    def check(self, phase: str = 'format'):
+        """Raise DeadlineExceeded if the phase is over."""
+
+        if self.expired(phase):
+            raise DeadlineExceeded(f'Deadline exceeded during {phase}')
+
+    def cancel(self):
+        """Stop all work which is still running under this deadline."""
+
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Check if deadline was cancelled."""
+
+        return self._cancelled.is_set()
@@ -0,0 +1,189 @@
+"""Columnar export of weather info collected for many locations.
+
+Every field of the weather info is one row with the following typed
+columns: provider, location, timestamp (UTC, in milliseconds), field,
+value (first number of the field text, NaN if there is none) and the
+text itself. Schema is the same for all providers, so rows are buffered
+and written by groups of config.EXPORT_BATCH rows as results arrive.
+
+Format is chosen by the file extension:
+
+    .parquet  Parquet file, a row group per group (pyarrow)
+    .arrow    Arrow IPC file, a record batch per group, can be memory
+              mapped and read zero-copy (pyarrow)
+    .npz      NumPy archive, {column}_{group} array per group (numpy)
+
+pyarrow and numpy are optional and imported when the exporter is
+opened, install them with pip install weatherapp.core[arrow] or
+weatherapp.core[numpy].
+"""
+
+import abc
+import time
+import zipfile
+
+from weatherapp.core import config
+from weatherapp.core.extraction import parse_number
+
+COLUMNS = ('provider', 'location', 'timestamp', 'field', 'value', 'text')
+
+
+class ExportError(Exception):
+    """Raised when export format is unknown or not available."""
+
+
+class ColumnarExporter(abc.ABC):
+    """Buffers rows by columns and writes them by groups.
+
+    :param path: path to the export file
+    :type path: str
+    :param batch_size: number of rows in the group
+    :type batch_size: int
+    """
+
+    def __init__(self, path: str, batch_size: int = None):
+        self.path = path
+        self.batch_size = batch_size or config.EXPORT_BATCH
+        self.rows = 0
+        self.groups = 0
+        self.columns = {column: [] for column in COLUMNS}
+
+    def add(self, provider: str, location: str, info: dict,
+            timestamp: float = None):
+        """Add weather info of the location, write the group if it is full.
+
+        :param timestamp: time the info was collected, now by default
+        :type timestamp: float
+        """
+
+        timestamp = int((time.time() if timestamp is None else timestamp) * 1000)
+        columns = self.columns
+        for field, text in info.items():
+            text = str(text)
+            columns['provider'].append(provider)
+            columns['location'].append(location)
+            columns['timestamp'].append(timestamp)
+            columns['field'].append(field)
+            columns['value'].append(parse_number(text))
+            columns['text'].append(text)
+
+        if len(columns['field']) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as one group."""
+
+        count = len(self.columns['field'])
+        if not count:
+            return
+        self.write_group(self.columns)
+        self.rows += count
+        self.groups += 1
+        self.columns = {column: [] for column in COLUMNS}
+
+    @abc.abstractmethod
+    def write_group(self, columns: dict):
+        """Write group of rows given as lists of column values."""
+
+    def close(self):
+        """Write the rest of rows and close the file."""
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArrowExporter(ColumnarExporter):
+    """Writes groups as Parquet row groups or Arrow record batches."""
+
+    def __init__(self, path: str, batch_size: int = None):
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise ExportError(f'pyarrow is required to export to {path}') from None
+        super().__init__(path, batch_size)
+        self.pyarrow = pyarrow
+
+        string = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        self.schema = pyarrow.schema([
+            ('provider', string),
+            ('location', pyarrow.string()),
+            ('timestamp', pyarrow.timestamp('ms', tz='UTC')),
+            ('field', string),
+            ('value', pyarrow.float64()),
+            ('text', pyarrow.string()),
+        ])
+        if path.endswith('.parquet'):
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+
+    def write_group(self, columns: dict):
+        pyarrow = self.pyarrow
+        batch = pyarrow.record_batch(
+            [pyarrow.array(columns[field.name], type=field.type)
+             for field in self.schema],
+            schema=self.schema)
+        if isinstance(self.writer, pyarrow.parquet.ParquetWriter):
+            self.writer.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+class NumpyExporter(ColumnarExporter):
+    """Writes every group column as .npy member of the archive."""
+
+    def __init__(self, path: str, batch_size: int = None):
+        try:
+            import numpy
+        except ImportError:
+            raise ExportError(f'numpy is required to export to {path}') from None
+        super().__init__(path, batch_size)
+        self.numpy = numpy
+        self.archive = zipfile.ZipFile(path, 'w', allow_zip64=True)
+
+    def write_group(self, columns: dict):
+        numpy = self.numpy
+        arrays = {
+            'provider': numpy.array(columns['provider'], dtype=str),
+            'location': numpy.array(columns['location'], dtype=str),
+            'timestamp': numpy.array(columns['timestamp'], dtype='datetime64[ms]'),
+            'field': numpy.array(columns['field'], dtype=str),
+            'value': numpy.array(columns['value'], dtype=numpy.float64),
+            'text': numpy.array(columns['text'], dtype=str),
+        }
+        for column, array in arrays.items():
+            with self.archive.open(f'{column}_{self.groups}.npy', 'w',
+                                   force_zip64=True) as member:
+                numpy.lib.format.write_array(member, array, allow_pickle=False)
+
+    def close(self):
+        super().close()
+        self.archive.close()
+
+
+EXPORTERS = {
+    '.parquet': ArrowExporter,
+    '.arrow': ArrowExporter,
+    '.npz': NumpyExporter,
+}
+
+
+def open_exporter(path: str, batch_size: int = None) -> ColumnarExporter:
+    """Return exporter for the file format given by its extension."""
+
+    for extension, exporter in EXPORTERS.items():
+        if path.endswith(extension):
+            return exporter(path, batch_size)
+    raise ExportError(f'Unknown export format: {path}, '
+                      f'use one of {", ".join(EXPORTERS)}')
@@ -0,0 +1,356 @@
+"""Declarative extraction of the weather information from pages.
+
+Providers declare the fields they collect as rules: CSS selector of the
+element, attribute to take (element text by default) and optional
+post-processing of the value. Rules are compiled to the extraction plan
+once, when provider class is created.
+
+Simple selectors (tag with classes, id or attribute presence, joined by
+descendant combinators) are also compiled to regular expressions for
+both text and bytes pages, which find the same element right in the raw
+page. Every step of the selector is looked for only inside the element
+found by the previous step, elements end where their closing tag is
+balanced, comments, scripts and styles are skipped. Attribute names are
+matched in any case, values may be double-quoted, single-quoted or
+unquoted, as html.parser reads them. The page is parsed
+to DOM only if some rule is not simple or its element was not found,
+bs4 is imported with the first page which is parsed.
+"""
+
+import html
+import math
+import re
+
+from weatherapp.core import profiling
+
+# inside of the tag, '>' in quoted attribute values does not end it
+TAG_BODY = r'''(?:[^>"']|"[^"]*"|'[^']*')*'''
+UNQUOTED = r'''[^\s"'=<>`]+'''
+TAG = re.compile(rf'</?[a-zA-Z!?]{TAG_BODY}>')
+ATTRIBUTE = re.compile(
+    rf'''\s([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|{UNQUOTED}))?''')
+# comments, scripts and styles may contain markup which is not an element
+SKIP = r'<!--.*?-->|<(script|style)\b.*?</\1\s*>'
+COMPOUND = re.compile(r'([a-z][a-z0-9]*)((?:[.#][\w-]+|\[[\w-]+\])*)')
+PART = re.compile(r'([.#])([\w-]+)|\[([\w-]+)\]')
+# element text which html.parser does not read as plain markup
+RAW_TEXT = re.compile(r'<!|<(?:script|style)\b', re.IGNORECASE)
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img',
+                       'input', 'link', 'meta', 'source', 'track', 'wbr'))
+NUMBER = re.compile(r'[-+−]?\d+(?:[.,]\d+)?')
+
+
+def parse_number(text: str) -> float:
+    """Return the first number of the field text, NaN if there is none."""
+
+    found = NUMBER.search(text)
+    if not found:
+        return math.nan
+    return float(found.group().replace('−', '-').replace(',', '.'))
+
+
+def make_soup(page, encoding: str = 'utf-8'):
+    """Parse page given as a string or bytes-like object.
+
+    Bytes are decoded right into the text parser works with, so
+    memoryview of the cached page is not copied to bytes before.
+
+    :return: `bs4.BeautifulSoup`
+    """
+
+    from bs4 import BeautifulSoup
+
+    with profiling.phase(None, 'soup'):
+        if not isinstance(page, str):
+            page = str(page, encoding)
+        return BeautifulSoup(page, 'html.parser')
+
+
+def start_tag_pattern(compound: str) -> tuple:
+    """Return tag name and regular expression of the start tag.
+
+    :param compound: selector of one element, e.g. 'div.main#now[title]'
+    :type compound: str
+    """
+
+    found = COMPOUND.fullmatch(compound)
+    if not found:
+        raise ValueError(f'Not a simple selector: {compound}')
+
+    tag, parts = found.groups()
+    pattern = f'<(?i:{tag})(?=[\\s/>])'
+    for kind, name, attr in PART.findall(parts):
+        if attr:
+            pattern += rf'(?={TAG_BODY}\s(?i:{re.escape(attr)})[\s=/>])'
+            continue
+
+        name = re.escape(name)
+        if kind == '.':
+            value = (rf'''"(?:[^"]*\s)?{name}[\s"]|'(?:[^']*\s)?{name}[\s']|'''
+                     rf'{name}[\s>]')
+            pattern += rf'(?={TAG_BODY}\s(?i:class)\s*=\s*(?:{value}))'
+        else:
+            value = rf'''"{name}"|'{name}'|{name}[\s>]'''
+            pattern += rf'(?={TAG_BODY}\s(?i:id)\s*=\s*(?:{value}))'
+    return tag, pattern + TAG_BODY + '>'
+
+
+def attribute_value(start_tag: str, attr: str) -> str:
+    """Return value of the attribute of the start tag, None if it is missing.
+
+    Attribute without value is empty, the last one of the same name wins,
+    as with html.parser.
+    """
+
+    value = None
+    for name, quoted in ATTRIBUTE.findall(start_tag):
+        if name.lower() == attr.lower():
+            if quoted[:1] in ('"', "'"):
+                quoted = quoted[1:-1]
+            value = html.unescape(quoted)
+    return value
+
+
+def is_simple(selector: str) -> bool:
+    """Return True if the selector can be found by the `Locator`."""
+
+    return all(COMPOUND.fullmatch(compound) for compound in selector.split())
+
+
+class Locator:
+    """Finds the first element of the simple selector in the raw page.
+
+    :param selector: descendant combination of simple selectors
+    :type selector: str
+    :param encoding: encoding of the bytes pages
+    :type encoding: str
+    """
+
+    def __init__(self, selector: str, encoding: str = 'utf-8'):
+        self.steps = []  # (tag, start patterns, balance patterns) of every step
+        for compound in selector.split():
+            tag, start_tag = start_tag_pattern(compound)
+            start = f'{SKIP}|(?P<element>{start_tag})'
+            balance = f'{SKIP}|<(?P<close>/?)(?i:{tag})(?=[\\s/>]){TAG_BODY}>'
+            self.steps.append((
+                tag,
+                (re.compile(start, re.DOTALL),
+                 re.compile(start.encode(encoding), re.DOTALL)),
+                (re.compile(balance, re.DOTALL),
+                 re.compile(balance.encode(encoding), re.DOTALL)),
+            ))
+
+    def locate(self, page) -> tuple:
+        """Return start of the element, end of its start tag and of its content.
+
+        Every next step is looked for only inside the content of the
+        element found by the previous one. Returns None if some element
+        is not found or its closing tag is missing.
+        """
+
+        index = 0 if isinstance(page, str) else 1
+        start, end = 0, len(page)
+        for tag, starts, balances in self.steps:
+            for found in starts[index].finditer(page, start, end):
+                if found.group('element'):
+                    break
+            else:
+                return None
+
+            tag_start, start = found.span()
+            if tag in VOID_TAGS or found.group()[-2:] in ('/>', b'/>'):
+                end = start
+                continue
+
+            depth = 1
+            for closing in balances[index].finditer(page, start, end):
+                if closing.group('close') is None:
+                    continue
+                if closing.group('close'):
+                    depth -= 1
+                    if not depth:
+                        end = closing.start()
+                        break
+                elif closing.group()[-2:] not in ('/>', b'/>'):
+                    depth += 1
+            else:
+                return None
+        return tag_start, start, end
+
+
+class Rule:
+    """Describes how to extract one field of the weather information.
+
+    :param field: name of the field
+    :type field: str
+    :param selector: CSS selector of the element, or tuple of selectors
+                     when the value is combined from several elements
+    :type selector: str or tuple
+    :param attr: element attribute to take, element text by default
+    :type attr: str
+    :param post: function which converts extracted value(s) to the field
+    :type post: callable
+    """
+
+    def __init__(self, field: str, selector, attr: str = None, post=None):
+        self.field = field
+        self.selectors = (selector,) if isinstance(selector, str) else tuple(selector)
+        self.attr = attr
+        self.post = post
+
+    def convert(self, values: list):
+        """Return field value from the extracted values."""
+
+        if self.post:
+            return self.post(*values)
+        return ' '.join(values)
+
+    def match(self, locators: tuple, page, encoding: str) -> list:
+        """Return values of the elements found in the raw page.
+
+        Returns None if some element is not found or its text is not
+        plain markup, the page has to be parsed then.
+        """
+
+        values = []
+        for locator in locators:
+            found = locator.locate(page)
+            if found is None:
+                return None
+            tag_start, tag_end, content_end = found
+            if self.attr is None:
+                text = page[tag_end:content_end]
+                if not isinstance(text, str):
+                    text = str(text, encoding)
+                if RAW_TEXT.search(text):
+                    return None
+                values.append(html.unescape(TAG.sub('', text)))
+            else:
+                start_tag = page[tag_start:tag_end]
+                if not isinstance(start_tag, str):
+                    start_tag = str(start_tag, encoding)
+                value = attribute_value(start_tag, self.attr)
+                if value is None:
+                    return None
+                values.append(value)
+        return values
+
+    def get_value(self, element) -> str:
+        """Return text or attribute value of the element."""
+
+        return element.text if self.attr is None else element.get(self.attr)
+
+    def select(self, soup) -> list:
+        """Return values of the selected elements, None if not found."""
+
+        values = []
+        for selector in self.selectors:
+            element = soup.select_one(selector)
+            if element is None:
+                return None
+            value = self.get_value(element)
+            if value is None:
+                return None
+            values.append(value)
+        return values
+
+    def select_all(self, soup) -> list:
+        """Return values for every element matched by the selectors."""
+
+        columns = [[self.get_value(element) for element in soup.select(selector)]
+                   for selector in self.selectors]
+        return [None if None in values else list(values)
+                for values in zip(*columns)]
+
+
+class ExtractionPlan:
+    """Compiled set of rules for one kind of the page.
+
+    :param rules: rules for fields, fields are returned in the same order
+    :type rules: `Rule`
+    :param encoding: encoding of the bytes pages
+    :type encoding: str
+    """
+
+    def __init__(self, *rules: Rule, encoding: str = 'utf-8'):
+        self.rules = rules
+        self.encoding = encoding
+        self._locators = []  # locators of rule selectors, None if not simple
+        for rule in rules:
+            if all(map(is_simple, rule.selectors)):
+                self._locators.append(tuple(Locator(selector, encoding)
+                                            for selector in rule.selectors))
+            else:
+                self._locators.append(None)
+
+    def extract(self, page, soup=None) -> dict:
+        """Extract fields from the page given as a string or bytes-like object.
+
+        :param soup: already parsed page, if any
+        :type soup: `bs4.BeautifulSoup`
+        """
+
+        values = {}
+        if soup is None:
+            for rule, locators in zip(self.rules, self._locators):
+                if locators is not None:
+                    values[rule.field] = rule.match(locators, page, self.encoding)
+
+        if not all(values.get(rule.field) for rule in self.rules):
+            if soup is None:
+                soup = make_soup(page, self.encoding)
+            for rule in self.rules:
+                if not values.get(rule.field):
+                    values[rule.field] = rule.select(soup)
+
+        return {rule.field: rule.convert(values[rule.field])
+                for rule in self.rules if values[rule.field] is not None}
+
+
+class ForecastPlan:
+    """Compiled set of rules for the days of the forecast.
+
+    Days are either repeated blocks of the page, then rule selectors are
+    relative to the block, or table columns, then every rule selects
+    values for all days at once and n-th value belongs to n-th day.
+
+    :param rules: rules for fields of every day
+    :type rules: `Rule`
+    :param block: CSS selector of the day block, None for table columns
+    :type block: str
+    :param encoding: encoding of the bytes pages
+    :type encoding: str
+    """
+
+    def __init__(self, *rules: Rule, block: str = None, encoding: str = 'utf-8'):
+        self.rules = rules
+        self.block = block
+        self.encoding = encoding
+
+    def extract(self, page, soup=None) -> list:
+        """Return fields of every forecast day, the first day goes first.
+
+        :param soup: already parsed page, if any
+        :type soup: `bs4.BeautifulSoup`
+        """
+
+        if soup is None:
+            soup = make_soup(page, self.encoding)
+
+        if self.block is not None:
+            days = [{rule.field: rule.select(block) for rule in self.rules}
+                    for block in soup.select(self.block)]
+        else:
+            columns = {rule.field: rule.select_all(soup) for rule in self.rules}
+            count = max(map(len, columns.values()), default=0)
+            days = [{field: values[index] if index < len(values) else None
+                     for field, values in columns.items()}
+                    for index in range(count)]
+
+        forecast = []
+        for values in days:
+            day = {rule.field: rule.convert(values[rule.field])
+                   for rule in self.rules if values[rule.field] is not None}
+            if day:
+                forecast.append(day)
+        return forecast
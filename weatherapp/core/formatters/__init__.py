@@ -1 +1,2 @@
+from weatherapp.core.formatters.grid import GridFormatter
 from weatherapp.core.formatters.table import TableFormatter
@@ -0,0 +1,56 @@
+"""Comparison grid formatter class for the weather application."""
+
+from weatherapp.core.abstract import Formatter
+
+LOCATION = 'Location'  # header of the first column
+
+
+class GridFormatter(Formatter):
+    """Formats results of all providers as one aligned grid.
+
+    Rows are locations, columns are provider fields, e.g. 'RP5 Wind'.
+    Cells and column widths are collected in one pass over the results,
+    then the grid is produced line by line, so output of many locations
+    is neither built as a whole nor split into many small tables.
+    """
+
+    batch = True
+
+    def emit(self, column_names: list, data: dict):
+        """Format weather info of one provider as a grid of one row."""
+
+        title, location = column_names
+        return ''.join(self.emit_rows([(title, location, data)]))
+
+    @staticmethod
+    def emit_rows(results):
+        """Yield lines of the grid for (title, location, info) results."""
+
+        rows = {}  # location -> {column index: value}
+        columns = {}  # (title, field) -> column index
+        widths = [len(LOCATION)]
+        for title, location, info in results:
+            location = str(location)
+            cells = rows.setdefault(location, {})
+            widths[0] = max(widths[0], len(location))
+            for field, value in info.items():
+                column = columns.get((title, field))
+                if column is None:
+                    column = columns[(title, field)] = len(widths)
+                    widths.append(len(f'{title} {field}'))
+                value = str(value)
+                cells[column] = value
+                widths[column] = max(widths[column], len(value))
+
+        border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+\n'
+        headers = [LOCATION] + [f'{title} {field}' for title, field in columns]
+        yield border
+        yield '| ' + ' | '.join(header.ljust(width) for header, width
+                                in zip(headers, widths)) + ' |\n'
+        yield border
+        for location, cells in rows.items():
+            line = [location.ljust(widths[0])]
+            line.extend(cells.get(column, '').ljust(widths[column])
+                        for column in range(1, len(widths)))
+            yield '| ' + ' | '.join(line) + ' |\n'
+        yield border
@@ -0,0 +1,146 @@
+"""Adaptive cache time based on how often weather info really changes.
+
+Every time the page is downloaded and parsed, the hash of collected
+weather info is compared with the previous one for the same url. While
+the info stays the same, cache time of the url grows, so unchanged
+pages are downloaded less often. When the info changes, cache time is
+set to a half of the average observed interval between the changes.
+Cache time is always kept between config.CACHE_TIME_MIN and
+config.CACHE_TIME_MAX.
+
+Observations are persisted in the cache directory and keyed by the
+canonical url, the same as cache entries, so variants of the url share
+one history.
+They are kept in memory and written once per run (see `save`), not on
+every observation.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from weatherapp.core import config
+from weatherapp.core.urls import canonical_url
+
+
+def info_hash(weather_info: dict) -> str:
+    """Return hash of weather info which does not depend on key order."""
+
+    data = json.dumps(weather_info, sort_keys=True).encode('utf-8')
+    return hashlib.md5(data).hexdigest()
+
+
+def clamp_ttl(ttl: float) -> float:
+    """Keep cache time between configured bounds."""
+
+    return max(config.CACHE_TIME_MIN, min(config.CACHE_TIME_MAX, ttl))
+
+
+class FreshnessTracker:
+    """Tracks changes of weather info and cache time for urls.
+
+    :param path: path to the file with persisted observations
+    :type path: `pathlib.Path`
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._state = None
+        self._dirty = False  # observations changed since they were saved
+
+    def _load(self) -> dict:
+        """Load persisted observations on first access."""
+
+        if self._state is None:
+            try:
+                with open(self.path) as freshness_file:
+                    self._state = json.load(freshness_file)
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def save(self):
+        """Persist observations to the file if they have changed."""
+
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            state = json.dumps(self._load())
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}')
+            tmp_path.write_text(state)
+            os.replace(tmp_path, self.path)
+
+    def get(self, url: str) -> dict:
+        """Return observations for the url, None if there are none."""
+
+        with self._lock:
+            return self._load().get(canonical_url(url))
+
+    def __iter__(self):
+        with self._lock:
+            yield from list(self._load().items())
+
+    def ttl(self, url: str) -> float:
+        """Return current cache time for the url (in seconds)."""
+
+        record = self.get(url)
+        return clamp_ttl(record['ttl'] if record else config.CACHE_TIME)
+
+    def observe(self, url: str, weather_info: dict,
+                provider: str = '', location: str = '') -> float:
+        """Register freshly collected weather info, return new cache time.
+
+        :param provider: provider name, used for statistics only
+        :param location: location name, used for statistics only
+        """
+
+        digest = info_hash(weather_info)
+        now = time.time()
+        url = canonical_url(url)
+        with self._lock:
+            state = self._load()
+            record = state.get(url)
+            if record is None:
+                record = state[url] = {
+                    'provider': provider,
+                    'location': location,
+                    'hash': digest,
+                    'changed_at': now,
+                    'fetches': 0,
+                    'changes': 0,
+                    'intervals': [],  # latest intervals between the changes
+                    'ttl': clamp_ttl(config.CACHE_TIME),
+                }
+            elif record['hash'] != digest:
+                intervals = record['intervals'] + [now - record['changed_at']]
+                record['intervals'] = intervals[-config.FRESHNESS_WINDOW:]
+                record['hash'] = digest
+                record['changed_at'] = now
+                record['changes'] += 1
+                record['ttl'] = clamp_ttl(
+                    sum(record['intervals']) / len(record['intervals']) / 2)
+            else:
+                record['ttl'] = clamp_ttl(record['ttl'] * config.CACHE_TIME_GROWTH)
+            record['fetches'] += 1
+            self._dirty = True
+            return record['ttl']
+
+    def summary(self, url: str) -> str:
+        """Return human readable cache time information for the url."""
+
+        record = self.get(url)
+        if record is None:
+            return f'cache time {self.ttl(url):.0f}s, not fetched yet'
+
+        text = (f'cache time {record["ttl"]:.0f}s, {record["fetches"]} fetches, '
+                f'{record["changes"]} changes')
+        if record['intervals']:
+            interval = sum(record['intervals']) / len(record['intervals'])
+            text += f', changes every {interval:.0f}s'
+        return text
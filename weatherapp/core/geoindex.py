@@ -0,0 +1,175 @@
+"""Spatial index of provider locations for nearest location lookup.
+
+Locations are points on the unit sphere (3D vectors), so straight line
+distance between them orders them the same way great circle distance
+does, without trigonometry at query time and without trouble at the
+poles and the antimeridian. Every provider has its own implicit
+KD-tree, a range of the point array: every range is split by its median
+on the axis of the tree level, the median point is the node.
+
+Index file is little-endian and holds the header, float32 coordinates
+in tree order and UTF-8 'provider<TAB>name<TAB>url' lines.
+"""
+
+import csv
+import heapq
+import math
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from pathlib import Path
+
+EARTH_RADIUS = 6371.0  # mean Earth radius (in kilometers)
+HEADER = struct.Struct('<4sHII')  # magic, version, points, text length
+MAGIC = b'WGEO'
+VERSION = 1
+
+Place = namedtuple('Place', 'provider name url distance')
+
+
+def to_vector(lat: float, lon: float) -> tuple:
+    """Return unit vector of the point given in degrees."""
+
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon),
+            math.sin(lat))
+
+
+def chord_to_km(squared_chord: float) -> float:
+    """Convert squared straight line distance to great circle kilometers."""
+
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(squared_chord) / 2))
+
+
+def read_places(path: str) -> list:
+    """Read CSV file with provider, name, url, latitude, longitude rows."""
+
+    with open(path, newline='') as places_file:
+        return [(row[0], row[1], row[2], float(row[3]), float(row[4]))
+                for row in csv.reader(places_file)
+                if len(row) >= 5 and not row[0].startswith('#')]
+
+
+class GeoIndex:
+    """KD-tree of provider locations.
+
+    :param coords: x, y, z of every point in tree order
+    :type coords: `array.array`
+    :param places: (provider, name, url) of every point in tree order
+    :type places: list
+    """
+
+    def __init__(self, coords: array, places: list):
+        self.coords = coords
+        self.places = places
+        self.trees = {}  # provider -> (start, end) of its tree
+        for index, (provider, _, _) in enumerate(places):
+            start, _ = self.trees.get(provider, (index, index))
+            self.trees[provider] = (start, index + 1)
+
+    def __len__(self):
+        return len(self.places)
+
+    @classmethod
+    def build(cls, locations) -> 'GeoIndex':
+        """Build index from (provider, name, url, latitude, longitude)."""
+
+        items = sorted(((to_vector(lat, lon), (provider, name, url))
+                        for provider, name, url, lat, lon in locations),
+                       key=lambda item: item[1][0])
+
+        ranges = []
+        for index, (_, (provider, _, _)) in enumerate(items):
+            if not ranges or items[index - 1][1][0] != provider:
+                ranges.append([index, index, 0])
+            ranges[-1][1] = index + 1
+        while ranges:
+            low, high, axis = ranges.pop()
+            if high - low <= 1:
+                continue
+            items[low:high] = sorted(items[low:high],
+                                     key=lambda item: item[0][axis])
+            middle = (low + high) // 2
+            ranges.append((low, middle, (axis + 1) % 3))
+            ranges.append((middle + 1, high, (axis + 1) % 3))
+
+        coords = array('f', (value for vector, _ in items for value in vector))
+        return cls(coords, [place for _, place in items])
+
+    def save(self, path: Path):
+        """Write index to the file."""
+
+        text = '\n'.join('\t'.join(place) for place in self.places).encode('utf-8')
+        coords = array('f', self.coords)
+        if sys.byteorder == 'big':
+            coords.byteswap()
+        with open(path, 'wb') as index_file:
+            index_file.write(HEADER.pack(MAGIC, VERSION, len(self.places),
+                                         len(text)))
+            index_file.write(coords.tobytes())
+            index_file.write(text)
+
+    @classmethod
+    def load(cls, path: Path) -> 'GeoIndex':
+        """Read index from the file."""
+
+        data = memoryview(Path(path).read_bytes())
+        magic, version, count, text_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a location index')
+
+        start = HEADER.size
+        coords = array('f')
+        coords.frombytes(data[start:start + count * 3 * coords.itemsize])
+        if sys.byteorder == 'big':
+            coords.byteswap()
+        start += count * 3 * coords.itemsize
+        text = str(data[start:start + text_length], 'utf-8')
+        places = [tuple(line.split('\t')) for line in text.split('\n')] if count else []
+        return cls(coords, places)
+
+    def nearest(self, lat: float, lon: float, count: int = 1,
+                provider: str = None) -> list:
+        """Return the nearest locations, the closest goes first.
+
+        :param count: number of locations
+        :type count: int
+        :param provider: look only for locations of the provider
+        :type provider: str
+        """
+
+        target = to_vector(lat, lon)
+        coords, places = self.coords, self.places
+        best = []  # heap of (-squared distance, index)
+
+        # ranges to check with squared distance to their splitting plane
+        if provider is None:
+            ranges = [(*tree, 0, 0.0) for tree in self.trees.values()]
+        else:
+            ranges = [(*self.trees.get(provider, (0, 0)), 0, 0.0)]
+        while ranges:
+            low, high, axis, bound = ranges.pop()
+            if low >= high or (len(best) == count and bound >= -best[0][0]):
+                continue
+            middle = (low + high) // 2
+            offset = middle * 3
+            squared = ((target[0] - coords[offset]) ** 2
+                       + (target[1] - coords[offset + 1]) ** 2
+                       + (target[2] - coords[offset + 2]) ** 2)
+            if len(best) < count:
+                heapq.heappush(best, (-squared, middle))
+            elif squared < -best[0][0]:
+                heapq.heapreplace(best, (-squared, middle))
+
+            diff = target[axis] - coords[offset + axis]
+            near, far = (low, middle), (middle + 1, high)
+            if diff > 0:
+                near, far = far, near
+            next_axis = (axis + 1) % 3
+            # far side is pushed first, so it is checked after the near one
+            ranges.append((*far, next_axis, diff * diff))
+            ranges.append((*near, next_axis, bound))
+
+        return [Place(*places[index], chord_to_km(-squared))
+                for squared, index in sorted(best, reverse=True)]
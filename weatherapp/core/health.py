@@ -0,0 +1,165 @@
+"""Health tracking and circuit breaker for weather providers.
+
+Health state is kept per provider and persisted in the cache directory,
+so it survives between application runs. After a number of consecutive
+failures the provider circuit is opened and requests to the provider
+are skipped until the reset timeout passes. Then a single probe request
+is allowed (half-open state), its result closes or re-opens the circuit.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from weatherapp.core import config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when requests to the provider are blocked by open circuit."""
+
+
+def percentile(values: list, pct: float) -> float:
+    """Return percentile of values using nearest-rank method."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class HealthTracker:
+    """Tracks request outcomes and circuit state for providers.
+
+    :param path: path to the file with persisted health state
+    :type path: `pathlib.Path`
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._state = None
+
+    def _load(self) -> dict:
+        """Load persisted health state on first access."""
+
+        if self._state is None:
+            try:
+                with open(self.path) as health_file:
+                    self._state = json.load(health_file)
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def save(self):
+        """Persist health state to the file."""
+
+        with self._lock:
+            state = json.dumps(self._load())
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}')
+            tmp_path.write_text(state)
+            os.replace(tmp_path, self.path)
+
+    def get(self, name: str) -> dict:
+        """Return health record for the provider."""
+
+        with self._lock:
+            return self._load().setdefault(name, {
+                'state': CLOSED,
+                'failures': 0,  # consecutive failures
+                'opened_at': 0.0,
+                'probe_at': 0.0,
+                'latencies': [],
+                'errors': [],
+                'requests': 0,  # all requests, counted for the hedging budget
+                'hedges': 0,
+            })
+
+    def allow_request(self, name: str) -> bool:
+        """Check if request to the provider may be sent now."""
+
+        with self._lock:
+            record = self.get(name)
+            now = time.time()
+            if record['state'] == CLOSED:
+                return True
+            if record['state'] == OPEN:
+                if now - record['opened_at'] < config.CIRCUIT_RESET_TIMEOUT:
+                    return False
+            elif now - record['probe_at'] < config.CIRCUIT_RESET_TIMEOUT:
+                return False  # other probe request is still running
+
+            record['state'] = HALF_OPEN
+            record['probe_at'] = now
+            self.save()
+            return True
+
+    def record_request(self, name: str):
+        """Count request to the provider, saved with its outcome."""
+
+        with self._lock:
+            record = self.get(name)
+            record['requests'] = record.get('requests', 0) + 1
+
+    def acquire_hedge(self, name: str, budget: float) -> bool:
+        """Count hedged request if it keeps within the budget part of requests."""
+
+        with self._lock:
+            record = self.get(name)
+            hedges = record.get('hedges', 0)
+            if hedges + 1 > budget * record.get('requests', 0):
+                return False
+            record['hedges'] = hedges + 1
+            return True
+
+    def _record(self, name: str, latency: float, error: bool):
+        record = self.get(name)
+        record['latencies'] = (record['latencies'] + [latency])[-config.HEALTH_WINDOW:]
+        record['errors'] = (record['errors'] + [int(error)])[-config.HEALTH_WINDOW:]
+
+    def record_success(self, name: str, latency: float):
+        """Register successful request and close the circuit."""
+
+        with self._lock:
+            self._record(name, latency, error=False)
+            record = self.get(name)
+            record['state'] = CLOSED
+            record['failures'] = 0
+            self.save()
+
+    def record_failure(self, name: str, latency: float):
+        """Register failed request, open circuit if failures repeat."""
+
+        with self._lock:
+            self._record(name, latency, error=True)
+            record = self.get(name)
+            record['failures'] += 1
+            if (record['state'] == HALF_OPEN
+                    or record['failures'] >= config.CIRCUIT_FAILURE_THRESHOLD):
+                record['state'] = OPEN
+                record['opened_at'] = time.time()
+            self.save()
+
+    def summary(self, name: str) -> str:
+        """Return human readable provider health information."""
+
+        with self._lock:
+            record = self.get(name)
+            requests_count = len(record['errors'])
+            if not requests_count:
+                return f'{record["state"]}, no requests yet'
+
+            error_rate = sum(record['errors']) / requests_count
+            latencies = record['latencies']
+            return (f'{record["state"]}, {requests_count} requests, '
+                    f'{error_rate:.0%} errors, '
+                    f'p50 {percentile(latencies, 50):.2f}s, '
+                    f'p90 {percentile(latencies, 90):.2f}s, '
+                    f'p99 {percentile(latencies, 99):.2f}s')
@@ -0,0 +1,168 @@
+"""Hedged requests to cut tail latency of slow providers.
+
+When the request to the provider has not finished within the usual
+time, which is the observed latency percentile of the provider
+(config.HEDGE_PERCENTILE), the second identical request is sent and
+the result of the one which finishes first is used. The other request
+is cancelled: raced requests are sent through their own transport
+adapters, which shut their connections down on cancel, so the request
+stops even if it still waits for the response headers.
+
+Hedged requests are limited by the budget: their number never exceeds
+config.HEDGE_BUDGET part of all requests sent to the provider. Both
+numbers are kept in the provider health state, so the budget spans
+application runs.
+"""
+
+import queue
+import socket
+import threading
+
+from requests.adapters import HTTPAdapter
+
+from weatherapp.core import config
+from weatherapp.core.health import percentile
+
+
+class HedgeCancelled(Exception):
+    """Raised in the request which lost the race to the hedged one."""
+
+
+class CancelEvent(threading.Event):
+    """Cancel event of the raced request, runs callbacks once it is set."""
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def add_callback(self, callback):
+        """Call the function on cancel, right away if cancelled already."""
+
+        with self._callbacks_lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def set(self):
+        with self._callbacks_lock:
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class CancellableAdapter(HTTPAdapter):
+    """Transport adapter of one raced request.
+
+    Connections opened by the adapter are kept, `close` shuts them down,
+    which interrupts the request blocked on reading from the socket.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.connections = []
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        connections = self.connections
+
+        def tracked(pool_class):
+            class TrackedPool(pool_class):
+                def _new_conn(self):
+                    connection = super()._new_conn()
+                    connections.append(connection)
+                    return connection
+            return TrackedPool
+
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: tracked(pool_class) for scheme, pool_class
+            in self.poolmanager.pool_classes_by_scheme.items()}
+
+    def close(self):
+        super().close()
+        for connection in self.connections:
+            sock = connection.sock
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            connection.close()
+
+
+class Hedging:
+    """Sends hedged requests for slow providers within the budget.
+
+    :param health: provider health tracker with observed latencies
+    :type health: `weatherapp.core.health.HealthTracker`
+    :param budget: maximum part of extra requests
+    :type budget: float
+    """
+
+    def __init__(self, health, budget: float = None):
+        self.health = health
+        self.budget = config.HEDGE_BUDGET if budget is None else budget
+
+    def threshold(self, name: str) -> float:
+        """Return time after which request is hedged, None if unknown yet."""
+
+        latencies = self.health.get(name)['latencies']
+        if len(latencies) < config.HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(latencies, config.HEDGE_PERCENTILE)
+
+    def acquire(self, name: str) -> bool:
+        """Take one hedged request from the provider budget if there is room."""
+
+        return self.health.acquire_hedge(name, self.budget)
+
+    def run(self, name: str, request):
+        """Run the request, hedge it if it is slower than usual.
+
+        :param name: provider name
+        :param request: function which gets `CancelEvent` and makes request,
+            it should stop once the event is set; the event is None when
+            the request is not raced
+        :type request: callable
+        :return: result of the request which finished first
+        """
+
+        self.health.record_request(name)
+        threshold = self.threshold(name)
+        if threshold is None:
+            return request(None)
+
+        results = queue.Queue()
+        cancels = []
+
+        def start():
+            cancel = CancelEvent()
+            cancels.append(cancel)
+
+            def target():
+                try:
+                    results.put((None, request(cancel)))
+                except Exception as error:
+                    results.put((error, None))
+
+            threading.Thread(target=target, daemon=True).start()
+
+        start()
+        try:
+            first = [results.get(timeout=threshold)]
+        except queue.Empty:
+            first = []
+            if self.acquire(name):
+                start()
+
+        first_error = None
+        for _ in range(len(cancels)):
+            error, result = first.pop() if first else results.get()
+            if error is None:
+                for cancel in cancels:
+                    cancel.set()
+                return result
+            first_error = first_error or error
+        raise first_error
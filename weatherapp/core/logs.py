@@ -0,0 +1,111 @@
+"""Logging setup for the weather application.
+
+Log records are routed to separate files according to their level
+(config.LOG_ROUTES), every file gets records from its level up to the
+level of the next route. With config.LOG_ENQUEUE records are written by
+the background thread, so fetch and parse threads never wait for disk.
+Debug records of the same source line are sampled, only every
+config.LOG_DEBUG_SAMPLE record is written.
+
+Sinks are added once per process, no matter how many times the
+application is run.
+"""
+
+import sys
+import threading
+
+from loguru import logger
+
+from weatherapp.core import config
+
+_handlers = {}  # log file name prefix -> loguru handler ids
+_default_handler = 0  # id of loguru default stderr sink, None once removed
+_stderr_handler = None  # id of the stderr sink which replaced the default one
+
+
+class DebugSampler:
+    """Log filter which passes every N-th debug record of the source line.
+
+    :param rate: pass one of that many records, 1 passes all of them
+    :type rate: int
+    """
+
+    def __init__(self, rate: int):
+        self.rate = max(1, rate)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record) -> bool:
+        if self.rate == 1 or record['level'].name != 'DEBUG':
+            return True
+
+        key = (record['name'], record['line'])
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.rate == 0
+
+
+def level_filter(low: int, high: int, sampler: DebugSampler):
+    """Return filter which passes records with low <= level < high."""
+
+    def filter_record(record) -> bool:
+        return low <= record['level'].no < high and sampler(record)
+
+    return filter_record
+
+
+def configure(fname: str):
+    """Add log sinks for the file name prefix unless they are added already.
+
+    Every sink has its own sampler, so a record is counted once per sink.
+    """
+
+    global _default_handler, _stderr_handler
+
+    if fname in _handlers:
+        return
+
+    handlers = []
+    if _default_handler is not None:
+        # default stderr sink writes synchronously, replace it once
+        try:
+            logger.remove(_default_handler)
+        except ValueError:
+            pass
+        else:
+            _stderr_handler = logger.add(
+                sys.stderr, filter=DebugSampler(config.LOG_DEBUG_SAMPLE),
+                enqueue=config.LOG_ENQUEUE)
+            handlers.append(_stderr_handler)
+        _default_handler = None
+
+    levels = [logger.level(level).no for level, _ in config.LOG_ROUTES]
+    for index, (_, suffix) in enumerate(config.LOG_ROUTES):
+        high = levels[index + 1] if index + 1 < len(levels) else float('inf')
+        handlers.append(logger.add(
+            f'{fname}_{suffix}_{{time:MM:DD}}.log',
+            filter=level_filter(levels[index], high,
+                                DebugSampler(config.LOG_DEBUG_SAMPLE)),
+            level=levels[index],
+            retention=config.LOG_RETENTION,
+            enqueue=config.LOG_ENQUEUE))
+    _handlers[fname] = handlers
+
+
+def reset():
+    """Remove sinks added by configure, restore the default stderr sink."""
+
+    global _default_handler, _stderr_handler
+
+    logger.complete()
+    for handlers in _handlers.values():
+        for handler_id in handlers:
+            try:
+                logger.remove(handler_id)
+            except ValueError:
+                pass
+    _handlers.clear()
+    if _stderr_handler is not None:
+        _default_handler = logger.add(sys.stderr)
+        _stderr_handler = None
@@ -0,0 +1,89 @@
+"""Discovery of providers and commands registered as entry points.
+
+Plugins are registered in the following setuptools entry point groups:
+
+    weatherapp.providers = <provider name> = <module>:<class>
+    weatherapp.commands = <command name> = <module>:<class>
+
+Only entry point metadata is read during discovery, the module which
+holds a plugin class is imported the first time the class is used.
+"""
+
+import importlib
+from importlib import metadata
+
+PROVIDERS_GROUP = 'weatherapp.providers'
+COMMANDS_GROUP = 'weatherapp.commands'
+
+
+def iter_entry_points(group: str):
+    """Yield (name, target) pairs registered in entry points group."""
+
+    try:
+        entry_points = metadata.entry_points(group=group)
+    except TypeError:  # Python < 3.10 returns dict of groups
+        entry_points = metadata.entry_points().get(group, ())
+
+    for entry_point in entry_points:
+        yield entry_point.name, entry_point.value
+
+
+class LazyEntry:
+    """Plugin class placeholder which imports the class on first use.
+
+    Calling the entry instantiates the plugin class, so the entry can be
+    used in place of the class itself.
+
+    :param name: plugin name (provider or command id)
+    :type name: str
+    :param target: import path of the plugin class in 'module:attr' form
+    :type target: str
+    :param title: plugin title, known without import for built-in plugins
+    :type title: str
+    """
+
+    def __init__(self, name: str, target: str, title: str = None):
+        self.name = name
+        self.target = target
+        self._title = title
+        self._plugin = None
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the plugin module was already imported."""
+
+        return self._plugin is not None
+
+    def load(self):
+        """Import plugin module and return plugin class."""
+
+        if self._plugin is None:
+            module_name, _, attrs = self.target.partition(':')
+            plugin = importlib.import_module(module_name)
+            for attr in attrs.split('.'):
+                plugin = getattr(plugin, attr)
+            self._plugin = plugin
+        return self._plugin
+
+    @property
+    def title(self) -> str:
+        """Return plugin title.
+
+        External plugins do not provide a title in the entry point
+        metadata, so their module is imported to get one.
+        """
+
+        if self._title is None:
+            self._title = self.load().title
+        return self._title
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name!r}, {self.target!r})'
@@ -0,0 +1,218 @@
+"""CPU and memory profiling of the weather application run.
+
+Profiler writes the following files for the path prefix:
+
+    {prefix}.pstats     cProfile statistics of all threads (pstats format)
+    {prefix}.collapsed  sampled call stacks in collapsed format, ready for
+                        flamegraph.pl or speedscope
+    {prefix}.phases     wall and CPU time of every provider run phase
+    {prefix}.memory     top memory allocations (with tracemalloc only)
+
+Run phases are marked with phase context manager, which does nothing
+unless profiler is running. Nested phases pause the outer one, so the
+time of the page fetched while parsing is counted as fetch.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from weatherapp.core import config
+
+_active = None  # running profiler
+_local = threading.local()
+
+
+class Phase:
+    """Measures wall and CPU time of the provider run phase."""
+
+    def __init__(self, name: str, phase_name: str):
+        self.name = name
+        self.phase = phase_name
+        self.wall = self.cpu = 0.0
+        self._wall_start = self._cpu_start = 0.0
+
+    def pause(self):
+        """Stop counting time, e.g. while nested phase runs."""
+
+        self.wall += time.perf_counter() - self._wall_start
+        self.cpu += time.thread_time() - self._cpu_start
+
+    def resume(self):
+        """Start counting time."""
+
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault('phases', [])
+        if self.name is None:
+            self.name = stack[-1].name if stack else ''
+        if stack:
+            stack[-1].pause()
+        stack.append(self)
+        self.resume()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pause()
+        stack = _local.phases
+        stack.pop()
+        if stack:
+            stack[-1].resume()
+        profiler = _active
+        if profiler is not None:
+            profiler.add_phase(self.name, self.phase, self.wall, self.cpu)
+
+
+class _NoPhase:
+    """Phase used when profiler is not running."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str, phase_name: str):
+    """Mark the run phase of the provider, e.g. fetch, parse or format.
+
+    :param name: provider name, name of the outer phase if None
+    :param phase_name: phase name
+    """
+
+    if _active is None:
+        return _NO_PHASE
+    return Phase(name, phase_name)
+
+
+class Profiler:
+    """Profiles the code which runs inside the context.
+
+    :param prefix: path prefix of the profile files
+    :type prefix: str
+    :param trace_memory: record memory allocations with tracemalloc
+    :type trace_memory: bool
+    """
+
+    def __init__(self, prefix: str, trace_memory: bool = False):
+        self.prefix = prefix
+        self.trace_memory = trace_memory
+        self.phases = {}  # (provider, phase) -> [calls, wall, cpu]
+        self.stacks = Counter()
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def add_phase(self, name: str, phase_name: str, wall: float, cpu: float):
+        """Register time spent in the provider run phase."""
+
+        with self._lock:
+            totals = self.phases.setdefault((name, phase_name), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+
+    def _profile_thread(self, *args):
+        """Start cProfile in the new thread (before python 3.12)."""
+
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def _sample_stacks(self):
+        """Collect call stacks of all threads until profiler is stopped."""
+
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(config.PROFILE_SAMPLE_INTERVAL):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename}:'
+                                 f'{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        global _active
+
+        _active = self
+        if self.trace_memory:
+            tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample_stacks, daemon=True)
+        self._sampler.start()
+        if sys.version_info < (3, 12):
+            # later versions profile all threads with one profiler
+            threading.setprofile(self._profile_thread)
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+
+        self._profiles[0].disable()
+        threading.setprofile(None)
+        self._stop.set()
+        self._sampler.join()
+        _active = None
+
+        snapshot, peak = None, 0
+        if self.trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.save(snapshot, peak)
+
+    def save(self, snapshot=None, peak: int = 0):
+        """Write profile files."""
+
+        stats = None
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    pass  # thread did not call any profiled function
+        stats.dump_stats(f'{self.prefix}.pstats')
+
+        with open(f'{self.prefix}.collapsed', 'w') as collapsed_file:
+            for stack, count in self.stacks.most_common():
+                collapsed_file.write(f'{stack} {count}\n')
+
+        with open(f'{self.prefix}.phases', 'w') as phases_file:
+            phases_file.write(f'{"provider":<20}{"phase":<10}{"calls":>6}'
+                              f'{"wall, s":>10}{"cpu, s":>10}\n')
+            for (name, phase_name), (calls, wall, cpu) in sorted(self.phases.items()):
+                phases_file.write(f'{name:<20}{phase_name:<10}{calls:>6}'
+                                  f'{wall:>10.4f}{cpu:>10.4f}\n')
+
+        if snapshot is not None:
+            with open(f'{self.prefix}.memory', 'w') as memory_file:
+                memory_file.write(f'Peak traced memory: {peak / 1024:.1f} KiB\n')
+                for stat in snapshot.statistics('lineno')[:config.PROFILE_MEMORY_TOP]:
+                    memory_file.write(f'{stat}\n')
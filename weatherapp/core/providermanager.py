@@ -1,8 +1,20 @@
 """Manager to view registered providers and download them."""
 
-from weatherapp.core.providers import AccuWeatherProvider, Rp5WeatherProvider
-from weatherapp.core.providers import SinoptikWeatherProvider
+from weatherapp.core import config
 from weatherapp.core.abstract import Manager
+from weatherapp.core.plugins import LazyEntry, PROVIDERS_GROUP, iter_entry_points
+
+BUILTIN_PROVIDERS = (
+    (config.ACCU_PROVIDER_NAME,
+     'weatherapp.core.providers:AccuWeatherProvider',
+     config.ACCU_PROVIDER_TITLE),
+    (config.RP5_PROVIDER_NAME,
+     'weatherapp.core.providers:Rp5WeatherProvider',
+     config.RP5_PROVIDER_TITLE),
+    (config.SINOPTIK_PROVIDER_NAME,
+     'weatherapp.core.providers:SinoptikWeatherProvider',
+     config.SINOPTIK_PROVIDER_TITLE),
+)
 
 
 class ProviderManager(Manager):
@@ -13,12 +25,21 @@ class ProviderManager(Manager):
         self._load_providers()
 
     def _load_providers(self):
-        """Load all existing providers."""
+        """Load all existing providers.
+
+        Built-in providers are always available, external ones are
+        discovered in the 'weatherapp.providers' entry points group.
+        Provider modules are imported only when provider is used.
+        """
+
+        for name, target, title in BUILTIN_PROVIDERS:
+            self.add(name, LazyEntry(name, target, title))
 
-        for provider in [AccuWeatherProvider,
-                         Rp5WeatherProvider,
-                         SinoptikWeatherProvider]:
-            self.add(provider.name, provider)
+        for name, target in iter_entry_points(PROVIDERS_GROUP):
+            registered = self._providers.get(name)
+            if isinstance(registered, LazyEntry) and registered.target == target:
+                continue
+            self.add(name, LazyEntry(name, target))
 
     def add(self, name, provider):
         """Add new provider by name."""
@@ -4,11 +4,33 @@ This file includes classes for each weather service provider.
 Providers: accuweather.com, rp5.ua, sinoptik.ua
 """
 
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
 from loguru import logger
 
 from weatherapp.core import config
 from weatherapp.core.abstract import WeatherProvider
+from weatherapp.core.extraction import (ExtractionPlan, ForecastPlan, Rule,
+                                        make_soup)
+
+
+def rp5_condition(text: str) -> str:
+    """Condition goes after the second comma of the forecast sentence."""
+
+    start = text.find(',', text.find(',') + 1) + 2
+    return text[start:text.find(',', start + 1)]
+
+
+def rp5_wind(text: str) -> str:
+    """Wind goes after the last comma of the first forecast sentence."""
+
+    return text.split('. ')[0].rsplit(', ', 1)[-1]
+
+
+def real_feel(text: str) -> str:
+    """Keep only digits of the RealFeel temperature."""
+
+    return ''.join(char for char in text if char.isdigit()) + '°'
 
 
 class AccuWeatherProvider(WeatherProvider):
@@ -18,6 +40,24 @@ class AccuWeatherProvider(WeatherProvider):
 
     name = config.ACCU_PROVIDER_NAME
     title = config.ACCU_PROVIDER_TITLE
+    raw_pages = True
+    streaming_targets = (('a', {'class': 'cur-con-weather-card'}),)
+    plan = ExtractionPlan(
+        Rule('url', 'a.cur-con-weather-card', attr='href'),
+    )
+    current_day_plan = ExtractionPlan(
+        Rule('Temperature', 'div.card-content div.display-temp', post=str.strip),
+        Rule('Condition', 'div.phrase'),
+        Rule('RealFeel', 'div.card-content div.current-weather-extra', post=real_feel),
+    )
+    forecast_plan = ForecastPlan(
+        Rule('Day', 'h2.date span.dow'),
+        Rule('Date', 'h2.date span.sub'),
+        Rule('Condition', 'div.phrase', post=str.strip),
+        Rule('Min', 'div.temp span.low', post=lambda text: text.strip(' /')),
+        Rule('Max', 'div.temp span.high', post=str.strip),
+        block='a.daily-forecast-card',
+    )
 
     @staticmethod
     def get_default_location():
@@ -29,11 +69,16 @@ class AccuWeatherProvider(WeatherProvider):
         """Default location url."""
         return config.DEFAULT_URL_ACCU
 
+    def get_forecast_url(self) -> str:
+        """Daily forecast is on its own page, the only extra request."""
+
+        return self.url.replace('/weather-forecast/', '/daily-weather-forecast/')
+
     def get_locations_accu(self, locations_url: str, refresh: bool = False) -> list:
         """Return a list of locations and related urls."""
 
-        locations_page = self.get_page_from_server(locations_url, refresh=refresh)
-        soup = BeautifulSoup(locations_page, 'html.parser')
+        locations_page = self.get_page_source(locations_url, refresh=refresh)
+        soup = make_soup(locations_page, self.page_encoding)
 
         locations = []
         places = soup.find('div', class_='result-container')
@@ -41,7 +86,7 @@ class AccuWeatherProvider(WeatherProvider):
             for place in places.find_all('a'):
                 path = place.attrs['href']
                 location = place.text
-                locations.append((location, f'https://www.accuweather.com/{path}'))
+                locations.append((location, urljoin(config.ACCU_SITE, path)))
         return locations
 
     def configuration(self, command: str, refresh: bool = False):
@@ -75,37 +120,36 @@ class AccuWeatherProvider(WeatherProvider):
 
         self.save_configuration(*location)
 
-    def get_weather_info(self, page: str, refresh: bool = False) -> dict:
+    def parse_weather_info(self, content, refresh: bool = False) -> dict:
+        """Collects weather information, refreshes current day page too."""
+
+        return self.get_weather_info(content, refresh=refresh)
+
+    def get_data_page(self, page, refresh: bool = False):
+        """Weather info is on the current day page the location page links to."""
+
+        current_day_url = self.plan.extract(page).get('url')
+        if not current_day_url:
+            return None
+        return self.get_page_source(urljoin(config.ACCU_SITE, current_day_url),
+                                    refresh=refresh)
+
+    def get_legacy_links(self, page) -> list:
+        """Current day page link was joined with '//' after the host before."""
+
+        current_day_url = self.plan.extract(page).get('url')
+        if not current_day_url:
+            return []
+        return [(f'https://www.accuweather.com/{current_day_url}',
+                 urljoin(config.ACCU_SITE, current_day_url))]
+
+    def get_weather_info(self, page, refresh: bool = False) -> dict:
         """Return information collected from AccuWeather."""
 
-        weather_page = BeautifulSoup(page, 'html.parser')
-        current_day_selection = weather_page.find_all('a', class_='cur-con-weather-card')
-
-        weather_info = {}
-        if current_day_selection:
-            current_day_url = current_day_selection[0].get('href')
-            current_day_url = f'https://www.accuweather.com/{current_day_url}'
-            if current_day_url:
-                current_day_page = self.get_page_from_server(current_day_url,
-                                                             refresh=refresh)
-                if current_day_page:
-                    current_day = BeautifulSoup(current_day_page, 'html.parser')
-                    temp = current_day.find('div', class_='card-content')
-                    curr_temp = temp.find('div', class_='display-temp')
-                    if curr_temp:
-                        weather_info['Temperature'] = curr_temp.text.strip()
-                    condition = current_day.find('div', class_='phrase')
-                    if condition:
-                        weather_info['Condition'] = condition.text
-                    feel_temp = temp.find('div', class_='current-weather-extra')
-                    if feel_temp:
-                        curr_feel_temp = ''.join(i for i in feel_temp.text if i.isdigit())
-                        if '-' in curr_feel_temp:
-                            weather_info['RealFeel'] = f'-{curr_feel_temp}°'
-                        else:
-                            weather_info['RealFeel'] = f'{curr_feel_temp}°'
-
-        return weather_info
+        current_day_page = self.get_data_page(page, refresh=refresh)
+        if not current_day_page:
+            return {}
+        return self.current_day_plan.extract(current_day_page)
 
 
 class Rp5WeatherProvider(WeatherProvider):
@@ -115,6 +159,24 @@ class Rp5WeatherProvider(WeatherProvider):
 
     name = config.RP5_PROVIDER_NAME
     title = config.RP5_PROVIDER_TITLE
+    raw_pages = True
+    streaming_targets = (('div', {'class': 'ArchiveTemp'}),
+                         ('div', {'id': 'forecastShort-content'}))
+    plan = ExtractionPlan(
+        Rule('Temperature', 'div.ArchiveTemp span.t_0'),
+        Rule('Condition', 'div#forecastShort-content b', post=rp5_condition),
+        Rule('Expect', 'div#forecastShort-content span.t_0',
+             post=lambda text: text[:-3]),
+        Rule('Wind', 'div#forecastShort-content b', post=rp5_wind),
+    )
+    # forecast table has a column for every day
+    forecast_plan = ForecastPlan(
+        Rule('Day', 'table#forecastTable tr.forecastDate td.forecastDay'),
+        Rule('Condition', 'table#forecastTable tr.forecastCloud td.forecastDay',
+             attr='title'),
+        Rule('Temperature',
+             'table#forecastTable tr.forecastTemp td.forecastDay span.t_0'),
+    )
 
     @staticmethod
     def get_default_location():
@@ -129,8 +191,8 @@ class Rp5WeatherProvider(WeatherProvider):
     def get_locations_rp5(self, locations_url: str, refresh: bool = False) -> list:
         """Return a list of locations and related urls."""
 
-        locations_page = self.get_page_from_server(locations_url, refresh=refresh)
-        soup = BeautifulSoup(locations_page, 'html.parser')
+        locations_page = self.get_page_source(locations_url, refresh=refresh)
+        soup = make_soup(locations_page, self.page_encoding)
 
         locations = []
         places = soup.find_all('div', class_='country_map_links')
@@ -187,36 +249,6 @@ class Rp5WeatherProvider(WeatherProvider):
 
         self.save_configuration(*location)
 
-    @staticmethod
-    def get_weather_info(page: str) -> dict:
-        """Return information collected from RP5."""
-
-        weather_page = BeautifulSoup(page, 'html.parser')
-        current_day_temperature = weather_page.find('div', class_='ArchiveTemp')
-        current_day_weather_details = weather_page.find('div', id='forecastShort-content')
-
-        weather_info = {}
-        if current_day_temperature:
-            temperature = current_day_temperature.find('span', class_='t_0')
-            if temperature:
-                weather_info['Temperature'] = temperature.text
-        if current_day_weather_details:
-            condition = current_day_weather_details.find('b')
-            if condition:
-                start_cond = condition.text.find(',', condition.text.find(',') + 1) + 2
-                end_cond = condition.text.find(',', start_cond + 1)
-                weather_info['Condition'] = condition.text[start_cond:end_cond]
-            today_expect = current_day_weather_details.find('span', class_='t_0')
-            if today_expect:
-                weather_info['Expect'] = today_expect.text[:-3]
-            if condition:
-                first_sentence_end = condition.text.find('. ')
-                first_sentence = condition.text[:first_sentence_end]
-                start = first_sentence.rfind(',') + 2
-                weather_info['Wind'] = first_sentence[start:]
-
-        return weather_info
-
 
 class SinoptikWeatherProvider(WeatherProvider):
 
@@ -225,6 +257,23 @@ class SinoptikWeatherProvider(WeatherProvider):
 
     name = config.SINOPTIK_PROVIDER_NAME
     title = config.SINOPTIK_PROVIDER_TITLE
+    raw_pages = True
+    streaming_targets = (('div', {'class': 'imgBlock'}),
+                         ('div', {'class': 'main loaded'}))
+    plan = ExtractionPlan(
+        Rule('Temperature', 'div.imgBlock p.today-temp'),
+        Rule('Condition', 'div.imgBlock img[alt]', attr='alt'),
+        Rule('Expect', ('div.main.loaded div.min', 'div.main.loaded div.max'),
+             post=lambda low, high: f'{low}... {high}'),
+    )
+    forecast_plan = ForecastPlan(
+        Rule('Day', 'p.day-link'),
+        Rule('Date', ('p.date', 'p.month')),
+        Rule('Condition', 'div.weatherIco', attr='title'),
+        Rule('Min', 'div.min span'),
+        Rule('Max', 'div.max span'),
+        block='div#blockDays div.main',
+    )
 
     @staticmethod
     def get_default_location():
@@ -239,8 +288,8 @@ class SinoptikWeatherProvider(WeatherProvider):
     def get_locations_sinoptik(self, locations_url: str, refresh: bool = False) -> list:
         """Return a list of locations and related urls."""
 
-        locations_page = self.get_page_from_server(locations_url, refresh=refresh)
-        soup = BeautifulSoup(locations_page, 'html.parser')
+        locations_page = self.get_page_source(locations_url, refresh=refresh)
+        soup = make_soup(locations_page, self.page_encoding)
 
         locations = []
         places = soup.find('div', class_='mapRightCol')
@@ -282,27 +331,3 @@ class SinoptikWeatherProvider(WeatherProvider):
                     logger.error(msg)
 
         self.save_configuration(*location)
-
-    @staticmethod
-    def get_weather_info(page: str) -> dict:
-        """Return information collected from SINOPTIK."""
-
-        weather_page = BeautifulSoup(page, 'html.parser')
-        current_day_weather = weather_page.find('div', class_='imgBlock')
-        current_day_temperature = weather_page.find('div', class_='main loaded')
-
-        weather_info = {}
-        if current_day_weather:
-            temperature = current_day_weather.find('p', class_='today-temp')
-            if temperature:
-                weather_info['Temperature'] = temperature.text
-        if current_day_weather:
-            condition = current_day_weather.find('img', alt=True)
-            if condition:
-                weather_info['Condition'] = condition['alt']
-        if current_day_temperature:
-            min_temp = current_day_temperature.find('div', class_='min')
-            max_temp = current_day_temperature.find('div', class_='max')
-            weather_info['Expect'] = f'{min_temp.text}... {max_temp.text}'
-
-        return weather_info
@@ -0,0 +1,76 @@
+"""Quorum of providers for the weather application run.
+
+With --quorum K option all providers are started at once and the run
+ends as soon as K of them answer. With --tolerance option answers must
+also agree: values of config.QUORUM_FIELD of the K providers differ at
+most by the tolerance. Response time depends on the fastest providers
+instead of the slowest one.
+"""
+
+import math
+from argparse import ArgumentTypeError
+
+from weatherapp.core import config
+from weatherapp.core.extraction import parse_number
+
+
+def quorum_type(providermanager=None):
+    """Return argparse type of --quorum value.
+
+    Quorum is from 1 to the number of providers, which are counted when
+    the arguments are parsed.
+
+    :param providermanager: providers of the application, the upper
+        bound is not checked if None
+    :type providermanager: `weatherapp.core.providermanager.ProviderManager`
+    """
+
+    def quorum(value: str) -> int:
+        try:
+            count = int(value)
+        except ValueError:
+            raise ArgumentTypeError(f'invalid int value: {value!r}') from None
+        if count < 1:
+            raise ArgumentTypeError(f'quorum must be at least 1, got {count}')
+        if providermanager is not None and count > len(providermanager):
+            raise ArgumentTypeError(f'quorum must be at most the number of '
+                                    f'providers ({len(providermanager)}), '
+                                    f'got {count}')
+        return count
+
+    return quorum
+
+
+def find_quorum(results: dict, quorum: int, tolerance: float = None,
+                field: str = None) -> list:
+    """Return names of the providers which form the quorum, None if none do.
+
+    :param results: provider name -> weather info, in order of arrival
+    :type results: dict
+    :param quorum: number of providers required
+    :type quorum: int
+    :param tolerance: maximum difference of the field values, any
+        answers form the quorum if None
+    :type tolerance: float
+    :param field: compared field, config.QUORUM_FIELD by default
+    :type field: str
+    """
+
+    if tolerance is None:
+        names = list(results)
+        return names[:quorum] if len(names) >= quorum else None
+
+    field = field or config.QUORUM_FIELD
+    values = []
+    for name, info in results.items():
+        value = parse_number(str(info.get(field, '')))
+        if not math.isnan(value):
+            values.append((value, name))
+    values.sort()
+
+    for start in range(len(values) - quorum + 1):
+        window = values[start:start + quorum]
+        if window[-1][0] - window[0][0] <= tolerance:
+            agreed = {name for _, name in window}
+            return [name for name in results if name in agreed]
+    return None
@@ -0,0 +1,29 @@
+"""Rate limiter for requests to weather provider hosts."""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Keeps minimal interval between requests to the same host.
+
+    :param rate: maximum number of requests per second to one host
+    :type rate: float
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._lock = threading.Lock()
+        self._next_time = {}
+
+    def wait(self, host: str):
+        """Block until request to the host is allowed."""
+
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_time.get(host, now))
+            self._next_time[host] = request_time + self.interval
+
+        delay = request_time - now
+        if delay > 0:
+            time.sleep(delay)
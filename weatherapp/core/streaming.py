@@ -0,0 +1,80 @@
+"""Incremental detection of the required page markup.
+
+Providers declare elements their weather information is extracted from
+as (tag, attributes) pairs, e.g. ('div', {'class': 'ArchiveTemp'}).
+Page chunks are fed to the watcher while they are downloaded, and the
+download can be stopped as soon as the first occurrence of every
+declared element has been read completely.
+"""
+
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+
+def attrs_match(attrs: dict, required: dict) -> bool:
+    """Check if element attributes contain required values.
+
+    Class attribute matches when it contains all the required classes,
+    other attributes must be equal.
+    """
+
+    for name, value in required.items():
+        actual = attrs.get(name)
+        if actual is None:
+            return False
+        if name == 'class':
+            if not set(value.split()) <= set(actual.split()):
+                return False
+        elif actual != value:
+            return False
+    return True
+
+
+class MarkupWatcher(HTMLParser):
+    """Incremental parser which tracks required elements.
+
+    :param targets: required elements as (tag, attributes) pairs
+    :type targets: list
+    """
+
+    def __init__(self, targets: list):
+        super().__init__(convert_charrefs=False)
+        self.targets = list(targets)
+        self.found = set()  # indexes of targets which were read completely
+        self._open = {}  # target index -> [tag, nesting depth]
+
+    @property
+    def complete(self) -> bool:
+        """Check if all required elements were read."""
+
+        return len(self.found) == len(self.targets)
+
+    def handle_starttag(self, tag, attrs):
+        for state in self._open.values():
+            if state[0] == tag:
+                state[1] += 1
+
+        attrs = {name: value or '' for name, value in attrs}
+        for index, (target_tag, target_attrs) in enumerate(self.targets):
+            if (index in self.found or index in self._open
+                    or tag != target_tag or not attrs_match(attrs, target_attrs)):
+                continue
+            if tag in VOID_ELEMENTS:
+                self.found.add(index)
+            else:
+                self._open[index] = [tag, 1]
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for index, state in list(self._open.items()):
+            if state[0] == tag:
+                state[1] -= 1
+                if not state[1]:
+                    del self._open[index]
+                    self.found.add(index)
@@ -1,19 +1,369 @@
 """Integration tests for the weather application."""
 
 import unittest
+import hashlib
 import io
+import os
 import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 
+from weatherapp.core import config
+from weatherapp.core.abstract import WeatherProvider
 from weatherapp.core.app import App
+from weatherapp.core.changes import ChangeDetector
+from weatherapp.core.extraction import ExtractionPlan, ForecastPlan, Rule
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the same weather page for every request."""
+
+    requests_count = 0
+    pages = {}  # path -> body of the pages other than the default one
+
+    def do_GET(self):
+        StubHandler.requests_count += 1
+        body = StubHandler.pages.get(self.path, b'<p class="temp">+7</p>')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubProvider(WeatherProvider):
+    """Test provider which gets weather from the local stub server."""
+
+    name = 'stub'
+    title = 'Stub'
+    url = ''
+
+    def get_default_location(self):
+        return 'Kyiv'
+
+    def get_default_url(self):
+        return StubProvider.url
+
+    def configuration(self):
+        pass
+
+    def get_weather_info(self, content: str):
+        return {'Temperature': content[len('<p class="temp">'):-len('</p>')]}
+
+
+class ForecastStubProvider(StubProvider):
+    """Stub provider which reads forecast from the location page."""
+
+    plan = ExtractionPlan(Rule('Temperature', 'p.temp'))
+    forecast_plan = ForecastPlan(Rule('Temperature', 'p.temp'))
+
+    def get_weather_info(self, content):
+        return self.plan.extract(content)
+
+
+class LinkedStubProvider(StubProvider):
+    """Stub provider which reads weather from the page linked to location."""
+
+    def get_data_page(self, page, refresh=False):
+        return self.get_page_source(f'{self.url}/now', refresh=refresh)
+
+    def get_weather_info(self, content: str):
+        return super().get_weather_info(str(self.get_data_page(content), 'utf-8'))
 
 
 class CommandsTestCase(unittest.TestCase):
     """Test case for commands tests."""
 
+    def setUp(self):
+        """Use temporary home directory for cache and configuration."""
+
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        home_patcher = patch.dict(os.environ, {'HOME': home.name})
+        home_patcher.start()
+        self.addCleanup(home_patcher.stop)
+
+    def start_stub_server(self):
+        """Run local HTTP server for the stub provider."""
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,),
+                         daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        StubProvider.url = f'http://127.0.0.1:{server.server_port}/kyiv'
+        StubHandler.requests_count = 0
+        StubHandler.pages = {}
+
     def test_providers(self):
         """Test providers command."""
 
         sys.stdout = io.StringIO()
         App(stdout=sys.stdout).run(['providers'])
         sys.stdout.seek(0)
-        self.assertEqual(sys.stdout.read(), 'AccuWeather (accu)\nRP5 (rp5)\nSINOPTIK (sinoptik)\n')
+        self.assertEqual(sys.stdout.read(),
+                         'AccuWeather (accu): closed, no requests yet\n'
+                         'RP5 (rp5): closed, no requests yet\n'
+                         'SINOPTIK (sinoptik): closed, no requests yet\n')
+
+    def test_warm(self):
+        """Test warm command refreshes pages and results."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['warm', 'stub'])
+
+        self.assertIn('stub Kyiv: ', stdout.getvalue())
+        self.assertIn('Warmed 1 of 1 locations', stdout.getvalue())
+        self.assertEqual(StubHandler.requests_count, 1)
+
+        provider = StubProvider(app)
+        self.assertEqual(provider.get_result_cache(provider.url),
+                         {'Temperature': '+7'})
+        self.assertEqual(provider.run(), {'Temperature': '+7'})
+        self.assertEqual(StubHandler.requests_count, 1)
+
+    def test_freshness(self):
+        """Test freshness command shows observations of warmed locations."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['warm', 'stub'])
+        app.run(['warm', 'stub'])
+
+        stdout.seek(0)
+        stdout.truncate()
+        app.run(['freshness'])
+        self.assertEqual(stdout.getvalue(),
+                         'stub Kyiv: cache time 1350s, 2 fetches, 0 changes\n')
+
+    def test_watch(self):
+        """Test watch command prints only new and changed weather info."""
+
+        self.start_stub_server()
+        locations = os.path.join(os.environ['HOME'], 'locations.csv')
+        with open(locations, 'w') as locations_file:
+            locations_file.write(f'stub,Kyiv,{StubProvider.url}\n'
+                                 f'stub,Lviv,{StubProvider.url}?lviv\n')
+
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['watch', '--locations', locations,
+                 '--cycles', '2', '--interval', '0'])
+        self.assertEqual(stdout.getvalue(),
+                         '{"event": "new", "provider": "stub", "location": "Kyiv", '
+                         '"info": {"Temperature": "+7"}}\n'
+                         '{"event": "new", "provider": "stub", "location": "Lviv", '
+                         '"info": {"Temperature": "+7"}}\n')
+        self.assertEqual(StubHandler.requests_count, 2)
+
+    @patch('weatherapp.core.config.CACHE_TIME_MIN', 0)
+    @patch('weatherapp.core.config.CACHE_TIME_MAX', 0)
+    def test_watch_linked_page(self):
+        """Test watch hashes the page weather info is read from."""
+
+        self.start_stub_server()
+        StubHandler.pages['/kyiv/now'] = b'<p class="temp">+7</p>'
+        app = App(stdout=io.StringIO())
+        app.options = app.arg_parser.parse_args([])
+        app.providermanager.add('stub', LinkedStubProvider)
+        watch = app.commandmanager['watch'](app)
+        detector = ChangeDetector()
+        key = ('stub', 'Kyiv', StubProvider.url)
+
+        self.assertEqual(watch.check_location(detector, key), 'new')
+        self.assertIsNone(watch.check_location(detector, key))
+        StubHandler.pages['/kyiv/now'] = b'<p class="temp">+8</p>'
+        self.assertEqual(watch.check_location(detector, key), 'changed')
+        self.assertEqual(detector.get(key).info, {'Temperature': '+8'})
+        # unchanged location is not observed again
+        self.assertEqual(app.freshness.get(StubProvider.url)['fetches'], 2)
+
+    def test_forecast(self):
+        """Test forecast reuses the location page and caches its weather."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', ForecastStubProvider)
+        app.run(['forecast', 'stub', '--days', '2'])
+
+        self.assertIn('| Stub        | Kyiv, day 1 |', stdout.getvalue())
+        self.assertEqual(stdout.getvalue().count('| Temperature | +7 '), 1)
+        self.assertEqual(StubHandler.requests_count, 1)
+
+        provider = ForecastStubProvider(app)
+        self.assertEqual(provider.get_result_cache(provider.url),
+                         {'Temperature': '+7'})
+        self.assertEqual(provider.run_forecast(2), [{'Temperature': '+7'}])
+        self.assertEqual(StubHandler.requests_count, 1)
+
+    def write_legacy_page(self, app, url: str, page: bytes):
+        """Write page the way it was cached before files got the header."""
+
+        cache_dir = app.get_cache_directory()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / hashlib.md5(url.encode()).hexdigest()
+        path.write_bytes(page)
+        return path
+
+    def test_cache_keys_migration(self):
+        """Test that pages cached under raw url keys are used once moved."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        path = self.write_legacy_page(app, StubProvider.url, b'<p class="temp">+9</p>')
+        marker = app.get_cache_directory() / config.CACHE_KEYS_FILE
+
+        app.options = app.arg_parser.parse_args([])
+        with patch.object(app.cache, 'set', side_effect=OSError('Disk is full')):
+            app.migrate_cache_keys()
+        self.assertFalse(marker.exists())
+        self.assertTrue(path.exists())
+
+        app.run(['stub'])
+        self.assertIn('| Temperature | +9   |', stdout.getvalue())
+        self.assertEqual(StubHandler.requests_count, 0)
+        self.assertFalse(path.exists())
+        self.assertTrue(marker.exists())
+
+    def test_linked_page_keys_migration(self):
+        """Test that linked pages move from the keys they were joined into."""
+
+        app = App(stdout=io.StringIO())
+        app.options = app.arg_parser.parse_args([])
+        provider = app.providermanager['accu'](app)
+        link = '/en/ua/kyiv/324505/current-weather/324505'
+        # location url is canonical already, its file is kept in place
+        self.write_legacy_page(
+            app, provider.url,
+            f'<a class="cur-con-weather-card" href="{link}">Now</a>'.encode())
+        path = self.write_legacy_page(app, f'https://www.accuweather.com/{link}',
+                                      b'current day page')
+
+        app.execute(['providers'])
+        self.assertTrue(path.exists())
+        self.assertEqual(provider.get_cache(provider.url), b'')
+
+        app.run(['providers'])
+        self.assertFalse(path.exists())
+        self.assertIn(b'cur-con-weather-card', bytes(provider.get_cache(provider.url)))
+        self.assertEqual(bytes(provider.get_cache(f'https://www.accuweather.com{link}')),
+                         b'current day page')
+
+    def test_locate(self):
+        """Test locate command builds the index and configures providers."""
+
+        home = os.environ['HOME']
+        places = os.path.join(home, 'places.csv')
+        with open(places, 'w') as places_file:
+            places_file.write('rp5,Kyiv,https://rp5.ua/Weather_in_Kiev,50.45,30.52\n'
+                              'rp5,Lviv,https://rp5.ua/Weather_in_Lviv,49.84,24.03\n')
+
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.run(['locate', '--build', places])
+        app.run(['locate', '49.8', '24.0', '--save'])
+        self.assertEqual(stdout.getvalue(),
+                         'Indexed 2 locations\n'
+                         'rp5 Lviv: https://rp5.ua/Weather_in_Lviv (4.9 km)\n')
+        self.assertEqual(app.providermanager['rp5'](app).location, 'Lviv')
+
+    def test_grid(self):
+        """Test grid formatter prints all results as one grid."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager._providers = {
+            'stub': StubProvider,
+            'other': type('OtherProvider', (StubProvider,), {'title': 'Other'})}
+        app.run(['-f', 'grid'])
+        self.assertEqual(stdout.getvalue(),
+                         '+----------+------------------+-------------------+\n'
+                         '| Location | Stub Temperature | Other Temperature |\n'
+                         '+----------+------------------+-------------------+\n'
+                         '| Kyiv     | +7               | +7                |\n'
+                         '+----------+------------------+-------------------+\n')
+
+    def test_shell(self):
+        """Test shell runs providers and commands in the same application."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdin=io.StringIO('stub\nproviders\n--refresh stub\nexit\n'),
+                  stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['shell'])
+
+        output = stdout.getvalue()
+        self.assertEqual(output.count('| Temperature | +7   |'), 2)
+        self.assertIn('Stub (stub): closed, 1 requests', output)
+        self.assertEqual(StubHandler.requests_count, 2)
+        self.assertTrue(app.options.refresh)
+
+    def test_shell_replay(self):
+        """Test that only the shell command with --replay is replayed."""
+
+        self.start_stub_server()
+        cassette = os.path.join(os.environ['HOME'], 'cassette.json')
+        app = App(stdout=io.StringIO())
+        app.providermanager.add('stub', StubProvider)
+        app.run(['stub', '--refresh', '--record', cassette])
+        StubHandler.pages['/kyiv'] = b'<p class="temp">+8</p>'
+
+        stdout = io.StringIO()
+        app = App(stdin=io.StringIO(f'stub --refresh --replay {cassette} '
+                                    f'--replay-latency 0\n'
+                                    f'stub --refresh\nexit\n'),
+                  stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['shell'])
+
+        output = stdout.getvalue()
+        self.assertLess(output.index('| Temperature | +7   |'),
+                        output.index('| Temperature | +8   |'))
+        self.assertEqual(StubHandler.requests_count, 2)
+
+    def test_state_reset(self):
+        """Test that cancelled deadline of one run does not stop the next."""
+
+        self.start_stub_server()
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager._providers = {'stub': StubProvider}
+        app.run(['--quorum', '1'])
+        app.execute(['stub', '--refresh'])
+
+        self.assertEqual(stdout.getvalue().count('| Temperature | +7   |'), 2)
+        self.assertEqual(StubHandler.requests_count, 2)
+
+    def test_record_replay(self):
+        """Test that recorded run is replayed without network."""
+
+        self.start_stub_server()
+        cassette = os.path.join(os.environ['HOME'], 'cassette.json')
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['stub', '--refresh', '--record', cassette])
+        self.assertEqual(StubHandler.requests_count, 1)
+
+        replay_stdout = io.StringIO()
+        app = App(stdout=replay_stdout)
+        app.providermanager.add('stub', StubProvider)
+        app.run(['stub', '--refresh', '--replay', cassette,
+                 '--replay-latency', '0'])
+        self.assertEqual(StubHandler.requests_count, 1)
+        self.assertEqual(replay_stdout.getvalue(), stdout.getvalue())
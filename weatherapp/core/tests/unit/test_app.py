@@ -1,10 +1,15 @@
 """Unittests for App class"""
 
 import argparse
+import subprocess
+import sys
 import unittest
+from pathlib import Path
 
 from weatherapp.core.app import App
 
+ROOT = Path(__file__).resolve().parents[4]
+
 
 class AppTestCase(unittest.TestCase):
     """Test application class methods."""
@@ -26,6 +31,8 @@ class AppTestCase(unittest.TestCase):
         self.assertIsNone(parsed_args.command)
         self.assertFalse(parsed_args.debug)
         self.assertEqual(parsed_args.formatter, 'table')
+        self.assertIsNone(parsed_args.deadline)
+        self.assertFalse(parsed_args.stale)
 
     def test_arg_parser_arg(self):
         """Test application argument parser"""
@@ -42,6 +49,17 @@ class AppTestCase(unittest.TestCase):
         self.assertTrue(self.formatter)
         self.assertIsInstance(self.formatter, dict)
 
+    def test_lazy_page_parser(self):
+        """Test that bs4 is not imported with the application."""
+
+        code = ('import sys\n'
+                'from weatherapp.core.app import App\n'
+                "App().arg_parser.parse_args(['--quorum', '1'])\n"
+                "print('bs4' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.split()[-1], 'False')
+
 
 if __name__ == '__main__':
     unittest.main()
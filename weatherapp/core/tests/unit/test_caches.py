@@ -0,0 +1,185 @@
+"""Unittests for cache backends."""
+
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from weatherapp.core.abstract import CacheError
+from weatherapp.core.caches import DiskCache, RedisCache, TieredCache
+
+
+class KeyValueHandler(socketserver.StreamRequestHandler):
+    """Stand-in for Redis server which supports GET, SET and DEL."""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        storage = self.server.storage
+        while True:
+            command = self.read_command()
+            if command is None:
+                break
+            name = command[0].upper()
+            if name == b'GET':
+                value = storage.get(command[1])
+                if value is None:
+                    self.wfile.write(b'$-1\r\n')
+                else:
+                    self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+            elif name == b'SET':
+                storage[command[1]] = command[2]
+                self.wfile.write(b'+OK\r\n')
+            elif name == b'DEL':
+                deleted = storage.pop(command[1], None) is not None
+                self.wfile.write(b':%d\r\n' % deleted)
+            else:
+                self.wfile.write(b'-ERR unknown command\r\n')
+
+
+class CacheTestCase(unittest.TestCase):
+    """Unit test case for cache backends."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.disk = DiskCache(Path(tmp_dir.name))
+
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                                 KeyValueHandler)
+        server.daemon_threads = True
+        server.storage = {}
+        threading.Thread(target=server.serve_forever, args=(0.05,),
+                         daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        self.far = RedisCache.from_url(f'redis://127.0.0.1:{server.server_address[1]}')
+        self.addCleanup(self.far.close)
+
+    def test_disk_cache(self):
+        """Test disk cache entries and ttl."""
+
+        self.assertIsNone(self.disk.get('key'))
+        self.disk.set('key', b'page')
+        entry = self.disk.get('key')
+        self.assertIsInstance(entry.value, memoryview)
+        self.assertEqual(entry.value, b'page')
+        self.assertTrue(entry.is_valid())
+
+        self.disk.set('key', b'new page')
+        self.assertEqual(entry.value, b'page')  # mapped file is not changed
+        self.assertEqual(self.disk.get('key').value, b'new page')
+
+        self.disk.set('key', b'page', ttl=10, stored_at=time.time() - 20)
+        self.assertFalse(self.disk.get('key').is_valid())
+
+        self.disk.delete('key')
+        self.assertIsNone(self.disk.get('key'))
+
+    def test_disk_cache_validation(self):
+        """Test that damaged and foreign cache files are treated as missing."""
+
+        self.disk.set('key', b'page', ttl=30, stored_at=100.0)
+        entry = self.disk.get('key')
+        self.assertEqual((entry.stored_at, entry.ttl), (100.0, 30))
+        path = self.disk.cache_dir / 'key'
+        data = path.read_bytes()
+
+        for damaged in (data[:-1],  # truncated page
+                        data[:10],  # truncated header
+                        data[:-1] + b'x',  # wrong checksum
+                        b'<html>legacy page without header</html>'):
+            path.write_bytes(damaged)
+            self.assertIsNone(self.disk.get('key'), damaged)
+
+        self.disk.set('key', b'')
+        self.assertEqual(self.disk.get('key').value, b'')
+
+    @patch('weatherapp.core.config.CACHE_FSYNC', 'file')
+    def test_disk_cache_failed_write(self):
+        """Test that failed write leaves neither entry nor temporary file."""
+
+        with patch('os.fsync', side_effect=OSError('No space left on device')):
+            with self.assertRaises(OSError):
+                self.disk.set('key', b'page')
+        self.assertIsNone(self.disk.get('key'))
+        self.assertEqual(list(self.disk.cache_dir.iterdir()), [])
+
+    @patch('weatherapp.core.config.CACHE_FSYNC', 'dir')
+    def test_disk_cache_concurrent_writes(self):
+        """Test that readers see only complete entries while they change."""
+
+        pages = [bytes([number]) * 100000 for number in range(1, 5)]
+        self.disk.set('key', pages[0])
+        stop = threading.Event()
+
+        def write():
+            while not stop.is_set():
+                for page in pages:
+                    self.disk.set('key', page)
+
+        writers = [threading.Thread(target=write) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        try:
+            for _ in range(200):
+                self.assertIn(bytes(self.disk.get('key').value), pages)
+        finally:
+            stop.set()
+            for writer in writers:
+                writer.join()
+
+    def test_redis_cache(self):
+        """Test entries are stored on key-value server with ttl."""
+
+        self.far.set('key', b'page', ttl=30, stored_at=100.0)
+        entry = self.far.get('key')
+        self.assertEqual(entry.value, b'page')
+        self.assertEqual((entry.stored_at, entry.ttl), (100.0, 30))
+        self.assertIn(b'weatherapp:key', self.server.storage)
+
+        self.far.delete('key')
+        self.assertIsNone(self.far.get('key'))
+
+    def test_tiered_cache_propagates_ttl(self):
+        """Test far tier entries are copied to the near tier."""
+
+        stored_at = time.time() - 5
+        self.far.set('key', b'page', ttl=60, stored_at=stored_at)
+        cache = TieredCache(self.disk, self.far)
+
+        entry = cache.get('key')
+        self.assertEqual(entry.value, b'page')
+        near_entry = self.disk.get('key')
+        self.assertEqual(near_entry.value, b'page')
+        self.assertAlmostEqual(near_entry.expires_at, stored_at + 60, places=2)
+
+    def test_tiered_cache_fallback(self):
+        """Test that local cache is used when server is not available."""
+
+        self.server.shutdown()
+        self.server.server_close()
+        far = RedisCache(port=self.server.server_address[1])
+        with self.assertRaises(CacheError):
+            far.get('key')
+
+        cache = TieredCache(self.disk, far)
+        cache.set('key', b'page')
+        self.assertEqual(cache.get('key').value, b'page')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Unittests for incremental cache sweeper."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from weatherapp.core import config
+from weatherapp.core.caches import DiskCache
+from weatherapp.core.cachesweeper import CacheSweeper, get_bucket
+
+
+class CacheSweeperTestCase(unittest.TestCase):
+    """Unit test case for cache sweeper."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = Path(tmp_dir.name)
+
+    def make_file(self, name, size=10, age=0, access_age=0):
+        """Create cache file with given size and age (in seconds)."""
+
+        path = self.cache_dir / name
+        path.write_bytes(b'x' * size)
+        now = time.time()
+        os.utime(path, (now - access_age, now - age))
+        return path
+
+    def test_get_bucket(self):
+        """Test bucket numbers of cache and other files."""
+
+        self.assertEqual(get_bucket('ff' + '0' * 30), 255)
+        self.assertEqual(get_bucket('0a' + '0' * 30 + '.result'), 10)
+        self.assertIsNone(get_bucket('health.json'))
+        self.assertIsNone(get_bucket(config.CACHE_SWEEP_FILE))
+
+    def test_step_is_bounded(self):
+        """Test that one step checks limited number of files."""
+
+        for bucket in range(4):
+            self.make_file(f'{bucket:02x}' + '0' * 30,
+                           age=config.DAY_IN_SECONDS + 1)
+
+        sweeper = CacheSweeper(self.cache_dir, batch_size=2)
+        sweeper.step()
+        self.assertEqual(len(list(self.cache_dir.glob('0*'))), 2)
+        sweeper.step()
+        self.assertEqual(len(list(self.cache_dir.glob('0*'))), 0)
+
+    def test_lru_eviction(self):
+        """Test that least recently used files are evicted first."""
+
+        old = self.make_file('00' + '1' * 30, size=100, access_age=100)
+        new = self.make_file('00' + '2' * 30, size=100, access_age=10)
+
+        sweeper = CacheSweeper(self.cache_dir, max_size=150, policy='lru')
+        sweeper.step()  # the first pass finds the eviction threshold
+        self.assertTrue(old.exists())
+        sweeper.step()
+        self.assertFalse(old.exists())
+        self.assertTrue(new.exists())
+
+    def test_lfu_eviction(self):
+        """Test that least frequently used files are evicted first."""
+
+        rare = self.make_file('00' + '1' * 30, size=100)
+        frequent = self.make_file('00' + '2' * 30, size=100)
+
+        sweeper = CacheSweeper(self.cache_dir, max_size=150, policy='lfu')
+        sweeper.record_hit(frequent.name)
+        sweeper.flush()
+        sweeper.step()
+        sweeper.step()
+        self.assertFalse(rare.exists())
+        self.assertTrue(frequent.exists())
+
+    def test_eviction_across_buckets(self):
+        """Test that files are evicted by value, not by the cursor bucket."""
+
+        old = self.make_file('00' + '1' * 30, size=100, access_age=3600)
+        used = self.make_file('ff' + '1' * 30, size=100)
+
+        sweeper = CacheSweeper(self.cache_dir, max_size=150, batch_size=1,
+                               policy='lru')
+        sweeper.step()  # bucket 00
+        sweeper.step()  # bucket ff, the first pass is over
+        self.assertTrue(old.exists())
+        self.assertTrue(used.exists())
+
+        sweeper.step()
+        self.assertFalse(old.exists())
+        self.assertTrue(used.exists())
+
+    def test_names_are_tracked(self):
+        """Test that steps use names recorded by the cache, not a listing."""
+
+        sweeper = CacheSweeper(self.cache_dir, batch_size=1)
+        cache = DiskCache(self.cache_dir, sweeper=sweeper)
+        for bucket in range(3):
+            cache.set(f'{bucket:02x}' + '0' * 30, b'page')
+        sweeper.step()  # the first pass lists the directory once
+
+        cache.set('01' + '1' * 30, b'page')
+        cache.delete('02' + '0' * 30)
+        sweeper.flush()
+        self.assertEqual(sweeper.load_state()['names'],
+                         {'0': ['00' + '0' * 30],
+                          '1': ['01' + '0' * 30, '01' + '1' * 30]})
+
+        expired = time.time() - config.DAY_IN_SECONDS - 1
+        os.utime(self.cache_dir / ('01' + '1' * 30), (expired, expired))
+        with patch('os.scandir') as scandir:
+            sweeper.step()
+        scandir.assert_not_called()
+        self.assertFalse((self.cache_dir / ('01' + '1' * 30)).exists())
+        self.assertEqual(sweeper.load_state()['names']['1'], ['01' + '0' * 30])
+
+    def test_flush_does_not_wait(self):
+        """Test that flush does not wait for the running sweep step."""
+
+        self.make_file('00' + '0' * 30)
+        sweeper = CacheSweeper(self.cache_dir)
+        release = threading.Event()
+
+        def slow_eviction_key(hits, name, stat):
+            release.wait(5)
+            return 0
+
+        with patch.object(sweeper, '_eviction_key', slow_eviction_key):
+            sweeper.start()
+            start_time = time.monotonic()
+            sweeper.record_hit('00' + '0' * 30)
+            sweeper.flush()
+            self.assertLess(time.monotonic() - start_time, 1)
+            release.set()
+            sweeper._thread.join(5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Unittests for HTTP record and replay."""
+
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from weatherapp.core.cassette import Cassette, use_cassette
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves the same weather page for every request."""
+
+    def do_GET(self):
+        body = b'<p class="temp">+7</p>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CassetteTestCase(unittest.TestCase):
+    """Unit test case for record and replay adapters."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,),
+                         daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_address[1]}/kyiv'
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / 'cassette.json'
+
+        session = requests.Session()
+        use_cassette(session, self.path, record=True)
+        session.get(self.url)
+
+    def test_record(self):
+        """Test that response is saved to the cassette file."""
+
+        interaction = Cassette(self.path).get('GET', self.url)
+        self.assertEqual(interaction['status'], 200)
+        self.assertEqual(interaction['headers']['Content-Type'],
+                         'text/html; charset=utf-8')
+        self.assertNotIn('Content-Length', interaction['headers'])
+
+    def test_replay(self):
+        """Test that recorded response is streamed back with latency."""
+
+        session = requests.Session()
+        use_cassette(session, self.path, latency=0.1, jitter=0.05)
+        start_time = time.perf_counter()
+        with session.get(self.url, stream=True) as response:
+            body = b''.join(response.iter_content(4))
+        elapsed = time.perf_counter() - start_time
+
+        self.assertEqual(body, b'<p class="temp">+7</p>')
+        self.assertEqual(response.encoding, 'utf-8')
+        self.assertGreaterEqual(elapsed, 0.1)
+        self.assertLess(elapsed, 0.5)
+
+    def test_replay_errors(self):
+        """Test that unknown and late responses are reported as errors."""
+
+        session = requests.Session()
+        use_cassette(session, self.path, latency=1)
+        with self.assertRaises(requests.ConnectionError):
+            session.get(self.url + '?lviv')
+        with self.assertRaises(requests.Timeout):
+            session.get(self.url, timeout=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Unittests for change detection."""
+
+import unittest
+
+from weatherapp.core import changes
+from weatherapp.core.changes import ChangeDetector
+
+KYIV = ('rp5', 'Kyiv', 'https://rp5.ua/kyiv')
+LVIV = ('rp5', 'Lviv', 'https://rp5.ua/lviv')
+
+
+class ChangeDetectorTestCase(unittest.TestCase):
+    """Unit test case for change detector."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        self.detector = ChangeDetector()
+
+    def test_page_hash(self):
+        """Test that text and bytes pages have the same hash."""
+
+        page = '<p>+5 °C</p>'
+        self.assertEqual(changes.page_hash(page),
+                         changes.page_hash(memoryview(page.encode('utf-8'))))
+        self.assertNotEqual(changes.page_hash(page), changes.page_hash('<p></p>'))
+
+    def test_update(self):
+        """Test that only new and changed readings are reported."""
+
+        self.assertTrue(self.detector.page_changed(KYIV, 'a'))
+        self.assertEqual(self.detector.update(KYIV, 'a', {'Temperature': '+5'}),
+                         changes.NEW)
+        self.assertFalse(self.detector.page_changed(KYIV, 'a'))
+        self.assertIsNone(self.detector.update(KYIV, 'b', {'Temperature': '+5'}))
+        self.assertEqual(self.detector.update(KYIV, 'c', {'Temperature': '+6'}),
+                         changes.CHANGED)
+        self.assertEqual(self.detector.get(KYIV).info, {'Temperature': '+6'})
+
+    def test_remove_missing(self):
+        """Test that locations which are not watched anymore are removed."""
+
+        self.detector.update(KYIV, 'a', {'Temperature': '+5'})
+        self.detector.update(LVIV, 'b', {'Temperature': '+3'})
+        self.assertEqual(self.detector.remove_missing({KYIV}), [LVIV])
+        self.assertNotIn(LVIV, self.detector)
+        self.assertIn(KYIV, self.detector)
+
+
+if __name__ == '__main__':
+    unittest.main()
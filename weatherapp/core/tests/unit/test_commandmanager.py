@@ -1,9 +1,14 @@
 """Unittests for Command manager class."""
 
+import subprocess
+import sys
 import unittest
+from pathlib import Path
 
 from weatherapp.core.commandmanager import CommandManager
 
+ROOT = Path(__file__).resolve().parents[4]
+
 
 class ExampleCommand:
     """Test class"""
@@ -31,6 +36,18 @@ class CommandManagerTestCase(unittest.TestCase):
         self.assertTrue('config' in self.command_manager._commands, msg=message)
         self.assertTrue('providers' in self.command_manager._commands, msg=message)
 
+    def test_lazy_import(self):
+        """Test that loading one command does not import the others."""
+
+        code = ('import sys\n'
+                'from weatherapp.core.commandmanager import CommandManager\n'
+                "CommandManager()['providers'].load()\n"
+                "print(*sorted(name for name in sys.modules\n"
+                "              if name.startswith('weatherapp.core.commands.')))")
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ['weatherapp.core.commands.providers'])
+
     def test_get(self):
         """Test get method for command manager."""
 
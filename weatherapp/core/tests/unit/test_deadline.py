@@ -0,0 +1,84 @@
+"""Unittests for deadline time budget."""
+
+import io
+import time
+import unittest
+
+from weatherapp.core.app import App
+from weatherapp.core.deadline import Deadline, DeadlineExceeded
+
+
+class FastProvider:
+    """Test provider which answers immediately."""
+
+    name = 'fast'
+    title = 'Fast'
+
+    def __init__(self, app):
+        self.location = 'Kyiv'
+
+    def run(self, refresh=False):
+        return {'Temperature': '+5'}
+
+
+class SlowProvider(FastProvider):
+    """Test provider which does not fit into the deadline."""
+
+    name = 'slow'
+    title = 'Slow'
+
+    def run(self, refresh=False):
+        time.sleep(0.5)
+        return {'Temperature': '+6'}
+
+
+class DeadlineTestCase(unittest.TestCase):
+    """Unit test case for deadline."""
+
+    def test_phases(self):
+        """Test that budget is split between run phases."""
+
+        deadline = Deadline(10, {'fetch': 0.5, 'parse': 0.3, 'format': 0.2})
+        self.assertAlmostEqual(deadline.remaining('fetch'), 5, places=1)
+        self.assertAlmostEqual(deadline.remaining('parse'), 8, places=1)
+        self.assertAlmostEqual(deadline.remaining(), 10, places=1)
+        self.assertFalse(deadline.expired('fetch'))
+
+    def test_no_time_limit(self):
+        """Test deadline without time limit."""
+
+        deadline = Deadline()
+        self.assertEqual(deadline.remaining('fetch'), float('inf'))
+        deadline.check('fetch')
+
+    def test_cancel(self):
+        """Test that cancelled deadline expires all phases."""
+
+        deadline = Deadline(10)
+        deadline.cancel()
+        self.assertTrue(deadline.cancelled)
+        self.assertTrue(deadline.expired('format'))
+        with self.assertRaises(DeadlineExceeded):
+            deadline.check('fetch')
+
+    def test_run_providers_partial_results(self):
+        """Test that late providers are marked as missing."""
+
+        stdout = io.StringIO()
+        app = App(stdout=stdout)
+        app.options = app.arg_parser.parse_args([])
+        app.providermanager._providers = {'fast': FastProvider,
+                                          'slow': SlowProvider}
+
+        start_time = time.monotonic()
+        app.run_providers([], deadline=0.2)
+        self.assertLess(time.monotonic() - start_time, 0.4)
+
+        output = stdout.getvalue()
+        self.assertIn('+5', output)
+        self.assertNotIn('+6', output)
+        self.assertIn('No data', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Unit tests for columnar export."""
+
+import importlib.util
+import math
+import os
+import tempfile
+import unittest
+
+from weatherapp.core.export import ColumnarExporter, ExportError, open_exporter
+from weatherapp.core.extraction import parse_number
+
+INFO = {'Temperature': '+5 °C', 'Condition': 'без осадків', 'Wind': '5,5 м/с'}
+
+
+class GroupsExporter(ColumnarExporter):
+    """Exporter which keeps written groups in memory."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = []
+
+    def write_group(self, columns: dict):
+        self.written.append(columns)
+
+
+class ExportTestCase(unittest.TestCase):
+    """Unit test case for columnar export."""
+
+    def setUp(self):
+        """Use temporary directory for export files."""
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_parse_number(self):
+        """Test that the first number of the field text is its value."""
+
+        self.assertEqual(parse_number('+5 °C'), 5.0)
+        self.assertEqual(parse_number('−3°'), -3.0)
+        self.assertEqual(parse_number('5,5 м/с'), 5.5)
+        self.assertTrue(math.isnan(parse_number('Хмарно')))
+
+    def test_row_groups(self):
+        """Test that rows are written by groups as they are added."""
+
+        exporter = GroupsExporter('weather', batch_size=4)
+        with exporter:
+            exporter.add('rp5', 'Kyiv', INFO, timestamp=1.5)
+            self.assertEqual(exporter.written, [])
+            exporter.add('sinoptik', 'Lviv', INFO, timestamp=2)
+            self.assertEqual(len(exporter.written), 1)
+
+        self.assertEqual(len(exporter.written), 1)
+        self.assertEqual((exporter.rows, exporter.groups), (6, 1))
+        group = exporter.written[0]
+        self.assertEqual(group['provider'], ['rp5'] * 3 + ['sinoptik'] * 3)
+        self.assertEqual(group['timestamp'][:4], [1500, 1500, 1500, 2000])
+        self.assertEqual(group['field'][:3], ['Temperature', 'Condition', 'Wind'])
+        self.assertEqual(group['value'][0], 5.0)
+        self.assertEqual(group['text'][1], 'без осадків')
+
+    def test_abstract_base(self):
+        """Test that exporter without group writer can not be created."""
+
+        with self.assertRaises(TypeError):
+            ColumnarExporter('weather')
+
+    def test_unknown_format(self):
+        """Test that unknown file extension is reported."""
+
+        with self.assertRaises(ExportError):
+            open_exporter(os.path.join(self.directory, 'weather.csv'))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow') is None,
+                         'pyarrow is installed')
+    def test_missing_dependency(self):
+        """Test that missing optional dependency is reported on open."""
+
+        with self.assertRaises(ExportError):
+            open_exporter(os.path.join(self.directory, 'weather.parquet'))
+
+    @unittest.skipIf(importlib.util.find_spec('pyarrow') is None,
+                     'pyarrow is not installed')
+    def test_arrow(self):
+        """Test that Arrow IPC file is read back with typed columns."""
+
+        import pyarrow.ipc
+
+        path = os.path.join(self.directory, 'weather.arrow')
+        with open_exporter(path, batch_size=3) as exporter:
+            exporter.add('rp5', 'Kyiv', INFO)
+            exporter.add('sinoptik', 'Lviv', INFO)
+
+        with pyarrow.memory_map(path) as source:
+            reader = pyarrow.ipc.open_file(source)
+            self.assertEqual(reader.num_record_batches, 2)
+            table = reader.read_all()
+        self.assertEqual(table.column('value').to_pylist()[:1], [5.0])
+        self.assertEqual(str(table.schema.field('value').type), 'double')
+
+    @unittest.skipIf(importlib.util.find_spec('numpy') is None,
+                     'numpy is not installed')
+    def test_npz(self):
+        """Test that NumPy archive keeps every group column."""
+
+        import numpy
+
+        path = os.path.join(self.directory, 'weather.npz')
+        with open_exporter(path, batch_size=3) as exporter:
+            exporter.add('rp5', 'Kyiv', INFO)
+            exporter.add('sinoptik', 'Lviv', INFO)
+
+        with numpy.load(path) as arrays:
+            self.assertEqual(arrays['value_0'][0], 5.0)
+            self.assertEqual(list(arrays['provider_1']), ['sinoptik'] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
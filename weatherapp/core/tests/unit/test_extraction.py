@@ -0,0 +1,175 @@
+"""Unit tests for declarative extraction rules."""
+
+import unittest
+from unittest.mock import patch
+
+from weatherapp.core import extraction
+from weatherapp.core.extraction import ExtractionPlan, ForecastPlan, Rule
+from weatherapp.core.providers import (Rp5WeatherProvider,
+                                       SinoptikWeatherProvider)
+
+RP5_PAGE = ('<html><body><div class="ArchiveTemp"><div class="ArchiveTempFeeling">'
+            '<span class="t_0" style="display: block;">+5 &deg;C</span></div></div>'
+            '<div id="forecastShort-content"><b>Ожидается облачная погода, '
+            '+3..+7 °C, без осадков, ветер умеренный южный, 5 м/с. '
+            'Завтра: +8 °C</b> <span class="t_0">+7 °C</span></div>'
+            '</body></html>')
+RP5_INFO = {'Temperature': '+5 °C', 'Condition': 'без осадков',
+            'Expect': '+7', 'Wind': '5 м/с'}
+SINOPTIK_PAGE = ('<html><body><div class="imgBlock"><p class="today-temp">+5°C</p>'
+                 '<img src="c.gif" alt="Хмарно"></div>'
+                 '<div class="main loaded"><div class="min">мін. <span>+1°</span>'
+                 '</div><div class="max">макс. <span>+7°</span></div></div>'
+                 '</body></html>')
+SINOPTIK_DAYS = ('<div id="blockDays">' + ''.join(
+    f'<div class="main"><p class="day-link">{day}</p><p class="date">{date}</p>'
+    f'<p class="month">жовтня</p><div class="weatherIco" title="Хмарно"></div>'
+    f'<div class="temperature"><div class="min">мін. <span>+{date - 19}°</span>'
+    f'</div><div class="max">макс. <span>+{date - 13}°</span></div></div></div>'
+    for day, date in (('Понеділок', 20), ('Вівторок', 21))) + '</div>')
+SINOPTIK_INFO = {'Temperature': '+5°C', 'Condition': 'Хмарно',
+                 'Expect': 'мін. +1°... макс. +7°'}
+
+
+class ExtractionPlanTestCase(unittest.TestCase):
+    """Unit test case for extraction plans."""
+
+    def test_locator_skips_dom(self):
+        """Test that elements found in the raw page do not need it parsed."""
+
+        with patch.object(extraction, 'make_soup') as make_soup:
+            info = Rp5WeatherProvider.plan.extract(
+                memoryview(RP5_PAGE.encode('utf-8')))
+        make_soup.assert_not_called()
+        self.assertEqual(info, RP5_INFO)
+
+    def test_text_page(self):
+        """Test that elements are found in text pages too."""
+
+        self.assertEqual(SinoptikWeatherProvider.plan.extract(SINOPTIK_PAGE),
+                         SINOPTIK_INFO)
+
+    def test_selector_fallback(self):
+        """Test that parsed page gives the same result as raw one."""
+
+        for plan, page, info in (
+                (Rp5WeatherProvider.plan, RP5_PAGE, RP5_INFO),
+                (SinoptikWeatherProvider.plan, SINOPTIK_PAGE, SINOPTIK_INFO)):
+            soup = extraction.make_soup(page)
+            self.assertEqual(plan.extract(page.encode(), soup=soup), info)
+
+    def test_nested_elements(self):
+        """Test that element ends where its closing tag is balanced."""
+
+        page = RP5_PAGE.replace('+5 &deg;C</span>',
+                                '+5 <span class="unit">&deg;C</span></span>')
+        for value in (page, page.encode('utf-8')):
+            self.assertEqual(Rp5WeatherProvider.plan.extract(value), RP5_INFO)
+
+        page = ('<div class="now"><div class="inner"></div>'
+                '<p class="temp">+5</p></div><p class="temp">+99</p>')
+        plan = ExtractionPlan(Rule('Temperature', 'div.now p.temp'))
+        self.assertEqual(plan.extract(page), {'Temperature': '+5'})
+
+    def test_decoy_elements(self):
+        """Test that elements outside of the container are not matched."""
+
+        page = SINOPTIK_PAGE.replace('<p class="today-temp">+5°C</p>', '')
+        page = page.replace('</body>', '<p class="today-temp">+99</p></body>')
+        info = SinoptikWeatherProvider.plan.extract(page.encode('utf-8'))
+        self.assertNotIn('Temperature', info)
+
+        page = ('<!-- <div class="now"><p class="temp">+99</p></div> -->'
+                '<script>s = \'<div class="now"><p class="temp">+98</p>\''
+                '</script><div class="now"><p class="temp">+5</p></div>')
+        plan = ExtractionPlan(Rule('Temperature', 'div.now p.temp'))
+        with patch.object(extraction, 'make_soup') as make_soup:
+            self.assertEqual(plan.extract(page), {'Temperature': '+5'})
+        make_soup.assert_not_called()
+
+    def test_attribute_quoting(self):
+        """Test that attributes are matched however html.parser reads them."""
+
+        decoy = ('<div class="imgBlock"><p class="today-temp">-7°C</p>'
+                 '<img src="s.gif" alt="Сонячно"></div>')
+        for start_tag in ("<div class='imgBlock'>", '<div class=imgBlock>',
+                          '<DIV CLASS="extra imgBlock">',
+                          '<div title="a > b" class = "imgBlock">'):
+            page = SINOPTIK_PAGE.replace('<div class="imgBlock">', start_tag) \
+                .replace('</body>', decoy + '</body>')
+            with patch.object(extraction, 'make_soup') as make_soup:
+                info = SinoptikWeatherProvider.plan.extract(page.encode('utf-8'))
+            make_soup.assert_not_called()
+            self.assertEqual(info, SINOPTIK_INFO, start_tag)
+
+        page = ("<div ID=now><img ALT='Sunny' alt=Rain></div>"
+                '<div id="now-later"><img alt="Snow"></div>')
+        plan = ExtractionPlan(Rule('Condition', 'div#now img', attr='alt'))
+        self.assertEqual(plan.extract(page), {'Condition': 'Rain'})
+        self.assertEqual(plan.extract(page, soup=extraction.make_soup(page)),
+                         {'Condition': 'Rain'})
+
+    def test_raw_page_mismatch(self):
+        """Test that page is parsed when element is not found in it."""
+
+        plan = ExtractionPlan(
+            Rule('Temperature', 'p.temp'),
+            Rule('Condition', 'img', attr='alt'))
+        page = b'<p class="temp">+5<!-- +4 --></p><img src="sun.png" alt="Sunny">'
+        with patch.object(extraction, 'make_soup',
+                          wraps=extraction.make_soup) as make_soup:
+            self.assertEqual(plan.extract(page),
+                             {'Temperature': '+5', 'Condition': 'Sunny'})
+        make_soup.assert_called_once()
+
+    def test_missing_fields(self):
+        """Test that fields without elements are omitted."""
+
+        plan = ExtractionPlan(Rule('Temperature', 'p.temp'),
+                              Rule('Wind', ('p.wind', 'p.gust')))
+        self.assertEqual(plan.extract('<p class="wind">5 m/s</p>'), {})
+
+
+class ForecastPlanTestCase(unittest.TestCase):
+    """Unit test case for forecast plans."""
+
+    def test_day_blocks(self):
+        """Test that every day block gives one forecast day."""
+
+        page = SINOPTIK_PAGE.replace('</body>', SINOPTIK_DAYS + '</body>')
+        self.assertEqual(
+            SinoptikWeatherProvider.forecast_plan.extract(page.encode('utf-8')),
+            [{'Day': 'Понеділок', 'Date': '20 жовтня', 'Condition': 'Хмарно',
+              'Min': '+1°', 'Max': '+7°'},
+             {'Day': 'Вівторок', 'Date': '21 жовтня', 'Condition': 'Хмарно',
+              'Min': '+2°', 'Max': '+8°'}])
+
+    def test_table_columns(self):
+        """Test that n-th value of every rule belongs to n-th day."""
+
+        plan = ForecastPlan(Rule('Day', 'tr.day td'),
+                            Rule('Temperature', 'tr.temp td'))
+        page = ('<table><tr class="day"><td>Mon</td><td>Tue</td><td>Wed</td></tr>'
+                '<tr class="temp"><td>+5</td><td>+7</td></tr></table>')
+        self.assertEqual(plan.extract(page),
+                         [{'Day': 'Mon', 'Temperature': '+5'},
+                          {'Day': 'Tue', 'Temperature': '+7'},
+                          {'Day': 'Wed'}])
+
+    def test_shared_soup(self):
+        """Test that current weather and forecast share the parsed page."""
+
+        page = SINOPTIK_PAGE.replace('</body>', SINOPTIK_DAYS + '</body>')
+        soup = extraction.make_soup(page)
+        rules = [Rule(rule.field, rule.selectors, rule.attr, rule.post)
+                 for rule in SinoptikWeatherProvider.plan.rules]
+        with patch.object(extraction, 'make_soup') as make_soup:
+            info = ExtractionPlan(*rules).extract(page, soup=soup)
+            forecast = SinoptikWeatherProvider.forecast_plan.extract(page, soup=soup)
+        make_soup.assert_not_called()
+        self.assertEqual(info, SINOPTIK_INFO)
+        self.assertEqual(len(forecast), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
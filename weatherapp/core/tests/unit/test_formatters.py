@@ -0,0 +1,45 @@
+"""Unit tests for output formatters."""
+
+import unittest
+
+from weatherapp.core.formatters import GridFormatter, TableFormatter
+
+
+class GridFormatterTestCase(unittest.TestCase):
+    """Unit test case for comparison grid formatter."""
+
+    def test_grid(self):
+        """Test that rows are locations and columns are provider fields."""
+
+        results = [('RP5', 'Kyiv', {'Temperature': '+5 °C', 'Wind': '5 м/с'}),
+                   ('SINOPTIK', 'Kyiv', {'Temperature': '+6°C'}),
+                   ('RP5', 'Lviv', {'Temperature': '+3 °C'})]
+        self.assertEqual(
+            ''.join(GridFormatter().emit_rows(results)),
+            '+----------+-----------------+----------+----------------------+\n'
+            '| Location | RP5 Temperature | RP5 Wind | SINOPTIK Temperature |\n'
+            '+----------+-----------------+----------+----------------------+\n'
+            '| Kyiv     | +5 °C           | 5 м/с    | +6°C                 |\n'
+            '| Lviv     | +3 °C           |          |                      |\n'
+            '+----------+-----------------+----------+----------------------+\n')
+
+    def test_streamed_lines(self):
+        """Test that grid is produced line by line."""
+
+        results = (('RP5', f'Location {number}', {'Temperature': '+5'})
+                   for number in range(1000))
+        lines = list(GridFormatter().emit_rows(results))
+        self.assertEqual(len(lines), 1004)
+        self.assertEqual(len(set(map(len, lines))), 1)
+
+    def test_table_rows(self):
+        """Test that other formatters print every result separately."""
+
+        output = list(TableFormatter().emit_rows([('RP5', 'Kyiv', {'Wind': '5'}),
+                                                  ('RP5', 'Lviv', {'Wind': '3'})]))
+        self.assertEqual(len(output), 2)
+        self.assertIn('| Wind | 5    |', output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
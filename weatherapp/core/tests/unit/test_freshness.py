@@ -0,0 +1,97 @@
+"""Unittests for adaptive cache time."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from weatherapp.core import freshness
+from weatherapp.core.freshness import FreshnessTracker
+
+URL = 'https://example.com/kyiv'
+
+
+@patch('weatherapp.core.config.CACHE_TIME', 900)
+@patch('weatherapp.core.config.CACHE_TIME_MIN', 300)
+@patch('weatherapp.core.config.CACHE_TIME_MAX', 3600)
+@patch('weatherapp.core.config.CACHE_TIME_GROWTH', 2)
+class FreshnessTrackerTestCase(unittest.TestCase):
+    """Unit test case for freshness tracker."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / 'freshness.json'
+        self.tracker = FreshnessTracker(self.path)
+
+    def test_hash_ignores_key_order(self):
+        """Test that weather info hash does not depend on key order."""
+
+        self.assertEqual(freshness.info_hash({'a': '1', 'b': '2'}),
+                         freshness.info_hash({'b': '2', 'a': '1'}))
+
+    def test_unchanged_info_grows_ttl(self):
+        """Test that cache time grows up to the limit for unchanged info."""
+
+        self.assertEqual(self.tracker.ttl(URL), 900)
+        self.assertEqual(self.tracker.observe(URL, {'Temperature': '+5'}), 900)
+        self.assertEqual(self.tracker.observe(URL, {'Temperature': '+5'}), 1800)
+        self.assertEqual(self.tracker.observe(URL, {'Temperature': '+5'}), 3600)
+        self.assertEqual(self.tracker.observe(URL, {'Temperature': '+5'}), 3600)
+
+    def test_changed_info_follows_interval(self):
+        """Test that cache time is half of the interval between changes."""
+
+        with patch('time.time', return_value=0):
+            self.tracker.observe(URL, {'Temperature': '+5'}, 'rp5', 'Kyiv')
+        with patch('time.time', return_value=1200):
+            ttl = self.tracker.observe(URL, {'Temperature': '+6'}, 'rp5', 'Kyiv')
+        self.assertEqual(ttl, 600)
+        with patch('time.time', return_value=1300):
+            ttl = self.tracker.observe(URL, {'Temperature': '+7'}, 'rp5', 'Kyiv')
+        self.assertEqual(ttl, 325)
+        with patch('time.time', return_value=1310):
+            ttl = self.tracker.observe(URL, {'Temperature': '+8'}, 'rp5', 'Kyiv')
+        self.assertEqual(ttl, 300)
+
+        self.assertEqual(self.tracker.summary(URL),
+                         'cache time 300s, 4 fetches, 3 changes, '
+                         'changes every 437s')
+
+    def test_observations_are_persisted(self):
+        """Test that observations survive between runs."""
+
+        self.tracker.observe(URL, {'Temperature': '+5'}, 'rp5', 'Kyiv')
+        self.tracker.observe(URL, {'Temperature': '+5'}, 'rp5', 'Kyiv')
+        self.assertFalse(self.path.exists())
+        self.tracker.save()
+
+        tracker = FreshnessTracker(self.path)
+        self.assertEqual(tracker.ttl(URL), 1800)
+        self.assertEqual([(url, record['provider']) for url, record in tracker],
+                         [(URL, 'rp5')])
+
+    def test_url_variants_share_history(self):
+        """Test that variants of the same canonical url share observations."""
+
+        self.tracker.observe('http://RP5.ua//Weather_in_Kiev', {'Temperature': '+5'})
+        self.tracker.observe('https://rp5.ua/Weather_in_Kiev#now', {'Temperature': '+5'})
+        self.assertEqual(self.tracker.ttl('https://rp5.ua/Weather_in_Kiev'), 1800)
+        self.assertEqual([url for url, _ in self.tracker],
+                         ['https://rp5.ua/Weather_in_Kiev'])
+
+    def test_save_only_changes(self):
+        """Test that the file is written once for all observations."""
+
+        with patch('os.replace', wraps=freshness.os.replace) as replace:
+            for index in range(10):
+                self.tracker.observe(f'{URL}{index}', {'Temperature': '+5'})
+            self.tracker.save()
+            self.tracker.save()
+        self.assertEqual(replace.call_count, 1)
+        self.assertEqual(len(list(FreshnessTracker(self.path))), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
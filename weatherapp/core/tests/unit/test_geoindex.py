@@ -0,0 +1,77 @@
+"""Unit tests for the spatial index of provider locations."""
+
+import os
+import random
+import tempfile
+import unittest
+
+from weatherapp.core.geoindex import GeoIndex, to_vector
+
+PLACES = [
+    ('rp5', 'Kyiv', 'https://rp5.ua/Weather_in_Kiev', 50.45, 30.52),
+    ('rp5', 'Lviv', 'https://rp5.ua/Weather_in_Lviv', 49.84, 24.03),
+    ('sinoptik', 'Київ', 'https://ua.sinoptik.ua/погода-київ', 50.45, 30.52),
+    ('sinoptik', 'Одеса', 'https://ua.sinoptik.ua/погода-одеса', 46.48, 30.72),
+    ('accu', 'Suva', 'https://www.accuweather.com/en/fj/suva', -18.14, 178.44),
+]
+
+
+class GeoIndexTestCase(unittest.TestCase):
+    """Unit test case for location index."""
+
+    def test_nearest(self):
+        """Test that the nearest location of every provider is found."""
+
+        index = GeoIndex.build(PLACES)
+        self.assertEqual(index.nearest(50.0, 30.0, provider='rp5')[0].name, 'Kyiv')
+        self.assertEqual(index.nearest(47.0, 30.0, provider='sinoptik')[0].name,
+                         'Одеса')
+        self.assertEqual(index.nearest(50.0, 30.0, provider='missing'), [])
+
+        place = index.nearest(49.84, 24.03)[0]
+        self.assertEqual(place.name, 'Lviv')
+        self.assertAlmostEqual(place.distance, 0, places=0)
+
+    def test_antimeridian(self):
+        """Test that points across the antimeridian are close."""
+
+        place = GeoIndex.build(PLACES).nearest(-18.0, -179.9)[0]
+        self.assertEqual(place.name, 'Suva')
+        self.assertLess(place.distance, 200)
+
+    def test_matches_full_scan(self):
+        """Test that the tree gives the same locations as the full scan."""
+
+        random_places = random.Random(1)
+        places = [(random_places.choice(['accu', 'rp5']), str(number), '',
+                   random_places.uniform(-90, 90), random_places.uniform(-180, 180))
+                  for number in range(500)]
+        index = GeoIndex.build(places)
+
+        for _ in range(20):
+            lat = random_places.uniform(-90, 90)
+            lon = random_places.uniform(-180, 180)
+            target = to_vector(lat, lon)
+            distances = sorted(
+                (sum((a - b) ** 2 for a, b in zip(target, to_vector(*place[3:]))),
+                 place[1]) for place in places if place[0] == 'rp5')
+            self.assertEqual([place.name for place in
+                              index.nearest(lat, lon, 3, provider='rp5')],
+                             [name for _, name in distances[:3]])
+
+    def test_save_load(self):
+        """Test that index is read back from the file."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'places.geoindex')
+            GeoIndex.build(PLACES).save(path)
+            index = GeoIndex.load(path)
+
+        self.assertEqual(len(index), len(PLACES))
+        self.assertEqual(sorted(index.trees), ['accu', 'rp5', 'sinoptik'])
+        self.assertEqual(index.nearest(46.5, 30.7, provider='sinoptik')[0].url,
+                         'https://ua.sinoptik.ua/погода-одеса')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Unittests for provider health tracking."""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from weatherapp.core import health
+from weatherapp.core.health import HealthTracker
+
+
+class HealthTrackerTestCase(unittest.TestCase):
+    """Unit test case for health tracker and circuit breaker."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / 'health.json'
+        self.tracker = HealthTracker(self.path)
+
+    def test_percentile(self):
+        """Test nearest-rank percentile calculation."""
+
+        values = list(range(1, 101))
+        self.assertEqual(health.percentile(values, 50), 50)
+        self.assertEqual(health.percentile(values, 90), 90)
+        self.assertEqual(health.percentile([], 90), 0.0)
+
+    @patch('weatherapp.core.config.CIRCUIT_FAILURE_THRESHOLD', 2)
+    def test_circuit_opens_after_failures(self):
+        """Test that repeated failures open the circuit."""
+
+        self.tracker.record_failure('accu', 0.1)
+        self.assertTrue(self.tracker.allow_request('accu'))
+        self.tracker.record_failure('accu', 0.1)
+        self.assertFalse(self.tracker.allow_request('accu'))
+        self.assertEqual(self.tracker.get('accu')['state'], health.OPEN)
+
+    @patch('weatherapp.core.config.CIRCUIT_FAILURE_THRESHOLD', 1)
+    def test_half_open_probe(self):
+        """Test that single probe is allowed after reset timeout."""
+
+        self.tracker.record_failure('rp5', 0.1)
+        self.tracker.get('rp5')['opened_at'] = time.time() - 10 ** 4
+
+        self.assertTrue(self.tracker.allow_request('rp5'))
+        self.assertEqual(self.tracker.get('rp5')['state'], health.HALF_OPEN)
+        self.assertFalse(self.tracker.allow_request('rp5'))
+
+        self.tracker.record_success('rp5', 0.2)
+        self.assertEqual(self.tracker.get('rp5')['state'], health.CLOSED)
+        self.assertTrue(self.tracker.allow_request('rp5'))
+
+    def test_state_is_persisted(self):
+        """Test that health state survives between runs."""
+
+        self.tracker.record_success('sinoptik', 0.5)
+        self.tracker.record_failure('sinoptik', 1.5)
+
+        summary = HealthTracker(self.path).summary('sinoptik')
+        self.assertTrue(summary.startswith('closed, 2 requests, 50% errors'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Unittests for hedged requests."""
+
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import requests
+
+from weatherapp.core.health import HealthTracker
+from weatherapp.core.hedging import CancelEvent, Hedging
+from weatherapp.core.providers import Rp5WeatherProvider
+
+SLOW_DELAY = 1.0  # delay of the first request (in seconds)
+
+
+class DelayHandler(BaseHTTPRequestHandler):
+    """Delays the first request, serves the others right away."""
+
+    requests_count = 0
+
+    def do_GET(self):
+        DelayHandler.requests_count += 1
+        body = f'<p>{DelayHandler.requests_count}</p>'.encode()
+        if DelayHandler.requests_count == 1:
+            time.sleep(SLOW_DELAY)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HedgingTestCase(unittest.TestCase):
+    """Unit test case for hedged requests."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), DelayHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,),
+                         daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_address[1]}/'
+        DelayHandler.requests_count = 0
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.health = HealthTracker(Path(tmp_dir.name) / 'health.json')
+        for _ in range(10):
+            self.health.record_success('rp5', 0.05)
+        self.provider = Rp5WeatherProvider(MagicMock(deadline=None, session=requests.Session()))
+
+    def request(self, cancel):
+        """Download the page from the stub server."""
+
+        page, _ = self.provider.download(self.url, 5, cancel=cancel)
+        return bytes(page)
+
+    def test_slow_request_is_hedged(self):
+        """Test that result of the hedged request is used."""
+
+        hedging = Hedging(self.health, budget=1)
+        start_time = time.perf_counter()
+        self.assertEqual(hedging.run('rp5', self.request), b'<p>2</p>')
+        self.assertLess(time.perf_counter() - start_time, SLOW_DELAY)
+        self.assertEqual(self.health.get('rp5')['hedges'], 1)
+
+    def test_budget(self):
+        """Test that requests are not hedged when budget is spent."""
+
+        hedging = Hedging(self.health, budget=0.5)
+        self.assertEqual(hedging.run('rp5', self.request), b'<p>1</p>')
+        self.assertEqual(self.health.get('rp5')['hedges'], 0)
+        self.assertEqual(DelayHandler.requests_count, 1)
+
+    def test_budget_spans_runs(self):
+        """Test that requests of previous runs are counted in the budget."""
+
+        self.health.get('rp5')['requests'] = 1
+        self.health.save()
+        health = HealthTracker(self.health.path)
+
+        hedging = Hedging(health, budget=0.5)
+        self.assertEqual(hedging.run('rp5', self.request), b'<p>2</p>')
+        self.assertEqual(health.get('rp5')['hedges'], 1)
+
+    def test_cancel_waiting_for_headers(self):
+        """Test that cancelled request stops before response headers arrive."""
+
+        cancel = CancelEvent()
+        errors = []
+
+        def target():
+            try:
+                self.request(cancel)
+            except Exception as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=target)
+        start_time = time.perf_counter()
+        thread.start()
+        time.sleep(0.1)
+        cancel.set()
+        thread.join(SLOW_DELAY)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.perf_counter() - start_time, SLOW_DELAY)
+        self.assertEqual(len(errors), 1)
+
+    def test_unknown_latency(self):
+        """Test that requests are not hedged until latency is known."""
+
+        hedging = Hedging(self.health, budget=1)
+        self.assertIsNone(hedging.threshold('sinoptik'))
+        self.assertEqual(hedging.threshold('rp5'), 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
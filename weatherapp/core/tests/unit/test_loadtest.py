@@ -0,0 +1,44 @@
+"""Unittests for the load test synthetic pages."""
+
+import unittest
+from urllib.parse import urlsplit
+
+from weatherapp.core.benchmarks import loadtest
+from weatherapp.core.providers import (AccuWeatherProvider, Rp5WeatherProvider,
+                                       SinoptikWeatherProvider)
+
+
+class SyntheticPagesTestCase(unittest.TestCase):
+    """Unit test case for synthetic provider pages."""
+
+    def get_page(self, name: str, index: int = 7) -> str:
+        """Return synthetic page of the provider location."""
+
+        url = loadtest.PROVIDER_URLS[name].format(index=index)
+        return loadtest.make_page(urlsplit(url).path)
+
+    def test_pages_match_providers(self):
+        """Test that providers extract all fields from synthetic pages."""
+
+        self.assertEqual(len(Rp5WeatherProvider.plan.extract(self.get_page('rp5'))),
+                         len(Rp5WeatherProvider.plan.rules))
+        self.assertEqual(
+            len(SinoptikWeatherProvider.plan.extract(self.get_page('sinoptik'))),
+            len(SinoptikWeatherProvider.plan.rules))
+
+        current_day_url = AccuWeatherProvider.plan.extract(
+            self.get_page('accu'))['url']
+        current_day_page = loadtest.make_page(current_day_url)
+        self.assertEqual(AccuWeatherProvider.current_day_plan.extract(current_day_page),
+                         {'Temperature': '-3°C', 'Condition': 'Cloudy',
+                          'RealFeel': '5°'})
+
+    def test_locations(self):
+        """Test that locations are spread between providers."""
+
+        names = [name for name, _, _ in loadtest.make_locations(6)]
+        self.assertEqual(names, ['accu', 'rp5', 'sinoptik'] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
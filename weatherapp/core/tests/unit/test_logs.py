@@ -0,0 +1,84 @@
+"""Unittests for logging setup."""
+
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from loguru import logger
+
+from weatherapp.core import logs
+from weatherapp.core.logs import DebugSampler
+
+
+class LogsTestCase(unittest.TestCase):
+    """Unit test case for logging setup."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.log_dir = Path(tmp_dir.name)
+        # sinks of other tests, the default stderr sink is restored
+        logs.reset()
+        self.addCleanup(logs.reset)
+
+    def read_logs(self) -> dict:
+        """Return log file contents by file suffix."""
+
+        logger.complete()
+        return {path.name.split('_')[1]: path.read_text()
+                for path in self.log_dir.iterdir()}
+
+    def test_configure_is_idempotent(self):
+        """Test that sinks are added only once."""
+
+        fname = str(self.log_dir / 'app')
+        logs.configure(fname)
+        handlers = list(logs._handlers[fname])
+        logs.configure(fname)
+        self.assertEqual(logs._handlers[fname], handlers)
+
+        logger.info('Only once')
+        self.assertEqual(self.read_logs()['info'].count('Only once'), 1)
+
+    def test_level_routing(self):
+        """Test that records are written to the file of their level."""
+
+        logs.configure(str(self.log_dir / 'app'))
+        logger.debug('Debug record')
+        logger.warning('Warning record')
+        logger.error('Error record')
+
+        files = self.read_logs()
+        self.assertIn('Debug record', files['debug'])
+        self.assertNotIn('Warning record', files['debug'])
+        self.assertIn('Warning record', files['info'])
+        self.assertNotIn('Error record', files['info'])
+        self.assertIn('Error record', files['error'])
+
+    @patch('weatherapp.core.config.LOG_DEBUG_SAMPLE', 3)
+    def test_debug_sampling(self):
+        """Test that every sink writes every N-th debug record of the line."""
+
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            logs.configure(str(self.log_dir / 'app'))
+        for index in range(7):
+            logger.debug(f'Record {index}')
+
+        for output in (self.read_logs()['debug'], stderr.getvalue()):
+            self.assertEqual([index for index in range(7)
+                              if f'Record {index}\n' in output], [0, 3, 6])
+
+    def test_sampler_passes_other_levels(self):
+        """Test that only debug records are sampled."""
+
+        sampler = DebugSampler(100)
+        record = {'level': logger.level('ERROR'), 'name': 'app', 'line': 1}
+        self.assertTrue(all(sampler(record) for _ in range(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+"""Unittests for the memory benchmark."""
+
+import io
+import unittest
+from unittest.mock import patch
+
+from weatherapp.core.benchmarks import memory
+
+
+class MemoryBenchmarkTestCase(unittest.TestCase):
+    """Unit test case for the memory benchmark."""
+
+    def test_run(self):
+        """Test that benchmark runs both paths on a few small pages."""
+
+        with patch('sys.stdout', io.StringIO()) as stdout:
+            memory.main(['--pages', '2', '--size', '4'])
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['stage', 'load', 'load'])
+
+
+if __name__ == '__main__':
+    unittest.main()
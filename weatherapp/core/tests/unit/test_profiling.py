@@ -0,0 +1,74 @@
+"""Unittests for run profiling."""
+
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from weatherapp.core import profiling
+from weatherapp.core.profiling import Profiler
+
+
+def busy_wait(seconds: float):
+    """Spend CPU time for the given number of seconds."""
+
+    end_time = time.perf_counter() + seconds
+    while time.perf_counter() < end_time:
+        pass
+
+
+class ProfilerTestCase(unittest.TestCase):
+    """Unit test case for profiler."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.prefix = str(Path(tmp_dir.name) / 'profile')
+
+    def test_phase_without_profiler(self):
+        """Test that phases are not measured unless profiler runs."""
+
+        with profiling.phase('RP5', 'fetch') as phase:
+            pass
+        self.assertNotIsInstance(phase, profiling.Phase)
+
+    def test_nested_phases(self):
+        """Test that nested phase time is not counted in the outer phase."""
+
+        with Profiler(self.prefix) as profiler:
+            with profiling.phase('RP5', 'parse'):
+                busy_wait(0.02)
+                with profiling.phase(None, 'soup'):
+                    busy_wait(0.05)
+
+        parse = profiler.phases[('RP5', 'parse')]
+        soup = profiler.phases[('RP5', 'soup')]
+        self.assertEqual(parse[0], 1)
+        self.assertLess(parse[1], 0.04)
+        self.assertGreaterEqual(soup[1], 0.05)
+
+    def test_profile_files(self):
+        """Test that profile files cover all threads."""
+
+        def fetch():
+            with profiling.phase('SINOPTIK', 'fetch'):
+                busy_wait(0.05)
+
+        with Profiler(self.prefix, trace_memory=True):
+            thread = threading.Thread(target=fetch)
+            thread.start()
+            thread.join()
+
+        stats = pstats.Stats(f'{self.prefix}.pstats')
+        self.assertIn('busy_wait', {func[2] for func in stats.stats})
+        self.assertIn(';fetch (', Path(f'{self.prefix}.collapsed').read_text())
+        self.assertIn('SINOPTIK', Path(f'{self.prefix}.phases').read_text())
+        self.assertTrue(Path(f'{self.prefix}.memory').read_text()
+                        .startswith('Peak traced memory'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 """Unittests for Provider manager class."""
 
 import unittest
+from unittest.mock import patch
 
+from weatherapp.core.plugins import LazyEntry
 from weatherapp.core.providermanager import ProviderManager
 
 
@@ -25,6 +27,26 @@ class ProviderManagerTestCase(unittest.TestCase):
         self.assertTrue('rp5' in self.provider_manager._providers, msg=message)
         self.assertTrue('sinoptik' in self.provider_manager._providers, msg=message)
 
+    def test_load_providers_lazy(self):
+        """Test that provider modules are not imported on discovery."""
+
+        provider = self.provider_manager['accu']
+        self.assertIsInstance(provider, LazyEntry)
+        self.assertFalse(provider.loaded)
+        self.assertEqual(provider.title, 'AccuWeather')
+        self.assertFalse(provider.loaded)
+
+    @patch('weatherapp.core.providermanager.iter_entry_points')
+    def test_load_entry_point_providers(self, iter_entry_points):
+        """Test discovery of providers registered as entry points."""
+
+        iter_entry_points.return_value = [
+            ('example', f'{__name__}:ExampleCommand')]
+        provider_manager = ProviderManager()
+
+        self.assertIn('example', provider_manager)
+        self.assertIs(provider_manager['example'].load(), ExampleCommand)
+
     def test_add(self):
         """Test add method for provider manager."""
 
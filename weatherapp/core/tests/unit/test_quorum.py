@@ -0,0 +1,109 @@
+"""Unittests for quorum of providers."""
+
+import io
+import time
+import unittest
+from unittest.mock import patch
+
+from weatherapp.core.app import App
+from weatherapp.core.quorum import find_quorum
+
+
+class FastProvider:
+    """Test provider which answers immediately."""
+
+    name = 'fast'
+    title = 'Fast'
+    temperature = '+5 °C'
+    delay = 0
+
+    def __init__(self, app):
+        self.location = 'Kyiv'
+
+    def run(self, refresh=False):
+        time.sleep(self.delay)
+        return {'Temperature': self.temperature}
+
+
+class CloseProvider(FastProvider):
+    """Test provider which answers a bit later with close temperature."""
+
+    name = 'close'
+    title = 'Close'
+    temperature = '+6°'
+    delay = 0.1
+
+
+class SlowProvider(FastProvider):
+    """Test provider which answers too late."""
+
+    name = 'slow'
+    title = 'Slow'
+    temperature = '+5°C'
+    delay = 1
+
+
+class QuorumTestCase(unittest.TestCase):
+    """Unit test case for quorum of providers."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+
+        self.stdout = io.StringIO()
+        self.app = App(stdout=self.stdout)
+        self.app.providermanager._providers = {'slow': SlowProvider,
+                                               'fast': FastProvider,
+                                               'close': CloseProvider}
+
+    def test_find_quorum(self):
+        """Test that quorum is formed by the answers which agree."""
+
+        results = {'rp5': {'Temperature': '+5 °C'},
+                   'accu': {'Temperature': '9°'},
+                   'sinoptik': {'Temperature': '+6°C'},
+                   'broken': {'Condition': 'Хмарно'}}
+        self.assertEqual(find_quorum(results, 2), ['rp5', 'accu'])
+        self.assertEqual(find_quorum(results, 2, tolerance=1), ['rp5', 'sinoptik'])
+        self.assertIsNone(find_quorum(results, 3, tolerance=1))
+        self.assertIsNone(find_quorum(results, 5))
+
+    def test_first_answers(self):
+        """Test that run ends as soon as quorum of providers answer."""
+
+        self.app.options = self.app.arg_parser.parse_args(['--quorum', '2'])
+        start_time = time.monotonic()
+        self.app.run_providers([])
+        self.assertLess(time.monotonic() - start_time, 0.5)
+
+        output = self.stdout.getvalue()
+        self.assertIn('Fast', output)
+        self.assertIn('Close', output)
+        self.assertNotIn('Slow', output)
+        self.assertTrue(self.app.deadline.cancelled)
+
+    def test_tolerance(self):
+        """Test that answers out of tolerance do not form the quorum."""
+
+        self.app.options = self.app.arg_parser.parse_args(
+            ['--quorum', '2', '--tolerance', '0.5'])
+        self.app.run_providers([])
+
+        output = self.stdout.getvalue()
+        self.assertIn('Fast', output)
+        self.assertIn('Slow', output)
+        self.assertNotIn('Close', output)
+
+    def test_quorum_validation(self):
+        """Test that quorum out of 1 to the number of providers is rejected."""
+
+        for value in ('0', '-1', '4', 'two'):
+            with self.assertRaises(SystemExit), \
+                    patch('sys.stderr', io.StringIO()) as stderr:
+                self.app.arg_parser.parse_args(['--quorum', value])
+            self.assertIn('--quorum', stderr.getvalue())
+        self.assertEqual(
+            self.app.arg_parser.parse_args(['--quorum', '3']).quorum, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
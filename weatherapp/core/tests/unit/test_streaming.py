@@ -0,0 +1,100 @@
+"""Unittests for streaming page download."""
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import requests
+
+from weatherapp.core.providers import Rp5WeatherProvider
+from weatherapp.core.streaming import MarkupWatcher
+
+PAGE_HEAD = (b'<html><body><div class="ArchiveTemp"><div>'
+             b'<span class="t_0">+4</span></div></div>'
+             b'<div id="forecastShort-content"><b>Today</b></div>')
+PAGE_TAIL = b'<p>' + b'x' * 1024 * 1024 + b'</p></body></html>'
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves page with required markup at the beginning."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAGE_HEAD + PAGE_TAIL)))
+        self.end_headers()
+        try:
+            self.wfile.write(PAGE_HEAD)
+            self.wfile.write(PAGE_TAIL)
+        except ConnectionError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class MarkupWatcherTestCase(unittest.TestCase):
+    """Unit test case for markup watcher."""
+
+    def test_nested_elements(self):
+        """Test that target is complete when its own end tag is read."""
+
+        watcher = MarkupWatcher([('div', {'class': 'main'})])
+        watcher.feed('<div class="main loaded"><div>inner</div>')
+        self.assertFalse(watcher.complete)
+        watcher.feed('</div>')
+        self.assertTrue(watcher.complete)
+
+    def test_attributes(self):
+        """Test matching of class and other attributes."""
+
+        watcher = MarkupWatcher([('div', {'class': 'main loaded'}),
+                                 ('div', {'id': 'content'})])
+        watcher.feed('<div class="main"></div><div id="content-2"></div>')
+        self.assertFalse(watcher.found)
+        watcher.feed('<div class="loaded main"></div><div id="content"></div>')
+        self.assertTrue(watcher.complete)
+
+    def test_void_element(self):
+        """Test elements without end tag."""
+
+        watcher = MarkupWatcher([('img', {'alt': 'Sunny'})])
+        watcher.feed('<p><img alt="Sunny" src="sun.png"><p>')
+        self.assertTrue(watcher.complete)
+
+
+class StreamingDownloadTestCase(unittest.TestCase):
+    """Unit test case for download with early termination."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,),
+                         daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_address[1]}/'
+
+        app = MagicMock(deadline=None, session=requests.Session())
+        self.provider = Rp5WeatherProvider(app)
+
+    def test_download_stops_early(self):
+        """Test that download stops once required markup is read."""
+
+        page, partial = self.provider.download(
+            self.url, 5, self.provider.streaming_targets)
+        self.assertTrue(partial)
+        self.assertLess(len(page), len(PAGE_HEAD + PAGE_TAIL))
+        self.assertEqual(self.provider.get_weather_info(page.decode())['Temperature'],
+                         '+4')
+
+    def test_full_download(self):
+        """Test that full page is downloaded without targets."""
+
+        page, partial = self.provider.download(self.url, 5)
+        self.assertFalse(partial)
+        self.assertEqual(page, PAGE_HEAD + PAGE_TAIL)
+
+
+if __name__ == '__main__':
+    unittest.main()
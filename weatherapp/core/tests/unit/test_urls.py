@@ -0,0 +1,89 @@
+"""Unit tests for canonical urls and request deduplication."""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from weatherapp.core.urls import SingleFlight, canonical_url
+
+
+class CanonicalUrlTestCase(unittest.TestCase):
+    """Unit test case for canonical form of urls."""
+
+    def test_same_page(self):
+        """Test that different links of the same page are the same."""
+
+        for urls in (
+                ('https://www.accuweather.com//en/ua/kyiv/324505',
+                 'https://WWW.AccuWeather.com:443/en/ua/kyiv/324505#top'),
+                ('http://rp5.ua/Weather_in_Kiev,_Kyiv',
+                 'https://rp5.ua/Weather_in_Kiev,_Kyiv'),
+                ('https://ua.sinoptik.ua/погода-київ',
+                 'https://ua.sinoptik.ua/%D0%BF%D0%BE%D0%B3%D0%BE%D0%B4%D0%B0-'
+                 '%d0%ba%d0%b8%d1%97%d0%b2',
+                 '//ua.sinoptik.ua/./погода-київ'),
+                ('https://example.com/a?b=2&a=1', 'https://example.com/a?a=1&b=2'),
+                ('https://пример.рф/', 'https://xn--e1afmkfd.xn--p1ai')):
+            self.assertEqual(len({canonical_url(url) for url in urls}), 1, urls)
+
+    def test_different_pages(self):
+        """Test that urls of different pages stay different."""
+
+        self.assertNotEqual(canonical_url('https://example.com/a%2Fb'),
+                            canonical_url('https://example.com/a/b'))
+        self.assertNotEqual(canonical_url('https://example.com:8080/a'),
+                            canonical_url('https://example.com/a'))
+        self.assertEqual(canonical_url('result:https://example.com//a'),
+                         'result:https://example.com//a')
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    """Unit test case for request deduplication."""
+
+    def test_concurrent_calls(self):
+        """Test that concurrent calls with the same key run once."""
+
+        calls = []
+        started = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return b'page'
+
+        inflight = SingleFlight()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(inflight.run, 'page', fetch)
+            started.wait()
+            others = [executor.submit(inflight.run, 'page', fetch)
+                      for _ in range(3)]
+            results = [future.result() for future in [first, *others]]
+
+        self.assertEqual(results, [b'page'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(inflight.run('page', lambda: b'new'), b'new')
+
+    def test_shared_error(self):
+        """Test that waiting calls get the error of the running one."""
+
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ConnectionError('page is unavailable')
+
+        inflight = SingleFlight()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(inflight.run, 'page', fail)
+            started.wait()
+            second = executor.submit(inflight.run, 'page', lambda: b'page')
+            for future in (first, second):
+                with self.assertRaises(ConnectionError):
+                    future.result()
+
+
+if __name__ == '__main__':
+    unittest.main()
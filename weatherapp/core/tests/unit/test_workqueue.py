@@ -0,0 +1,128 @@
+"""Unittests for distributed work queue."""
+
+import threading
+import time
+import unittest
+
+from weatherapp.core.app import App
+from weatherapp.core.workqueue import Coordinator, Worker, parse_address
+
+
+class EchoProvider:
+    """Test provider which returns its location url."""
+
+    name = 'echo'
+    title = 'Echo'
+    calls = []
+
+    def __init__(self, app):
+        self.location, self.url = '', ''
+
+    def run(self, refresh=False):
+        EchoProvider.calls.append(self.url)
+        if self.url.startswith('slow'):
+            time.sleep(0.15)
+        if self.url.startswith('flaky') and EchoProvider.calls.count(self.url) == 1:
+            raise ConnectionError('First attempt fails')
+        return {'Url': self.url}
+
+
+class WorkQueueTestCase(unittest.TestCase):
+    """Unit test case for coordinator and workers."""
+
+    def setUp(self):
+        """Contain set up info for every single test."""
+        EchoProvider.calls = []
+        self.coordinator = Coordinator(job_timeout=5, max_attempts=2)
+
+    def start_worker(self):
+        """Run worker in the background thread."""
+
+        app = App()
+        app.options = app.arg_parser.parse_args([])
+        app.providermanager._providers = {'echo': EchoProvider}
+        worker = Worker(self.coordinator.address, app=app)
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop_workers(self, threads):
+        """Stop worker threads."""
+
+        for _ in threads:
+            self.coordinator.jobs.put(None)
+        for thread in threads:
+            thread.join(5)
+
+    def test_parse_address(self):
+        """Test parsing of host:port address."""
+
+        self.assertEqual(parse_address('node:5000'), ('node', 5000))
+        self.assertEqual(parse_address(':5000'), ('127.0.0.1', 5000))
+
+    def test_run(self):
+        """Test that jobs are distributed and failed jobs are retried."""
+
+        workers = [self.start_worker(), self.start_worker()]
+        locations = [('echo', f'Place {index}', f'url-{index}')
+                     for index in range(10)]
+        locations.append(('echo', 'Flaky place', 'flaky-url'))
+
+        results = self.coordinator.run(locations)
+        self.stop_workers(workers)
+
+        self.assertEqual([result['Url'] for result in results],
+                         [url for _, _, url in locations])
+        self.assertEqual(EchoProvider.calls.count('flaky-url'), 2)
+
+    def test_result_callback(self):
+        """Test that every result is passed on as soon as it arrives."""
+
+        workers = [self.start_worker()]
+        locations = [('echo', f'Place {index}', f'url-{index}')
+                     for index in range(3)]
+        arrived = []
+
+        def on_result(job, info, collected_at):
+            arrived.append((job.location, info['Url'], collected_at))
+
+        start_time = time.time()
+        results = self.coordinator.run(locations, on_result=on_result)
+        self.stop_workers(workers)
+
+        self.assertEqual(sorted(location for location, _, _ in arrived),
+                         [location for _, location, _ in locations])
+        self.assertEqual([info for _, info, _ in sorted(arrived)],
+                         [result['Url'] for result in results])
+        self.assertTrue(all(start_time <= collected_at <= time.time()
+                            for _, _, collected_at in arrived))
+
+    def test_no_workers(self):
+        """Test that run ends when no worker takes jobs, jobs are not retried."""
+
+        coordinator = Coordinator(job_timeout=0.2, max_attempts=2)
+        start_time = time.monotonic()
+        results = coordinator.run([('echo', 'Place', 'url')])
+
+        self.assertEqual(results, [None])
+        self.assertLess(time.monotonic() - start_time, 2)
+        self.assertEqual(coordinator.jobs.qsize(), 1)
+
+    def test_backlog(self):
+        """Test that jobs waiting behind others do not time out."""
+
+        self.coordinator = Coordinator(job_timeout=1, max_attempts=1)
+        workers = [self.start_worker()]
+        locations = [('echo', f'Place {index}', f'slow-url-{index}')
+                     for index in range(10)]
+
+        results = self.coordinator.run(locations)
+        self.stop_workers(workers)
+
+        self.assertEqual([result['Url'] for result in results],
+                         [url for _, _, url in locations])
+        self.assertEqual(len(EchoProvider.calls), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Canonical form of page urls and deduplication of page requests.
+
+The same page is linked in different ways: http and https schemes,
+doubled slashes after the host, raw or percent-encoded non-ASCII path,
+Unicode or IDNA host, query parameters in any order. Cache keys are
+made from the canonical url, so all of them hit the same entry, and
+concurrent requests of the same canonical url are sent only once.
+"""
+
+import re
+import threading
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+SLASHES = re.compile(r'/{2,}')
+# characters kept as is in path segments (RFC 3986 pchar without '%')
+SEGMENT_SAFE = "-._~!$&'()*+,;=:@"
+
+
+def canonical_host(host: str) -> str:
+    """Return lowercase IDNA (ASCII) form of the host name."""
+
+    host = host.rstrip('.').lower()
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def canonical_path(path: str) -> str:
+    """Return path with single slashes, no dot segments and one encoding.
+
+    Segments are decoded and encoded again, so raw and percent-encoded
+    non-ASCII paths become the same, while encoded slashes stay encoded.
+    """
+
+    segments = []
+    for segment in SLASHES.sub('/', path or '/').split('/')[1:]:
+        if segment == '..':
+            if segments:
+                segments.pop()
+        elif segment != '.':
+            segments.append(quote(unquote(segment), safe=SEGMENT_SAFE))
+    if path.endswith(('/.', '/..')):
+        segments.append('')
+    return '/' + '/'.join(segments)
+
+
+def canonical_url(url: str) -> str:
+    """Return canonical form of the http(s) url, other strings as is.
+
+    Scheme is https, host is lowercase ASCII without default port,
+    query parameters are sorted and fragment is dropped.
+    """
+
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in ('', 'http', 'https') or not parts.netloc:
+        return url
+
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+    netloc = canonical_host(parts.hostname or '')
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower() or 'https'):
+        netloc = f'{netloc}:{port}'
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)),
+                      quote_via=quote)
+    return urlunsplit(('https', netloc, canonical_path(parts.path), query, ''))
+
+
+class SingleFlight:
+    """Runs concurrent calls with the same key only once.
+
+    Calls which come while the first one is running wait for it and
+    get its result or its exception.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> future of the running call
+        self._lock = threading.Lock()
+
+    def run(self, key, function):
+        """Return result of the function, shared by calls with the key."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
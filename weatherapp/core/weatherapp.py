@@ -1,8 +1,6 @@
 """Weather application.
 """
 
-# TODO: add a command that shows the weather for tomorrow
-# TODO: write log info to diff files according to log level (DEBUG, ...)
 # TODO: change colorlog to loguru
 # TODO: change setup.py configuration
 # TODO: --formatter = table, list, CSV
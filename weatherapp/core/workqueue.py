@@ -0,0 +1,250 @@
+"""Distributed work queue for the weather application.
+
+Coordinator splits provider x location work list into jobs and serves
+job and result queues over the network (multiprocessing managers).
+Workers in other processes or on other nodes take jobs, run providers
+and push the results back. Failed jobs and jobs which were not finished
+in time are put back to the queue, so they are retried by other workers.
+When no worker starts any job for the job timeout while jobs wait in
+the queue, workers are considered gone and waiting jobs fail without
+using up their attempts, so the run ends even when there are no workers.
+"""
+
+import csv
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+from collections import namedtuple
+from multiprocessing.managers import BaseManager
+
+from loguru import logger
+
+from weatherapp.core import config
+from weatherapp.core.app import App
+
+Job = namedtuple('Job', 'id provider location url attempt failed_on')
+
+
+class WorkerManager(BaseManager):
+    """Client side manager for coordinator queues."""
+
+
+WorkerManager.register('get_jobs')
+WorkerManager.register('get_results')
+
+
+def read_locations(path: str) -> list:
+    """Read locations from CSV file with provider, location, url rows."""
+
+    with open(path, newline='') as locations_file:
+        return [tuple(row[:3]) for row in csv.reader(locations_file)
+                if len(row) >= 3 and not row[0].startswith('#')]
+
+
+def parse_address(address: str) -> tuple:
+    """Convert 'host:port' string to (host, port) tuple."""
+
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class Coordinator:
+    """Distributes jobs between workers and collects results.
+
+    :param address: (host, port) to serve queues on
+    :type address: tuple
+    :param authkey: authentication key shared with workers
+    :type authkey: bytes
+    :param job_timeout: time for worker to finish the job, and for
+        workers to start any job while jobs wait (in seconds)
+    :type job_timeout: float
+    :param max_attempts: maximum number of attempts for every job
+    :type max_attempts: int
+    """
+
+    def __init__(self, address: tuple = None, authkey: bytes = None,
+                 job_timeout: float = None, max_attempts: int = None):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.authkey = authkey or config.QUEUE_AUTHKEY
+        self.job_timeout = job_timeout or config.QUEUE_JOB_TIMEOUT
+        self.max_attempts = max_attempts or config.QUEUE_MAX_ATTEMPTS
+        self.local_workers = []
+
+        class CoordinatorManager(BaseManager):
+            """Server side manager which shares coordinator queues."""
+
+        CoordinatorManager.register('get_jobs', callable=lambda: self.jobs)
+        CoordinatorManager.register('get_results', callable=lambda: self.results)
+        manager = CoordinatorManager(address=address or ('127.0.0.1', 0),
+                                     authkey=self.authkey)
+        self._server = manager.get_server()
+        self.address = self._server.address
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def start_local_workers(self, count: int):
+        """Start workers in local processes."""
+
+        for _ in range(count):
+            process = multiprocessing.Process(target=run_worker,
+                                              args=(self.address, self.authkey),
+                                              daemon=True)
+            process.start()
+            self.local_workers.append(process)
+
+    def stop_local_workers(self):
+        """Ask local workers to stop and wait for them."""
+
+        for _ in self.local_workers:
+            self.jobs.put(None)
+        for process in self.local_workers:
+            process.join(config.QUEUE_JOB_TIMEOUT)
+        self.local_workers = []
+
+    def _retry(self, job: Job, worker_id: str, pending: dict):
+        if job.attempt >= self.max_attempts:
+            logger.error(f'Job {job.provider} {job.location} failed '
+                         f'after {job.attempt} attempts')
+            return
+
+        failed_on = job.failed_on + ((worker_id,) if worker_id else ())
+        job = job._replace(attempt=job.attempt + 1, failed_on=failed_on)
+        pending[job.id] = [job, None]
+        self.jobs.put(job)
+
+    def run(self, locations: list, on_result=None) -> list:
+        """Run jobs for the locations and wait for the results.
+
+        :param locations: list of (provider name, location name, url)
+        :param on_result: function called with the job, its weather info
+            and the time it was collected as soon as every result arrives
+        :type on_result: callable
+        :return: weather info for every location, None for failed jobs
+        """
+
+        pending = {}  # job id -> [job, time the job was started]
+        for index, (name, location, url) in enumerate(locations):
+            job = Job(index, name, location, url, 1, ())
+            pending[job.id] = [job, None]
+            self.jobs.put(job)
+        last_started = time.monotonic()  # time any worker started a job
+
+        results = [None] * len(locations)
+        while pending:
+            try:
+                message = self.results.get(timeout=config.QUEUE_POLL)
+            except queue.Empty:
+                message = ('wait', None, None)
+
+            kind, job_id, worker_id = message[:3]
+            if kind == 'started':
+                last_started = time.monotonic()
+                if job_id in pending:
+                    pending[job_id][1] = last_started
+            elif kind == 'done' and job_id in pending:
+                job = pending.pop(job_id)[0]
+                error, info = message[3:]
+                if error is None:
+                    results[job_id] = info
+                    if on_result is not None:
+                        on_result(job, info, time.time())
+                else:
+                    logger.warning(f'Job {job.provider} {job.location} '
+                                   f'failed on {worker_id}: {error}')
+                    self._retry(job, worker_id, pending)
+
+            now = time.monotonic()
+            for job_id, (job, started) in list(pending.items()):
+                if started is not None and now - started > self.job_timeout:
+                    logger.warning(f'Job {job.provider} {job.location} '
+                                   f'timed out')
+                    del pending[job_id]
+                    self._retry(job, None, pending)
+
+            waiting = [job_id for job_id, (_, started) in pending.items()
+                       if started is None]
+            if waiting and now - last_started > self.job_timeout:
+                logger.error(f'No worker has started a job for '
+                             f'{self.job_timeout} seconds, '
+                             f'{len(waiting)} jobs are not run')
+                for job_id in waiting:
+                    del pending[job_id]
+
+        return results
+
+
+class Worker:
+    """Takes jobs from coordinator queue and runs providers.
+
+    :param address: coordinator (host, port)
+    :type address: tuple
+    :param authkey: authentication key shared with coordinator
+    :type authkey: bytes
+    :param app: application used to run providers
+    :type app: `weatherapp.core.app.App`
+    """
+
+    def __init__(self, address: tuple, authkey: bytes = None, app=None):
+        self.address = address
+        self.authkey = authkey or config.QUEUE_AUTHKEY
+        if app is None:
+            app = App()
+            app.options = app.arg_parser.parse_args([])
+        self.app = app
+        self.worker_id = f'{socket.gethostname()}-{os.getpid()}-{id(self):x}'
+
+    def run_job(self, job: Job) -> dict:
+        """Run provider for the job location."""
+
+        provider = self.app.providermanager[job.provider](self.app)
+        provider.location, provider.url = job.location, job.url
+        return provider.run(refresh=self.app.options.refresh)
+
+    def run(self):
+        """Process jobs until coordinator stops or goes away."""
+
+        manager = WorkerManager(address=self.address, authkey=self.authkey)
+        manager.connect()
+        jobs, results = manager.get_jobs(), manager.get_results()
+
+        returned = set()
+        while True:
+            try:
+                job = jobs.get(timeout=config.QUEUE_POLL)
+            except queue.Empty:
+                # observations are saved while the worker is idle
+                self.app.freshness.save()
+                continue
+            except (EOFError, OSError):
+                break  # coordinator is gone
+            if job is None:
+                break
+
+            if self.worker_id in job.failed_on and job.id not in returned:
+                # give other workers a chance to retry the job
+                returned.add(job.id)
+                jobs.put(job)
+                time.sleep(config.QUEUE_POLL)
+                continue
+
+            results.put(('started', job.id, self.worker_id))
+            try:
+                info = self.run_job(job)
+                results.put(('done', job.id, self.worker_id, None, info))
+            except Exception as error:
+                msg = f'Error during job: {job.provider} {job.location}'
+                if self.app.options.debug:
+                    logger.exception(msg)
+                else:
+                    logger.error(msg)
+                results.put(('done', job.id, self.worker_id, repr(error), None))
+        self.app.freshness.save()
+
+
+def run_worker(address: tuple, authkey: bytes):
+    """Entry point for local worker processes."""
+
+    Worker(address, authkey).run()